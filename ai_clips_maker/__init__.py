@@ -1,19 +1,29 @@
-# Functions
-from .txtslice.segment_picker import ClipFinder
-from .media.audio_file import AudioFile
-from .media.audiovideo_file import AudioVideoFile
-from .media.editor import MediaEditor
-from .media.video_file import VideoFile
-from .resize.resize import resize
-from .transcribe.transcriber import WhisperTranscriber as Transcriber
- 
+"""
+The public API is loaded lazily: the modules behind a name (and their heavy
+dependencies such as torch or whisperx) are only imported when the name is first
+used.
+"""
+# standard library imports
+import importlib
 
-
-# Types
-from .resize.crops import Crops
-from .resize.segment import Segment
-from .transcribe.transcription import Transcription
-from .transcribe.transcription_element import Sentence, Word, Character
+# public name -> (module, attribute)
+_LAZY_ATTRIBUTES = {
+    # Functions
+    "ClipFinder": (".txtslice.segment_picker", "ClipFinder"),
+    "AudioFile": (".media.audio_file", "AudioFile"),
+    "AudioVideoFile": (".media.audiovideo_file", "AudioVideoFile"),
+    "MediaEditor": (".media.editor", "MediaEditor"),
+    "VideoFile": (".media.video_file", "VideoFile"),
+    "resize": (".resize.resize", "resize"),
+    "Transcriber": (".transcribe.transcriber", "WhisperTranscriber"),
+    # Types
+    "Crops": (".resize.crops", "Crops"),
+    "Segment": (".resize.segment", "Segment"),
+    "Transcription": (".transcribe.transcription", "Transcription"),
+    "Sentence": (".transcribe.transcription_element", "Sentence"),
+    "Word": (".transcribe.transcription_element", "Word"),
+    "Character": (".transcribe.transcription_element", "Character"),
+}
 
 __all__ = [
     "AudioFile",
@@ -30,3 +40,17 @@ __all__ = [
     "Word",
     "resize",
 ]
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    # cache it so __getattr__ isn't called for this name again
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
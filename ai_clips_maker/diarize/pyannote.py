@@ -5,14 +5,17 @@ This module provides an interface for performing speaker diarization on audio
 files using the pre-trained "pyannote/speaker-diarization-3.1" model hosted on HuggingFace.
 """
 
+from __future__ import annotations
 import logging
-import os
-import uuid
+from typing import TYPE_CHECKING
 
 import torch
-from pyannote.audio import Pipeline
-from pyannote.core.annotation import Annotation
 
+# pyannote.audio is imported where it's used, as importing it takes seconds
+if TYPE_CHECKING:
+    from pyannote.core.annotation import Annotation
+
+from ai_clips_maker.media.audio_decoder import DecodedAudio
 from ai_clips_maker.media.audio_file import AudioFile
 from ai_clips_maker.utils.pytorch import get_compute_device, assert_compute_device_available
 
@@ -38,6 +41,8 @@ class PyannoteDiarizer:
             device = get_compute_device()
         assert_compute_device_available(device)
 
+        from pyannote.audio import Pipeline
+
         self.pipeline = Pipeline.from_pretrained(
             "pyannote/speaker-diarization-3.1",
             use_auth_token=auth_token,
@@ -50,9 +55,11 @@ class PyannoteDiarizer:
         audio_file: AudioFile,
         min_segment_duration: float = 1.5,
         time_precision: int = 6,
+        decoded_audio: DecodedAudio = None,
     ) -> list[dict]:
         """
-        Perform speaker diarization on an audio file.
+        Perform speaker diarization on an audio file. The audio is decoded straight
+        into memory and handed to the pipeline as a waveform.
 
         Parameters
         ----------
@@ -62,37 +69,31 @@ class PyannoteDiarizer:
             Minimum duration (in seconds) for a valid segment.
         time_precision : int
             Decimal precision for timestamps.
+        decoded_audio : DecodedAudio, optional
+            The audio of `audio_file` if it was already decoded for another step of
+            the job (e.g. transcription). Decoded from `audio_file` otherwise.
 
         Returns
         -------
         list[dict]
             List of speaker segments, each with keys: 'speakers', 'start_time', 'end_time'.
         """
-        if audio_file.has_file_extension("wav"):
-            wav_file = audio_file
-        else:
-            wav_path = os.path.join(
-                audio_file.get_parent_dir_path(),
-                f"{audio_file.get_filename_without_extension()}_{uuid.uuid4().hex}.wav",
-            )
-            wav_file = audio_file.extract_audio(
-                extracted_audio_file_path=wav_path,
-                audio_codec="pcm_s16le",
-                overwrite=False,
-            )
-
-        annotation: Annotation = self.pipeline({"audio": wav_file.path})
+        if decoded_audio is None:
+            decoded_audio = DecodedAudio(audio_file.path)
+        # shares memory with the decoded audio
+        waveform = torch.from_numpy(decoded_audio.waveform)
+        annotation: Annotation = self.pipeline(
+            {
+                "waveform": waveform.unsqueeze(0),
+                "sample_rate": decoded_audio.sample_rate,
+            }
+        )
         duration = audio_file.get_duration()
 
-        segments = self._adjust_segments(
+        return self._adjust_segments(
             annotation, duration, min_segment_duration, time_precision
         )
 
-        if wav_file is not audio_file:
-            wav_file.delete()
-
-        return segments
-
     def _adjust_segments(
         self,
         annotation: Annotation,
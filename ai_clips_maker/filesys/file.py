@@ -8,10 +8,17 @@ Notes
 
 import os
 import logging
+import threading
+
 import magic
 from ai_clips_maker.filesys.object import FileSystemObject
 from ai_clips_maker.filesys.exceptions import FileError
 
+# opening a libmagic handle loads its whole database, so a single handle is shared.
+# libmagic handles aren't thread-safe, hence the lock.
+_MIME_MAGIC = None
+_MIME_MAGIC_LOCK = threading.Lock()
+
 
 class File(FileSystemObject):
     """
@@ -54,8 +61,11 @@ class File(FileSystemObject):
     def get_mime_type(self) -> str:
         """Returns the full MIME type of the file (e.g., text/plain)."""
         self.assert_exists()
-        mime = magic.Magic(mime=True)
-        return mime.from_file(self._path)
+        global _MIME_MAGIC
+        with _MIME_MAGIC_LOCK:
+            if _MIME_MAGIC is None:
+                _MIME_MAGIC = magic.Magic(mime=True)
+            return _MIME_MAGIC.from_file(self._path)
 
     def get_mime_primary_type(self) -> str:
         """Returns the primary MIME type (e.g., 'text' from 'text/plain')."""
@@ -0,0 +1,269 @@
+"""
+Decoding the audio of media files straight into memory.
+
+Notes
+-----
+- Audio is decoded with PyAV (FFmpeg's libraries), so no ffmpeg process or
+intermediate audio file is needed.
+- Long inputs can be decoded into a memory-mapped array backed by an anonymous
+temporary file, which the OS removes as soon as it's closed, even if the process
+dies.
+- DecodedAudio lets every step of a job (transcription, alignment, diarization)
+share a single decode of the same file.
+"""
+# standard library imports
+import logging
+import tempfile
+
+# current package imports
+from .exceptions import AudioFileError
+
+# 3rd party imports
+import av
+import numpy as np
+
+# sample rate expected by the speech models (whisper, pyannote)
+AUDIO_SAMPLE_RATE = 16000
+# inputs at least this long are decoded into a memory-mapped array by default
+DEFAULT_MEMMAP_MIN_SECS = 3600
+
+
+class DecodedAudio:
+    """
+    The decoded audio of a media file, shared by the steps of a job.
+
+    The file is decoded once, on first use, and every consumer gets views of the
+    same buffer. Consumers that only need the beginning of the audio (e.g. language
+    detection) get it without decoding the whole file if it isn't decoded yet.
+    """
+
+    def __init__(
+        self,
+        media_path: str,
+        sample_rate: int = AUDIO_SAMPLE_RATE,
+        memmap_min_secs: float | None = DEFAULT_MEMMAP_MIN_SECS,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        media_path: str
+            Absolute path to the media file.
+        sample_rate: int
+            Sample rate to resample the audio to. Default is 16000.
+        memmap_min_secs: float | None
+            Audio at least this many seconds long is decoded into a memory-mapped
+            array instead of RAM. None to never memory-map. Default is one hour.
+        """
+        self._media_path = media_path
+        self._sample_rate = sample_rate
+        self._memmap_min_secs = memmap_min_secs
+        self._waveform = None
+
+    @property
+    def media_path(self) -> str:
+        """Returns the path of the decoded media file."""
+        return self._media_path
+
+    @property
+    def sample_rate(self) -> int:
+        """Returns the sample rate of the decoded audio."""
+        return self._sample_rate
+
+    @property
+    def waveform(self) -> np.ndarray:
+        """Returns the (num_samples,) mono waveform, decoding it on first use."""
+        if self._waveform is None:
+            self._waveform = decode_audio(
+                self._media_path, self._sample_rate, self._memmap_min_secs
+            )
+        return self._waveform
+
+    @property
+    def duration(self) -> float:
+        """Returns the duration of the decoded audio in seconds."""
+        return len(self.waveform) / self._sample_rate
+
+    def is_decoded(self) -> bool:
+        """Returns whether the whole file was decoded."""
+        return self._waveform is not None
+
+    def get_slice(self, start_time: float, end_time: float) -> np.ndarray:
+        """
+        Returns the audio between two times, as a view of the decoded waveform.
+
+        Parameters
+        ----------
+        start_time: float
+            Start time in seconds.
+        end_time: float
+            End time in seconds.
+
+        Returns
+        -------
+        np.ndarray
+            The samples between the two times.
+        """
+        start = max(round(start_time * self._sample_rate), 0)
+        end = max(round(end_time * self._sample_rate), start)
+        return self.waveform[start:end]
+
+    def get_head(self, duration_secs: float) -> np.ndarray:
+        """
+        Returns the first seconds of the audio. Only that part of the file is
+        decoded if the whole file wasn't decoded yet.
+
+        Parameters
+        ----------
+        duration_secs: float
+            Number of seconds to return.
+
+        Returns
+        -------
+        np.ndarray
+            The first samples of the audio.
+        """
+        if self._waveform is not None:
+            return self.get_slice(0, duration_secs)
+        return decode_audio(
+            self._media_path,
+            self._sample_rate,
+            memmap_min_secs=None,
+            max_duration_secs=duration_secs,
+        )
+
+    def release(self) -> None:
+        """
+        Drops the decoded waveform. It is decoded again if it's used afterwards.
+        """
+        self._waveform = None
+
+
+def decode_audio(
+    media_path: str,
+    sample_rate: int = AUDIO_SAMPLE_RATE,
+    memmap_min_secs: float | None = DEFAULT_MEMMAP_MIN_SECS,
+    max_duration_secs: float | None = None,
+) -> np.ndarray:
+    """
+    Decodes the first audio stream of a media file into a mono float32 array.
+
+    Parameters
+    ----------
+    media_path: str
+        Absolute path to the media file.
+    sample_rate: int
+        Sample rate to resample the audio to. Default is 16000.
+    memmap_min_secs: float | None
+        Audio at least this many seconds long is decoded into a memory-mapped array
+        instead of RAM. None to never memory-map. Default is one hour.
+    max_duration_secs: float | None
+        Stop decoding after this many seconds of audio. None to decode everything.
+
+    Returns
+    -------
+    np.ndarray
+        The (num_samples,) mono waveform with samples in [-1, 1].
+    """
+    with av.open(media_path) as container:
+        if len(container.streams.audio) == 0:
+            msg = f"'{media_path}' has no audio stream to decode."
+            logging.error(msg)
+            raise AudioFileError(msg)
+        stream = container.streams.audio[0]
+        stream.thread_type = "AUTO"
+
+        duration_secs = _get_duration_secs(container, stream)
+        max_num_samples = None
+        if max_duration_secs is not None:
+            max_num_samples = round(max_duration_secs * sample_rate)
+            duration_secs = min(duration_secs, max_duration_secs)
+        # a second of margin for rounding and inaccurate container durations
+        expected_num_samples = int((duration_secs + 1) * sample_rate)
+        if (
+            memmap_min_secs is not None
+            and duration_secs > 0
+            and duration_secs >= memmap_min_secs
+        ):
+            buffer = _MemmapBuffer(expected_num_samples)
+        else:
+            buffer = _ArrayBuffer()
+
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=sample_rate)
+        for frame in container.decode(stream):
+            for resampled in resampler.resample(frame):
+                buffer.append(resampled.to_ndarray().reshape(-1))
+            if max_num_samples is not None and buffer.num_samples >= max_num_samples:
+                break
+        else:
+            for resampled in resampler.resample(None):
+                buffer.append(resampled.to_ndarray().reshape(-1))
+
+    waveform = buffer.get()
+    if max_num_samples is not None:
+        waveform = waveform[:max_num_samples]
+    return waveform
+
+
+def _get_duration_secs(container: av.container.InputContainer, stream) -> float:
+    """
+    Returns the duration of an audio stream in seconds, 0 if unknown.
+    """
+    if stream.duration is not None and stream.time_base is not None:
+        return float(stream.duration * stream.time_base)
+    if container.duration is not None:
+        return container.duration / av.time_base
+    return 0.0
+
+
+class _ArrayBuffer:
+    """
+    Collects decoded samples in RAM.
+    """
+
+    def __init__(self) -> None:
+        self._chunks = []
+        self.num_samples = 0
+
+    def append(self, samples: np.ndarray) -> None:
+        self._chunks.append(samples)
+        self.num_samples += len(samples)
+
+    def get(self) -> np.ndarray:
+        if len(self._chunks) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(self._chunks).astype(np.float32, copy=False)
+
+
+class _MemmapBuffer:
+    """
+    Collects decoded samples in a memory-mapped anonymous temporary file, growing it
+    if the audio is longer than expected.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        # the file has no name, so nothing is left behind if the process dies
+        self._file = tempfile.TemporaryFile()
+        self._capacity = max(capacity, 1)
+        self.num_samples = 0
+        self._samples = self._map()
+
+    def _map(self) -> np.memmap:
+        self._file.truncate(self._capacity * np.dtype(np.float32).itemsize)
+        return np.memmap(
+            self._file, dtype=np.float32, mode="r+", shape=(self._capacity,)
+        )
+
+    def append(self, samples: np.ndarray) -> None:
+        end = self.num_samples + len(samples)
+        if end > self._capacity:
+            self._samples.flush()
+            self._capacity = max(end, 2 * self._capacity)
+            self._samples = self._map()
+        self._samples[self.num_samples:end] = samples
+        self.num_samples = end
+
+    def get(self) -> np.ndarray:
+        # the mapping keeps the file's data alive after the file object is closed
+        samples = self._samples[: self.num_samples]
+        self._file.close()
+        return samples
@@ -30,10 +30,9 @@ class AudioFile(TemporalMediaFile):
         if msg:
             return msg
 
-        temp_file = TemporalMediaFile(self._path)
-        if not temp_file.has_audio_stream():
+        if not self.has_audio_stream():
             return f"'{self._path}' has no audio stream — not a valid {self.get_type()}."
-        if not temp_file.is_audio_only():
+        if not self.is_audio_only():
             return (
                 f"'{self._path}' is not audio-only — not a valid {self.get_type()}. "
                 "Use AudioVideoFile instead."
@@ -42,7 +41,7 @@ class AudioFile(TemporalMediaFile):
         return None
 
     def get_bitrate(self) -> int | None:
-        return int(self.get_stream_info("a:0", "bit_rate"))
+        return self.get_probe().audio_bit_rate
 
     def extract_audio(
         self,
@@ -53,11 +52,11 @@ class AudioFile(TemporalMediaFile):
         self.assert_exists()
 
         if overwrite:
-            self._filesys_manager.assert_parent_dir_exists(File(output_path))
+            self._fs_manager.assert_parent_dir_exists(File(output_path))
         else:
-            self._filesys_manager.assert_valid_path_for_new_fs_object(output_path)
+            self._fs_manager.assert_valid_path_for_new_fs_object(output_path)
 
-        self._filesys_manager.assert_paths_not_equal(
+        self._fs_manager.assert_paths_not_equal(
             self.path,
             output_path,
             "source audio",
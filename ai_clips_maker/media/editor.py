@@ -1,6 +1,7 @@
 import logging
 import subprocess
 import os
+import tempfile
 import uuid
 
 # Imports from current package
@@ -9,16 +10,63 @@ from .audio_file import AudioFile
 from .audiovideo_file import AudioVideoFile
 from .image_file import ImageFile
 from .media_file import MediaFile
+from .probe import probe_keyframe_times, probe_video_extradata
 from .temporal_media_file import TemporalMediaFile
 from .video_file import VideoFile
 
 # Local imports for file and system management
 from ai_clips_maker.filesys.file import File
 from ai_clips_maker.filesys.manager import FileSystemManager
+from ai_clips_maker.resize.crops import Crops
 from ai_clips_maker.utils.conversions import seconds_to_hms_time_format
 from ai_clips_maker.utils.type_checker import TypeChecker
 
 SUCCESS = 0  # Return code from ffmpeg indicating success
+# Ranges further apart than this are exported by separate ffmpeg processes, since
+# decoding the gap between them costs more than seeking to each of them
+DEFAULT_MAX_TRIM_GAP_SECS = 60.0
+# Maximum number of clips written by a single ffmpeg process
+MAX_TRIM_OUTPUTS_PER_PROCESS = 16
+# Tolerance when comparing trim times to a media file's duration
+TRIM_TIME_TOLERANCE_SECS = 0.05
+# Encoders that can produce streams that can be concatenated with stream-copied
+# video of the given codec
+SMART_CUT_ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+    "mpeg4": "mpeg4",
+    "vp9": "libvpx-vp9",
+}
+# Bitstream filters converting stream-copied video to Annex B, which carries the
+# parameter sets (e.g. H.264's SPS and PPS) in-band before every keyframe. Segments
+# of these codecs are joined as MPEG-TS, so re-encoded segments can have other
+# parameter sets than the source. Segments of other codecs are only joined if their
+# codec extradata is identical to the source's, otherwise the whole clip is
+# re-encoded.
+SMART_CUT_ANNEXB_FILTERS = {
+    "h264": "h264_mp4toannexb",
+    "hevc": "hevc_mp4toannexb",
+}
+# ffprobe profile names and the encoder's names for them
+SMART_CUT_PROFILES = {
+    "libx264": {
+        "Constrained Baseline": "baseline",
+        "Baseline": "baseline",
+        "Main": "main",
+        "High": "high",
+        "High 10": "high10",
+        "High 4:2:2": "high422",
+        "High 4:4:4 Predictive": "high444",
+    },
+    "libx265": {
+        "Main": "main",
+        "Main 10": "main10",
+        "Main Still Picture": "mainstillpicture",
+    },
+}
+# Cuts closer than this to a keyframe are snapped to it instead of re-encoding a
+# sliver of a GOP
+KEYFRAME_SNAP_SECS = 0.001
 
 class MediaEditor:
     """
@@ -73,7 +121,8 @@ class MediaEditor:
         preset : str
             Preset for encoding speed and compression.
         num_threads : str
-            The number of threads to use for encoding.
+            The number of threads to use for decoding, filtering and encoding. "0" lets
+            ffmpeg choose.
         crop_x, crop_y, crop_width, crop_height : Optional[int]
             If cropping is needed, these parameters define the crop area.
 
@@ -98,6 +147,7 @@ class MediaEditor:
 
         ffmpeg_command = [
             "ffmpeg", "-y", "-ss", start_time_hms, "-t", duration_hms,
+            *self._get_input_thread_options(num_threads),
             "-i", media_file.path, "-c:v", video_codec, "-preset", preset,
             "-c:a", audio_codec, "-map", "0", "-crf", crf, "-threads", num_threads
         ]
@@ -124,6 +174,716 @@ class MediaEditor:
             trimmed_media_file.assert_exists()
             return trimmed_media_file
 
+    def trim_many(
+        self,
+        media_file: TemporalMediaFile,
+        ranges: list[tuple[float, float]],
+        trimmed_media_file_paths: list[str],
+        overwrite: bool = True,
+        video_codec: str = "copy",
+        audio_codec: str = "copy",
+        crf: str = "23",
+        preset: str = "medium",
+        num_threads: str = "0",
+        max_gap_secs: float = DEFAULT_MAX_TRIM_GAP_SECS,
+    ) -> list[TemporalMediaFile | None]:
+        """
+        Trims several clips out of a media file. Ranges close to each other are
+        exported together by a single ffmpeg process that writes every clip of the
+        group.
+
+        When re-encoding, the process seeks and decodes the source once for the
+        whole group. When stream copying video, each clip gets its own input seeked
+        to its start, so (like `trim`) the clip starts at the keyframe before its
+        start instead of dropping the frames up to the next keyframe.
+
+        Parameters
+        ----------
+        media_file : TemporalMediaFile
+            The media file to trim.
+        ranges : list[tuple[float, float]]
+            The (start time, end time) in seconds of each clip.
+        trimmed_media_file_paths : list[str]
+            Path to save each clip to, in the same order as `ranges`.
+        overwrite : bool
+            Whether to overwrite existing files at `trimmed_media_file_paths`.
+        video_codec : str
+            Codec used for video compression.
+        audio_codec : str
+            Codec used for audio compression.
+        crf : str
+            Constant rate factor for video quality.
+        preset : str
+            Preset for encoding speed and compression.
+        num_threads : str
+            The number of threads to use for decoding, filtering and encoding. "0" lets
+            ffmpeg choose.
+        max_gap_secs : float
+            Ranges separated by more than this many seconds are exported by
+            separate ffmpeg processes.
+
+        Returns
+        -------
+        list[TemporalMediaFile | None]
+            The trimmed media files in the same order as `ranges`. A clip is None if
+            the ffmpeg process that exported it was unsuccessful.
+        """
+        self.assert_valid_media_file(media_file, TemporalMediaFile)
+        if len(ranges) != len(trimmed_media_file_paths):
+            raise MediaEditorError(
+                f"Got {len(ranges)} ranges but {len(trimmed_media_file_paths)} "
+                "trimmed media file paths."
+            )
+        if len(set(trimmed_media_file_paths)) != len(trimmed_media_file_paths):
+            raise MediaEditorError("Trimmed media file paths must be unique.")
+        if max_gap_secs < 0:
+            raise MediaEditorError(
+                f"max_gap_secs must be non-negative, not '{max_gap_secs}'."
+            )
+        for (start_time, end_time), path in zip(ranges, trimmed_media_file_paths):
+            if overwrite:
+                self._file_system_manager.assert_parent_dir_exists(MediaFile(path))
+            else:
+                self._file_system_manager.assert_valid_path_for_new_fs_object(path)
+            self._file_system_manager.assert_paths_not_equal(
+                media_file.path, path, "media_file path", "trimmed_media_file_path"
+            )
+            self._assert_valid_trim_times(media_file, start_time, end_time)
+
+        trimmed_media_files = [None] * len(ranges)
+        for group in self._group_trim_ranges(ranges, max_gap_secs):
+            if video_codec == "copy":
+                ffmpeg_command = self._build_trim_many_copy_command(
+                    media_file, ranges, trimmed_media_file_paths, group,
+                    audio_codec, num_threads,
+                )
+            else:
+                ffmpeg_command = self._build_trim_many_encode_command(
+                    media_file, ranges, trimmed_media_file_paths, group,
+                    video_codec, audio_codec, crf, preset, num_threads,
+                )
+
+            result = subprocess.run(ffmpeg_command, capture_output=True, text=True)
+            if result.returncode != SUCCESS:
+                msg = (
+                    f"Terminal return code: '{result.returncode}'\n"
+                    f"Output: '{result.stdout}'\n"
+                    f"Err Output: '{result.stderr}'\n"
+                )
+                logging.error(
+                    f"Trimming {len(group)} clips from media file "
+                    f"'{media_file.path}' was unsuccessful. Details: {msg}"
+                )
+                continue
+            for i in group:
+                trimmed_media_file = self._create_media_file_of_same_type(
+                    trimmed_media_file_paths[i], media_file
+                )
+                trimmed_media_file.assert_exists()
+                trimmed_media_files[i] = trimmed_media_file
+
+        return trimmed_media_files
+
+    def _build_trim_many_copy_command(
+        self,
+        media_file: TemporalMediaFile,
+        ranges: list[tuple[float, float]],
+        trimmed_media_file_paths: list[str],
+        group: list[int],
+        audio_codec: str,
+        num_threads: str,
+    ) -> list[str]:
+        """
+        Builds the ffmpeg command stream copying the video of a group of clips.
+        Each clip is read from its own input, seeked and limited exactly like in
+        `trim`.
+        """
+        ffmpeg_command = ["ffmpeg", "-y"]
+        for i in group:
+            start_time, end_time = ranges[i]
+            ffmpeg_command.extend([
+                "-ss", seconds_to_hms_time_format(start_time),
+                "-t", seconds_to_hms_time_format(end_time - start_time),
+                "-i", media_file.path,
+            ])
+        # output options apply to the output file that follows them
+        for input_idx, i in enumerate(group):
+            ffmpeg_command.extend([
+                "-c:v", "copy", "-c:a", audio_codec, "-map", str(input_idx),
+                "-threads", num_threads, trimmed_media_file_paths[i],
+            ])
+        return ffmpeg_command
+
+    def _build_trim_many_encode_command(
+        self,
+        media_file: TemporalMediaFile,
+        ranges: list[tuple[float, float]],
+        trimmed_media_file_paths: list[str],
+        group: list[int],
+        video_codec: str,
+        audio_codec: str,
+        crf: str,
+        preset: str,
+        num_threads: str,
+    ) -> list[str]:
+        """
+        Builds the ffmpeg command re-encoding a group of clips. The source is seeked
+        once to the start of the group and decoded once for every clip.
+        """
+        group_start = min(ranges[i][0] for i in group)
+        ffmpeg_command = [
+            "ffmpeg", "-y", "-ss", seconds_to_hms_time_format(group_start),
+            *self._get_input_thread_options(num_threads),
+            "-i", media_file.path,
+        ]
+        # output options apply to the output file that follows them
+        for i in group:
+            start_time, end_time = ranges[i]
+            ffmpeg_command.extend([
+                "-ss", seconds_to_hms_time_format(start_time - group_start),
+                "-t", seconds_to_hms_time_format(end_time - start_time),
+                "-c:v", video_codec, "-preset", preset, "-c:a", audio_codec,
+                "-map", "0", "-crf", crf, "-threads", num_threads,
+                trimmed_media_file_paths[i],
+            ])
+        return ffmpeg_command
+
+    def _group_trim_ranges(
+        self,
+        ranges: list[tuple[float, float]],
+        max_gap_secs: float,
+    ) -> list[list[int]]:
+        """
+        Groups ranges that are close to each other so each group can be exported by
+        a single ffmpeg process.
+
+        Parameters
+        ----------
+        ranges : list[tuple[float, float]]
+            The (start time, end time) in seconds of each clip.
+        max_gap_secs : float
+            Maximum gap between the end of a group and the start of the next range
+            of the group.
+
+        Returns
+        -------
+        list[list[int]]
+            The indices of the ranges in each group, ordered by start time.
+        """
+        groups = []
+        group_end = None
+        for i in sorted(range(len(ranges)), key=lambda i: ranges[i][0]):
+            start_time, end_time = ranges[i]
+            if (
+                group_end is None
+                or start_time - group_end > max_gap_secs
+                or len(groups[-1]) == MAX_TRIM_OUTPUTS_PER_PROCESS
+            ):
+                groups.append([])
+                group_end = end_time
+            groups[-1].append(i)
+            group_end = max(group_end, end_time)
+        return groups
+
+    def smart_trim(
+        self,
+        media_file: TemporalMediaFile,
+        start_time: float,
+        end_time: float,
+        trimmed_media_file_path: str,
+        overwrite: bool = True,
+        audio_codec: str = "aac",
+        crf: str = "23",
+        preset: str = "medium",
+        num_threads: str = "0",
+    ) -> TemporalMediaFile | None:
+        """
+        Frame-accurately trims a media file while re-encoding as little video as
+        possible. Only the partial GOPs at the head and tail of the clip are
+        re-encoded; the video between the first and last keyframes of the clip is
+        stream-copied. The parts are concatenated losslessly and the audio is
+        re-encoded.
+
+        The head and tail are encoded with the source's profile, level and pixel
+        format. H.264 and HEVC segments are joined as Annex B streams, which carry
+        each segment's parameter sets in-band, so the copied video doesn't depend on
+        the re-encoded segments' parameter sets. For other codecs the re-encoded
+        segments must have the same codec extradata as the source. If they don't,
+        or if the video's codec can't be smart-cut or any step fails, the whole clip
+        is re-encoded.
+
+        Parameters
+        ----------
+        media_file : TemporalMediaFile
+            The media file to trim.
+        start_time : float
+            The start time in seconds for trimming.
+        end_time : float
+            The end time in seconds for trimming.
+        trimmed_media_file_path : str
+            Path to save the trimmed media file.
+        overwrite : bool
+            Whether to overwrite the existing file at `trimmed_media_file_path`.
+        audio_codec : str
+            Codec used for audio compression.
+        crf : str
+            Constant rate factor for the quality of the re-encoded video.
+        preset : str
+            Preset for encoding speed and compression.
+        num_threads : str
+            The number of threads to use for decoding, filtering and encoding. "0"
+            lets ffmpeg choose.
+
+        Returns
+        -------
+        TemporalMediaFile or None
+            The trimmed media file, None if unsuccessful.
+        """
+        self.assert_valid_media_file(media_file, TemporalMediaFile)
+        if overwrite:
+            self._file_system_manager.assert_parent_dir_exists(
+                MediaFile(trimmed_media_file_path)
+            )
+        else:
+            self._file_system_manager.assert_valid_path_for_new_fs_object(
+                trimmed_media_file_path
+            )
+        self._file_system_manager.assert_paths_not_equal(
+            media_file.path,
+            trimmed_media_file_path,
+            "media_file path",
+            "trimmed_media_file_path",
+        )
+        self._assert_valid_trim_times(media_file, start_time, end_time)
+
+        # audio frames are all keyframes, so there is nothing to smart-cut
+        if not media_file.has_video_stream():
+            return self.trim(
+                media_file, start_time, end_time, trimmed_media_file_path,
+                overwrite, "copy", audio_codec, crf, preset, num_threads,
+            )
+
+        probe = media_file.get_probe()
+        video_codec = probe.get_stream_field("v:0", "codec_name")
+        encoder = SMART_CUT_ENCODERS.get(video_codec)
+        if encoder is not None:
+            # keyframe times are timestamps, while trim times (like ffmpeg's seek
+            # times) are relative to the container's start time
+            offset = probe.start_time
+            keyframe_times = probe_keyframe_times(
+                media_file.path, start_time + offset, end_time + offset
+            )
+            segments = None
+            if keyframe_times is not None:
+                keyframe_times = [t - offset for t in keyframe_times]
+                segments = self._plan_smart_cut(start_time, end_time, keyframe_times)
+            if segments is not None:
+                temp_parent_dir = os.path.dirname(trimmed_media_file_path)
+                with tempfile.TemporaryDirectory(dir=temp_parent_dir) as temp_dir:
+                    success = self._smart_cut(
+                        media_file, start_time, end_time, segments, encoder,
+                        trimmed_media_file_path, temp_dir, audio_codec, crf,
+                        preset, num_threads,
+                    )
+                if success:
+                    trimmed_media_file = self._create_media_file_of_same_type(
+                        trimmed_media_file_path, media_file
+                    )
+                    trimmed_media_file.assert_exists()
+                    return trimmed_media_file
+            logging.warning(
+                f"Smart-cutting media file '{media_file.path}' wasn't possible; "
+                "re-encoding the whole clip."
+            )
+        else:
+            logging.debug(
+                f"Can't smart-cut video codec '{video_codec}'; re-encoding the whole "
+                "clip."
+            )
+
+        return self.trim(
+            media_file, start_time, end_time, trimmed_media_file_path, overwrite,
+            encoder or "libx264", audio_codec, crf, preset, num_threads,
+        )
+
+    def _plan_smart_cut(
+        self,
+        start_time: float,
+        end_time: float,
+        keyframe_times: list[float],
+    ) -> list[tuple[float, float, bool]] | None:
+        """
+        Splits a clip into the segments to re-encode and the segments to stream-copy.
+
+        Parameters
+        ----------
+        start_time : float
+            The start time in seconds of the clip.
+        end_time : float
+            The end time in seconds of the clip.
+        keyframe_times : list[float]
+            The sorted times in seconds of the video's keyframes within the clip.
+
+        Returns
+        -------
+        list[tuple[float, float, bool]] | None
+            The (start time, end time, stream copy) of each segment in order, None
+            if no part of the clip can be stream-copied.
+        """
+        keyframe_times = [
+            t
+            for t in keyframe_times
+            if start_time - KEYFRAME_SNAP_SECS <= t < end_time
+        ]
+        if len(keyframe_times) < 2:
+            # everything after the only keyframe is the tail, so nothing is copied
+            return None
+
+        first_keyframe, last_keyframe = keyframe_times[0], keyframe_times[-1]
+        segments = []
+        if first_keyframe - start_time > KEYFRAME_SNAP_SECS:
+            segments.append((start_time, first_keyframe, False))
+        segments.append((first_keyframe, last_keyframe, True))
+        if end_time - last_keyframe > KEYFRAME_SNAP_SECS:
+            segments.append((last_keyframe, end_time, False))
+        return segments
+
+    def _smart_cut(
+        self,
+        media_file: TemporalMediaFile,
+        start_time: float,
+        end_time: float,
+        segments: list[tuple[float, float, bool]],
+        encoder: str,
+        trimmed_media_file_path: str,
+        temp_dir: str,
+        audio_codec: str,
+        crf: str,
+        preset: str,
+        num_threads: str,
+    ) -> bool:
+        """
+        Writes a smart-cut clip: exports each video segment, concatenates them and
+        muxes the result with the clip's re-encoded audio.
+
+        Returns
+        -------
+        bool
+            True if successful, False otherwise (including when a re-encoded
+            segment can't be joined to the stream-copied video).
+        """
+        probe = media_file.get_probe()
+        annexb_filter = SMART_CUT_ANNEXB_FILTERS.get(
+            probe.get_stream_field("v:0", "codec_name")
+        )
+        encode_options = self._get_smart_cut_encode_options(probe, encoder, crf, preset)
+        copy_options = ["-c:v", "copy"]
+        if annexb_filter is not None:
+            # every segment carries its own parameter sets
+            extension = ".ts"
+            copy_options.extend(["-bsf:v", annexb_filter])
+            source_extradata = None
+        else:
+            _, extension = os.path.splitext(trimmed_media_file_path)
+            time_base = probe.get_stream_field("v:0", "time_base")
+            if time_base is not None and "/" in time_base:
+                encode_options.extend(
+                    ["-video_track_timescale", time_base.split("/")[1]]
+                )
+            source_extradata = probe_video_extradata(media_file.path)
+            if source_extradata is None:
+                return False
+
+        segment_paths = []
+        for i, (segment_start, segment_end, copy) in enumerate(segments):
+            segment_path = os.path.join(temp_dir, f"segment{i}{extension}")
+            ffmpeg_command = [
+                "ffmpeg", "-y", "-ss", seconds_to_hms_time_format(segment_start),
+                *self._get_input_thread_options(num_threads),
+                "-i", media_file.path,
+                "-t", seconds_to_hms_time_format(segment_end - segment_start),
+                "-map", "0:v:0", "-an", "-threads", num_threads,
+            ]
+            ffmpeg_command.extend(copy_options if copy else encode_options)
+            ffmpeg_command.append(segment_path)
+            description = f"exporting segment {i} of '{media_file.path}'"
+            if not self._run_ffmpeg(ffmpeg_command, description):
+                return False
+            # with other parameter sets the copied video would decode as garbage
+            if (
+                not copy
+                and source_extradata is not None
+                and probe_video_extradata(segment_path) != source_extradata
+            ):
+                logging.debug(
+                    f"Re-encoded segment {i} of '{media_file.path}' doesn't have the "
+                    "source's codec parameters, so it can't be joined to copied video."
+                )
+                return False
+            segment_paths.append(segment_path)
+
+        concat_list_path = os.path.join(temp_dir, "segments.txt")
+        with open(concat_list_path, "w") as f:
+            for segment_path in segment_paths:
+                f.write(f"file '{segment_path}'\n")
+        video_path = os.path.join(temp_dir, f"video{extension}")
+        ffmpeg_command = [
+            "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", concat_list_path,
+            "-c", "copy", video_path,
+        ]
+        description = f"concatenating segments of '{media_file.path}'"
+        if not self._run_ffmpeg(ffmpeg_command, description):
+            return False
+
+        ffmpeg_command = [
+            "ffmpeg", "-y", "-i", video_path,
+            "-ss", seconds_to_hms_time_format(start_time),
+            "-t", seconds_to_hms_time_format(end_time - start_time),
+            "-i", media_file.path,
+            "-map", "0:v:0", "-map", "1:a?", "-c:v", "copy", "-c:a", audio_codec,
+            "-threads", num_threads, trimmed_media_file_path,
+        ]
+        description = f"muxing the smart-cut clip of '{media_file.path}'"
+        return self._run_ffmpeg(ffmpeg_command, description)
+
+    def _get_smart_cut_encode_options(
+        self,
+        probe,
+        encoder: str,
+        crf: str,
+        preset: str,
+    ) -> list[str]:
+        """
+        Returns the ffmpeg options re-encoding smart-cut segments with the source
+        video's stream parameters.
+
+        Parameters
+        ----------
+        probe : MediaProbe
+            The probe of the source media file.
+        encoder : str
+            The encoder of the re-encoded segments.
+        crf : str
+            Constant rate factor for video quality.
+        preset : str
+            Preset for encoding speed and compression.
+
+        Returns
+        -------
+        list[str]
+            The ffmpeg output options.
+        """
+        encode_options = ["-c:v", encoder, "-preset", preset, "-crf", crf]
+        profile = SMART_CUT_PROFILES.get(encoder, {}).get(
+            probe.get_stream_field("v:0", "profile")
+        )
+        if profile is not None:
+            encode_options.extend(["-profile:v", profile])
+        level = probe.get_stream_field("v:0", "level")
+        # ffprobe reports H.264 levels as level_idc (e.g. 41 for level 4.1), which
+        # x264 accepts as is
+        if encoder == "libx264" and level is not None and int(level) > 0:
+            encode_options.extend(["-level", level])
+        pix_fmt = probe.get_stream_field("v:0", "pix_fmt")
+        if pix_fmt is not None:
+            encode_options.extend(["-pix_fmt", pix_fmt])
+        return encode_options
+
+    def _get_input_thread_options(self, num_threads: str) -> list[str]:
+        """
+        Returns the ffmpeg options capping the threads that decode the next input
+        and run the filters to `num_threads`, so a job given a number of cores
+        (e.g. by a RenderScheduler) stays within them and not only while encoding.
+        With "0", ffmpeg chooses the thread counts.
+        """
+        if num_threads == "0":
+            return []
+        return ["-filter_threads", num_threads, "-threads", num_threads]
+
+    def _run_ffmpeg(self, ffmpeg_command: list[str], description: str) -> bool:
+        """
+        Runs an ffmpeg command, logging its output if it fails.
+
+        Parameters
+        ----------
+        ffmpeg_command : list[str]
+            The command to run.
+        description : str
+            What the command does, for the error message.
+
+        Returns
+        -------
+        bool
+            True if successful, False otherwise.
+        """
+        result = subprocess.run(ffmpeg_command, capture_output=True, text=True)
+        if result.returncode != SUCCESS:
+            msg = (
+                f"Terminal return code: '{result.returncode}'\n"
+                f"Output: '{result.stdout}'\n"
+                f"Err Output: '{result.stderr}'\n"
+            )
+            logging.error(f"Failed {description}. Details: {msg}")
+            return False
+        return True
+
+    def render_crops(
+        self,
+        video_file: VideoFile,
+        crops: Crops,
+        rendered_video_file_path: str,
+        start_time: float = None,
+        end_time: float = None,
+        overwrite: bool = True,
+        video_codec: str = "libx264",
+        audio_codec: str = "aac",
+        crf: str = "23",
+        preset: str = "medium",
+        num_threads: str = "0",
+    ) -> VideoFile | None:
+        """
+        Renders a video reframed by a Crops timeline in a single decode/encode pass.
+        A sendcmd filter moves one crop filter to each segment's crop position when
+        the segment starts. The commands are read from a file, so the command line
+        doesn't grow with the number of segments.
+
+        Parameters
+        ----------
+        video_file : VideoFile
+            The video file to reframe.
+        crops : Crops
+            The crop size and the crop position of each segment, e.g. as returned by
+            `resize()`. Segment times are relative to the start of the video file.
+        rendered_video_file_path : str
+            Path to save the reframed video to.
+        start_time, end_time : Optional[float]
+            Start and end time in seconds of the part of the video to render. The
+            whole video is rendered by default.
+        overwrite : bool
+            Whether to overwrite the existing file at `rendered_video_file_path`.
+        video_codec, audio_codec : str
+            Codecs used for the video and audio streams.
+        crf : str
+            Constant rate factor for video quality.
+        preset : str
+            Preset for encoding speed and compression.
+        num_threads : str
+            The number of threads to use for decoding, filtering and encoding. "0"
+            lets ffmpeg choose.
+
+        Returns
+        -------
+        VideoFile | None
+            The reframed video file, None if unsuccessful.
+        """
+        self.assert_valid_media_file(video_file, VideoFile)
+        self._type_checker.assert_type(crops, "crops", Crops)
+        if overwrite:
+            self._file_system_manager.assert_parent_dir_exists(
+                MediaFile(rendered_video_file_path)
+            )
+        else:
+            self._file_system_manager.assert_valid_path_for_new_fs_object(
+                rendered_video_file_path
+            )
+        self._file_system_manager.assert_paths_not_equal(
+            video_file.path,
+            rendered_video_file_path,
+            "video_file path",
+            "rendered_video_file_path",
+        )
+        self._assert_valid_trim_times(video_file, start_time, end_time)
+        if len(crops.segments) == 0:
+            raise MediaEditorError("Can't render crops without segments.")
+        if (
+            crops.crop_width > crops.original_width
+            or crops.crop_height > crops.original_height
+        ):
+            raise MediaEditorError(
+                f"Crop size {crops.crop_width}x{crops.crop_height} exceeds the "
+                f"original size {crops.original_width}x{crops.original_height}."
+            )
+
+        # with input seeking, frame times start at 0 at `start_time`
+        offset = start_time or 0
+        segments = sorted(crops.segments, key=lambda segment: segment.start_time)
+        positions = [(segment.x, segment.y) for segment in segments]
+        segment_starts = [segment.start_time - offset for segment in segments]
+        (x, y), crop_commands = self._build_crop_commands(positions, segment_starts)
+
+        ffmpeg_command = ["ffmpeg", "-y"]
+        if start_time is not None:
+            ffmpeg_command.extend(["-ss", seconds_to_hms_time_format(start_time)])
+        if end_time is not None:
+            ffmpeg_command.extend(["-t", seconds_to_hms_time_format(end_time - offset)])
+
+        temp_parent_dir = os.path.dirname(rendered_video_file_path)
+        with tempfile.TemporaryDirectory(dir=temp_parent_dir) as temp_dir:
+            crop_commands_path = os.path.join(temp_dir, "crop_commands.txt")
+            with open(crop_commands_path, "w") as f:
+                f.write(crop_commands)
+            video_filter = (
+                f"sendcmd=f='{crop_commands_path}',"
+                f"crop=w={crops.crop_width}:h={crops.crop_height}:x={x}:y={y}"
+            )
+            ffmpeg_command.extend(self._get_input_thread_options(num_threads))
+            ffmpeg_command.extend([
+                "-i", video_file.path, "-vf", video_filter,
+                "-map", "0:v:0", "-map", "0:a?",
+                "-c:v", video_codec, "-preset", preset, "-crf", crf,
+                "-c:a", audio_codec, "-threads", num_threads,
+                rendered_video_file_path,
+            ])
+            success = self._run_ffmpeg(
+                ffmpeg_command,
+                f"rendering crops of '{video_file.path}' to "
+                f"'{rendered_video_file_path}'",
+            )
+        if not success:
+            return None
+        rendered_video_file = self._create_media_file_of_same_type(
+            rendered_video_file_path, video_file
+        )
+        rendered_video_file.assert_exists()
+        return rendered_video_file
+
+    def _build_crop_commands(
+        self,
+        positions: list[tuple[int, int]],
+        start_times: list[float],
+    ) -> tuple[tuple[int, int], str]:
+        """
+        Builds the sendcmd commands moving a crop filter to `positions[i]` at
+        `start_times[i]`, for frame times starting at 0.
+
+        Parameters
+        ----------
+        positions : list[tuple[int, int]]
+            The (x, y) crop position of each segment.
+        start_times : list[float]
+            The sorted start time in seconds of each segment.
+
+        Returns
+        -------
+        tuple[tuple[int, int], str]
+            The crop position at time 0 (the first segment's position also holds
+            before it starts) and the commands for every later change of position.
+        """
+        initial_position = positions[0]
+        for position, start_time in zip(positions, start_times):
+            if start_time > 0:
+                break
+            initial_position = position
+
+        commands = []
+        previous_position = initial_position
+        for (x, y), start_time in zip(positions, start_times):
+            if start_time <= 0 or (x, y) == previous_position:
+                continue
+            commands.append(f"{start_time:.6f} crop x {x}, crop y {y};\n")
+            previous_position = (x, y)
+        return initial_position, "".join(commands)
+
     def copy_temporal_media_file(
         self,
         media_file: TemporalMediaFile,
@@ -155,7 +915,8 @@ class MediaEditor:
         preset : str
             Preset for encoding speed and compression.
         num_threads : str
-            The number of threads to use for encoding.
+            The number of threads to use for decoding, filtering and encoding. "0" lets
+            ffmpeg choose.
 
         Returns
         -------
@@ -281,6 +1042,58 @@ class MediaEditor:
             crop_height
         )
 
+    def assert_valid_media_file(
+        self,
+        media_file: MediaFile,
+        media_file_type: type,
+    ) -> None:
+        """
+        Raises an error if the media file isn't of the given type or doesn't exist.
+
+        Parameters
+        ----------
+        media_file : MediaFile
+            The media file to validate.
+        media_file_type : type
+            The expected type of the media file.
+        """
+        self._type_checker.assert_type(media_file, "media_file", media_file_type)
+        media_file.assert_exists()
+
+    def _assert_valid_trim_times(
+        self,
+        media_file: TemporalMediaFile,
+        start_time: float | None,
+        end_time: float | None,
+    ) -> None:
+        """
+        Raises an error if the trim times aren't within the media file's duration.
+        Times that are None aren't checked.
+
+        Parameters
+        ----------
+        media_file : TemporalMediaFile
+            The media file to trim.
+        start_time : float | None
+            The start time in seconds.
+        end_time : float | None
+            The end time in seconds.
+        """
+        if start_time is not None and start_time < 0:
+            raise MediaEditorError(f"Start time '{start_time}' must be non-negative.")
+        if start_time is not None and end_time is not None and start_time >= end_time:
+            raise MediaEditorError(
+                f"Start time '{start_time}' must be less than end time '{end_time}'."
+            )
+        if end_time is None:
+            return
+        duration = media_file.get_duration()
+        if duration != -1 and end_time > duration + TRIM_TIME_TOLERANCE_SECS:
+            raise MediaEditorError(
+                f"End time '{end_time}' exceeds the duration '{duration}' of media "
+                f"file '{media_file.path}'."
+            )
+
     def _create_media_file_of_same_type(
         self,
         file_path_to_create_media_file_from: str,
@@ -301,14 +1114,15 @@ class MediaEditor:
         MediaFile
             A new MediaFile object of the same type as `media_file_to_copy_type_of`.
         """
-        if isinstance(media_file_to_copy_type_of, VideoFile):
+        # AudioVideoFile subclasses both AudioFile and VideoFile, so it's checked first
+        if isinstance(media_file_to_copy_type_of, AudioVideoFile):
+            return AudioVideoFile(file_path_to_create_media_file_from)
+        elif isinstance(media_file_to_copy_type_of, VideoFile):
             return VideoFile(file_path_to_create_media_file_from)
         elif isinstance(media_file_to_copy_type_of, AudioFile):
             return AudioFile(file_path_to_create_media_file_from)
         elif isinstance(media_file_to_copy_type_of, ImageFile):
             return ImageFile(file_path_to_create_media_file_from)
-        elif isinstance(media_file_to_copy_type_of, AudioVideoFile):
-            return AudioVideoFile(file_path_to_create_media_file_from)
         else:
             raise MediaEditorError("Unsupported media file type.")
         
@@ -74,3 +74,11 @@ class NoVideoStreamError(VideoFileError):
     Inherits from VideoFileError.
     """
     pass
+
+
+class RenderSchedulerError(MediaEditorError):
+    """
+    Exception raised when a render job can't be scheduled or failed after every retry.
+    Inherits from MediaEditorError.
+    """
+    pass
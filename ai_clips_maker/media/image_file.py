@@ -52,8 +52,7 @@ class ImageFile(MediaFile):
             return error_msg
 
         # Ensure the file is specifically an image file
-        media_file = MediaFile(self._path)
-        if media_file.has_audio_stream():
+        if self.has_audio_stream():
             return f"'{self._path}' is a valid media file but contains audio, making it invalid as an ImageFile."
 
         return None
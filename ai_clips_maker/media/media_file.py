@@ -2,15 +2,14 @@
 Handles general media file operations (audio, video, image).
 """
 
-import json
 import logging
-import subprocess
 
+from ai_clips_maker.filesys.exceptions import FileSystemObjectError
 from ai_clips_maker.filesys.file import File
 from ai_clips_maker.filesys.manager import FileSystemManager
 from .exceptions import NoAudioStreamError, NoVideoStreamError
+from .probe import MediaProbe, get_stat_key
 
-SUCCESS = 0
 FALSE = 0
 
 
@@ -22,6 +21,9 @@ class MediaFile(File):
     def __init__(self, media_path: str) -> None:
         super().__init__(media_path)
         self._fs_manager = FileSystemManager()
+        self._probe = None
+        # (path, inode, size, mtime) of the file when it last passed `check_exists`
+        self._valid_stat_key = None
 
     def get_type(self) -> str:
         return "MediaFile"
@@ -38,31 +40,68 @@ class MediaFile(File):
             )
         return None
 
-    def get_format_info(self, field: str) -> str | None:
-        self.assert_exists()
-        result = subprocess.run(
-            ["ffprobe", "-v", "error", "-show_entries", f"format={field}",
-             "-of", "default=noprint_wrappers=1:nokey=1", self._path],
-            capture_output=True, text=True
-        )
-        info = result.stdout.strip()
-        if result.returncode != SUCCESS or not info:
-            logging.error(f"ffprobe format query failed: {result.stderr.strip()}")
+    def assert_exists(self) -> None:
+        msg = self._check_exists_memoized()
+        if msg:
+            logging.error(msg)
+            raise FileSystemObjectError(msg)
+
+    def exists(self) -> bool:
+        return self._check_exists_memoized() is None
+
+    def _check_exists_memoized(self) -> str | None:
+        """
+        Runs `check_exists` unless the file passed it before and hasn't changed
+        (path, inode, size or modification time) since.
+        """
+        stat_key = get_stat_key(self._path)
+        if stat_key is not None and (self._path, *stat_key) == self._valid_stat_key:
             return None
+        msg = self.check_exists()
+        if msg is None and stat_key is not None:
+            self._valid_stat_key = (self._path, *stat_key)
+        else:
+            self._valid_stat_key = None
+        return msg
+
+    def get_probe(self) -> MediaProbe:
+        """
+        Returns the file's format and stream information. The file is probed once
+        and probed again only if it changed (path, inode, size or modification time).
+        """
+        self.assert_exists()
+        return self._load_probe()
+
+    def _load_probe(self) -> MediaProbe:
+        """
+        Returns the file's probe without validating the file's media type, so the
+        stream getters can be used by `check_exists`.
+        """
+        msg = File.check_exists(self)
+        if msg:
+            logging.error(msg)
+            raise FileSystemObjectError(msg)
+        if (
+            self._probe is None
+            or self._probe.path != self._path
+            or self._probe.is_stale()
+        ):
+            self._probe = MediaProbe(self._path)
+        return self._probe
+
+    def get_format_info(self, field: str) -> str | None:
+        info = self.get_probe().get_format_field(field)
+        if info is None:
+            logging.error(f"Format field '{field}' not found for '{self._path}'.")
         return info
 
     def get_stream_info(self, stream: str, field: str) -> str | None:
-        self.assert_exists()
-        result = subprocess.run(
-            ["ffprobe", "-v", "quiet", "-select_streams", stream,
-             "-show_entries", f"stream={field}",
-             "-of", "default=noprint_wrappers=1:nokey=1", self._path],
-            capture_output=True, text=True
-        )
-        info = result.stdout.strip()
-        if result.returncode != SUCCESS:
-            logging.error(f"ffprobe stream query failed: {result.stderr.strip()}")
-            return None
+        info = self.get_probe().get_stream_field(stream, field)
+        if info is None:
+            logging.error(
+                f"Stream field '{field}' of stream '{stream}' not found for "
+                f"'{self._path}'."
+            )
         return info
 
     def get_path(self) -> str:
@@ -70,23 +109,13 @@ class MediaFile(File):
         return self._path
 
     def get_streams(self) -> list[dict]:
-        self.assert_exists()
-        result = subprocess.run(
-            ["ffprobe", "-v", "quiet", "-print_format", "json",
-             "-show_streams", self._path],
-            capture_output=True, text=True
-        )
-        if result.returncode != SUCCESS:
-            logging.error(f"ffprobe stream retrieval failed: {result.stderr.strip()}")
-            return []
-
-        return json.loads(result.stdout).get("streams", [])
+        return self._load_probe().streams
 
     def get_audio_streams(self) -> list[dict]:
-        return [s for s in self.get_streams() if s.get("codec_type") == "audio"]
+        return self._load_probe().audio_streams
 
     def get_video_streams(self) -> list[dict]:
-        return [s for s in self.get_streams() if s.get("codec_type") == "video"]
+        return self._load_probe().video_streams
 
     def check_has_audio_stream(self) -> str | None:
         if not self.get_audio_streams():
@@ -0,0 +1,331 @@
+"""
+Probing media files for their format and stream information.
+"""
+# standard library imports
+import json
+import logging
+import os
+import subprocess
+
+# 3rd party imports
+import av
+
+SUCCESS = 0
+# ffprobe stream specifier letters and the codec types they select
+STREAM_TYPES = {
+    "a": "audio",
+    "v": "video",
+    "s": "subtitle",
+    "d": "data",
+    "t": "attachment",
+}
+
+
+class MediaProbe:
+    """
+    Format and stream information of a media file, read with a single ffprobe call.
+
+    The information describes the file as it was when probed. Use `is_stale` to
+    check whether the file changed (inode, size or modification time) since.
+    """
+
+    def __init__(self, media_path: str) -> None:
+        """
+        Probes a media file.
+
+        Parameters
+        ----------
+        media_path: str
+            Absolute path to the media file.
+        """
+        self._path = media_path
+        self._stat_key = get_stat_key(media_path)
+        self._format = {}
+        self._streams = []
+
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-print_format",
+                "json",
+                "-show_format",
+                "-show_streams",
+                media_path,
+            ],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != SUCCESS:
+            logging.error(
+                f"ffprobe failed for '{media_path}': {result.stderr.strip()}"
+            )
+            return
+        info = json.loads(result.stdout or "{}")
+        self._format = info.get("format", {})
+        self._streams = info.get("streams", [])
+
+    @property
+    def path(self) -> str:
+        """Returns the path of the probed media file."""
+        return self._path
+
+    @property
+    def format(self) -> dict:
+        """Returns ffprobe's format information."""
+        return self._format
+
+    @property
+    def streams(self) -> list[dict]:
+        """Returns ffprobe's information on every stream."""
+        return self._streams
+
+    @property
+    def audio_streams(self) -> list[dict]:
+        """Returns the information on every audio stream."""
+        return [s for s in self._streams if s.get("codec_type") == "audio"]
+
+    @property
+    def video_streams(self) -> list[dict]:
+        """Returns the information on every video stream."""
+        return [s for s in self._streams if s.get("codec_type") == "video"]
+
+    @property
+    def duration(self) -> float | None:
+        """Returns the duration of the media in seconds, None if unknown."""
+        return _to_float(self._format.get("duration"))
+
+    @property
+    def start_time(self) -> float:
+        """
+        Returns the container's start time in seconds, 0 if unknown. Stream
+        timestamps (e.g. keyframe times) are offset by it, while ffmpeg's seek
+        times are relative to it.
+        """
+        return _to_float(self._format.get("start_time")) or 0.0
+
+    @property
+    def width(self) -> int | None:
+        """Returns the width in pixels of the first video stream."""
+        return _to_int(self.get_stream_field("v:0", "width"))
+
+    @property
+    def height(self) -> int | None:
+        """Returns the height in pixels of the first video stream."""
+        return _to_int(self.get_stream_field("v:0", "height"))
+
+    @property
+    def frame_rate(self) -> float | None:
+        """Returns the frame rate of the first video stream."""
+        frame_rate = self.get_stream_field("v:0", "r_frame_rate")
+        if frame_rate is None:
+            return None
+        numerator, denominator = map(int, frame_rate.split("/"))
+        if denominator == 0:
+            return None
+        return numerator / denominator
+
+    @property
+    def video_bit_rate(self) -> int | None:
+        """Returns the bit rate in bits per second of the first video stream."""
+        return _to_int(self.get_stream_field("v:0", "bit_rate"))
+
+    @property
+    def audio_bit_rate(self) -> int | None:
+        """Returns the bit rate in bits per second of the first audio stream."""
+        return _to_int(self.get_stream_field("a:0", "bit_rate"))
+
+    def get_format_field(self, field: str) -> str | None:
+        """
+        Returns a format field as a string, None if it isn't available.
+
+        Parameters
+        ----------
+        field: str
+            The ffprobe format field, e.g. 'duration'.
+
+        Returns
+        -------
+        str | None
+        """
+        value = self._format.get(field)
+        return None if value is None else str(value)
+
+    def get_stream(self, stream: str) -> dict | None:
+        """
+        Returns the information on a stream, None if there is no such stream.
+
+        Parameters
+        ----------
+        stream: str
+            An ffprobe stream specifier: a stream type ('a', 'v', ...) optionally
+            followed by the index among streams of that type, e.g. 'v:0'. A bare
+            stream type selects the first stream of that type.
+
+        Returns
+        -------
+        dict | None
+        """
+        stream_type, _, index = stream.partition(":")
+        if stream_type not in STREAM_TYPES:
+            logging.error(f"Unsupported stream specifier '{stream}'.")
+            return None
+        streams = [
+            s for s in self._streams if s.get("codec_type") == STREAM_TYPES[stream_type]
+        ]
+        index = int(index) if index else 0
+        if index >= len(streams):
+            return None
+        return streams[index]
+
+    def get_stream_field(self, stream: str, field: str) -> str | None:
+        """
+        Returns a stream field as a string, None if it isn't available.
+
+        Parameters
+        ----------
+        stream: str
+            An ffprobe stream specifier, e.g. 'v:0' (see `get_stream`).
+        field: str
+            The ffprobe stream field, e.g. 'width'.
+
+        Returns
+        -------
+        str | None
+        """
+        stream_info = self.get_stream(stream)
+        if stream_info is None:
+            return None
+        value = stream_info.get(field)
+        return None if value is None else str(value)
+
+    def is_stale(self) -> bool:
+        """
+        Returns whether the file changed (inode, size or modification time) or was
+        removed since it was probed.
+
+        Returns
+        -------
+        bool
+        """
+        return get_stat_key(self._path) != self._stat_key
+
+
+def probe_keyframe_times(
+    media_path: str,
+    start_time: float,
+    end_time: float,
+) -> list[float] | None:
+    """
+    Returns the sorted times in seconds of the first video stream's keyframes between
+    `start_time` and `end_time` (inclusive). Only packet headers are read, nothing is
+    decoded.
+
+    Parameters
+    ----------
+    media_path: str
+        Absolute path to the media file.
+    start_time: float
+        Start of the interval in seconds.
+    end_time: float
+        End of the interval in seconds.
+
+    Returns
+    -------
+    list[float] | None
+        The keyframe times, None if ffprobe failed.
+    """
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-select_streams",
+            "v:0",
+            "-read_intervals",
+            f"{start_time}%{end_time}",
+            "-show_entries",
+            "packet=pts_time,flags",
+            "-of",
+            "csv=print_section=0",
+            media_path,
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != SUCCESS:
+        logging.error(
+            f"ffprobe keyframe query failed for '{media_path}': {result.stderr.strip()}"
+        )
+        return None
+
+    keyframe_times = set()
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(",")
+        pts_time = _to_float(pts_time)
+        if pts_time is None or "K" not in flags:
+            continue
+        if start_time <= pts_time <= end_time:
+            keyframe_times.add(pts_time)
+    return sorted(keyframe_times)
+
+
+def probe_video_extradata(media_path: str) -> bytes | None:
+    """
+    Returns the codec extradata of the first video stream (e.g. the SPS and PPS of
+    H.264 video in MP4), which stream-copied video needs to be decoded.
+
+    Parameters
+    ----------
+    media_path: str
+        Absolute path to the media file.
+
+    Returns
+    -------
+    bytes | None
+        The extradata, None if the file can't be read or has no video stream.
+    """
+    try:
+        with av.open(media_path) as container:
+            if len(container.streams.video) == 0:
+                return None
+            return bytes(container.streams.video[0].codec_context.extradata or b"")
+    except av.error.FFmpegError as e:
+        logging.error(f"Reading the video extradata of '{media_path}' failed: {e}")
+        return None
+
+
+def get_stat_key(path: str) -> tuple[int, int, int] | None:
+    """
+    Returns the (inode, size, modification time) of a file, None if it can't be
+    stat'ed. A file whose key didn't change is assumed to have the same content.
+
+    Parameters
+    ----------
+    path: str
+        Path to the file.
+
+    Returns
+    -------
+    tuple[int, int, int] | None
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _to_float(value) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
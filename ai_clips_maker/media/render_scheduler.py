@@ -0,0 +1,269 @@
+"""
+Running many ffmpeg render jobs concurrently within a CPU core budget.
+
+Notes
+-----
+- Every job is a callable that accepts a `num_threads` keyword argument, such as
+`MediaEditor.trim`. The scheduler sets it to the number of cores given to the job.
+MediaEditor caps ffmpeg's decoding, filtering and encoding threads to it.
+"""
+# standard library imports
+from collections.abc import Callable
+from concurrent.futures import Future
+import heapq
+import itertools
+import logging
+import os
+import threading
+
+# current package imports
+from .exceptions import RenderSchedulerError
+
+# cores given to a job when there are more jobs than cores
+DEFAULT_MIN_THREADS_PER_JOB = 2
+# encoders scale poorly beyond this many threads, so extra cores are better spent
+# on other jobs
+DEFAULT_MAX_THREADS_PER_JOB = 8
+DEFAULT_MAX_RETRIES = 1
+
+
+class _RenderJob:
+    """
+    A submitted render job and its state.
+    """
+
+    def __init__(
+        self,
+        render: Callable,
+        args: tuple,
+        kwargs: dict,
+        priority: int,
+    ) -> None:
+        self.render = render
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.future = Future()
+        self.num_attempts = 0
+
+
+class RenderScheduler:
+    """
+    Runs render jobs concurrently, splitting a budget of CPU cores between them.
+
+    Queued jobs start in order of priority (highest first), then submission. Each
+    job gets an equal share of the free cores among the queued jobs, clamped to
+    [`min_threads_per_job`, `max_threads_per_job`], and a job only starts when at
+    least `min_threads_per_job` cores are free. A job fails if it raises or returns
+    None (MediaEditor's way of reporting a failed ffmpeg call), and failed jobs are
+    retried up to `max_retries` times.
+    """
+
+    def __init__(
+        self,
+        max_cores: int = None,
+        min_threads_per_job: int = DEFAULT_MIN_THREADS_PER_JOB,
+        max_threads_per_job: int = DEFAULT_MAX_THREADS_PER_JOB,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        max_cores: int
+            Number of CPU cores shared by the running jobs. Defaults to the number
+            of CPUs of the machine.
+        min_threads_per_job: int
+            Minimum number of cores a job starts with.
+        max_threads_per_job: int
+            Maximum number of cores given to a job.
+        max_retries: int
+            Number of times a failed job is retried.
+        """
+        if max_cores is None:
+            max_cores = os.cpu_count() or 1
+        if max_cores < 1:
+            raise RenderSchedulerError(
+                f"max_cores must be positive, not '{max_cores}'."
+            )
+        if not 1 <= min_threads_per_job <= max_threads_per_job:
+            raise RenderSchedulerError(
+                f"Expected 1 <= min_threads_per_job <= max_threads_per_job, got "
+                f"'{min_threads_per_job}' and '{max_threads_per_job}'."
+            )
+        if max_retries < 0:
+            raise RenderSchedulerError(
+                f"max_retries must be non-negative, not '{max_retries}'."
+            )
+
+        self._max_cores = max_cores
+        # a job can always start on an idle machine, however few cores it has
+        self._min_threads_per_job = min(min_threads_per_job, max_cores)
+        self._max_threads_per_job = max_threads_per_job
+        self._max_retries = max_retries
+
+        self._queue = []
+        self._counter = itertools.count()
+        self._free_cores = max_cores
+        self._num_running = 0
+        self._shutdown = False
+        self._condition = threading.Condition()
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name="RenderScheduler", daemon=True
+        )
+        self._dispatcher.start()
+
+    @property
+    def max_cores(self) -> int:
+        """Returns the number of CPU cores shared by the running jobs."""
+        return self._max_cores
+
+    def submit(
+        self,
+        render: Callable,
+        *args,
+        priority: int = 0,
+        **kwargs,
+    ) -> Future:
+        """
+        Queues a render job.
+
+        Parameters
+        ----------
+        render: Callable
+            The function rendering the job, called as
+            `render(*args, num_threads=..., **kwargs)`.
+        priority: int
+            Jobs with a higher priority start first. Default is 0.
+
+        Returns
+        -------
+        Future
+            Resolves to the job's result, or raises RenderSchedulerError if it failed
+            after every retry.
+        """
+        if "num_threads" in kwargs:
+            raise RenderSchedulerError(
+                "num_threads is set by the scheduler and can't be passed to submit()."
+            )
+        job = _RenderJob(render, args, kwargs, priority)
+        with self._condition:
+            if self._shutdown:
+                raise RenderSchedulerError("Can't submit jobs after shutdown.")
+            self._push(job)
+            self._condition.notify_all()
+        return job.future
+
+    def shutdown(self, wait: bool = True, cancel_queued: bool = False) -> None:
+        """
+        Stops accepting jobs. Queued jobs still run unless `cancel_queued` is True.
+
+        Parameters
+        ----------
+        wait: bool
+            Whether to wait until every job finished.
+        cancel_queued: bool
+            Whether to cancel the jobs that haven't started.
+        """
+        with self._condition:
+            self._shutdown = True
+            if cancel_queued:
+                for _, _, job in self._queue:
+                    # jobs waiting for a retry are already running
+                    if not job.future.cancel():
+                        job.future.set_exception(
+                            RenderSchedulerError(
+                                f"Render job {job.render} was cancelled before "
+                                "its retry."
+                            )
+                        )
+                self._queue = []
+            self._condition.notify_all()
+        if wait:
+            self._dispatcher.join()
+
+    def __enter__(self) -> "RenderScheduler":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown(wait=True)
+
+    def _push(self, job: _RenderJob) -> None:
+        heapq.heappush(self._queue, (-job.priority, next(self._counter), job))
+
+    def _calc_num_threads(self, num_queued: int) -> int:
+        """
+        Returns the number of cores to give to the next of `num_queued` queued jobs.
+        Must be called with the lock held.
+        """
+        share = self._free_cores // num_queued
+        num_threads = max(
+            self._min_threads_per_job, min(share, self._max_threads_per_job)
+        )
+        return min(num_threads, self._free_cores)
+
+    def _dispatch(self) -> None:
+        """
+        Starts queued jobs as cores free up, until shut down with no queued or
+        running jobs (running jobs may be queued again for a retry).
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: (
+                        len(self._queue) > 0
+                        and self._free_cores >= self._min_threads_per_job
+                    )
+                    or (
+                        self._shutdown
+                        and len(self._queue) == 0
+                        and self._num_running == 0
+                    )
+                )
+                if len(self._queue) == 0:
+                    return
+                num_threads = self._calc_num_threads(len(self._queue))
+                _, _, job = heapq.heappop(self._queue)
+                if (
+                    job.num_attempts == 0
+                    and not job.future.set_running_or_notify_cancel()
+                ):
+                    continue
+                self._free_cores -= num_threads
+                self._num_running += 1
+            threading.Thread(
+                target=self._run, args=(job, num_threads), daemon=True
+            ).start()
+
+    def _run(self, job: _RenderJob, num_threads: int) -> None:
+        """
+        Runs a job, then retries it or resolves its future.
+        """
+        job.num_attempts += 1
+        result, error = None, None
+        try:
+            result = job.render(*job.args, num_threads=str(num_threads), **job.kwargs)
+        except Exception as e:
+            error = e
+
+        with self._condition:
+            self._free_cores += num_threads
+            self._num_running -= 1
+            failed = error is not None or result is None
+            if failed and job.num_attempts <= self._max_retries:
+                logging.warning(
+                    f"Render job {job.render} failed (attempt {job.num_attempts}), "
+                    f"retrying. Error: {error}"
+                )
+                self._push(job)
+            elif failed:
+                msg = (
+                    f"Render job {job.render} failed after "
+                    f"{job.num_attempts} attempts."
+                )
+                logging.error(msg)
+                exception = RenderSchedulerError(msg)
+                exception.__cause__ = error
+                job.future.set_exception(exception)
+            else:
+                job.future.set_result(result)
+            self._condition.notify_all()
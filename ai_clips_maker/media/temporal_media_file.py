@@ -48,8 +48,7 @@ class TemporalMediaFile(MediaFile):
         if msg is not None:
             return msg
 
-        media_file = MediaFile(self._path)
-        if not media_file.has_audio_stream() and not media_file.has_video_stream():
+        if not self.has_audio_stream() and not self.has_video_stream():
             return (
                 f"'{self._path}' is a valid {super().get_type()} but has neither audio "
                 f"nor video stream, so it is not a valid {self.get_type()}."
@@ -66,14 +65,12 @@ class TemporalMediaFile(MediaFile):
         float
             Duration in seconds. Returns -1 if unavailable.
         """
-        self.assert_exists()
-
-        duration_str = self.get_format_info("duration")
-        if duration_str is None:
+        duration = self.get_probe().duration
+        if duration is None:
             logging.error(f"Failed to retrieve duration for media file '{self._path}'.")
             return -1
 
-        return float(duration_str)
+        return duration
 
     def get_bitrate(self, stream: str) -> int | None:
         """
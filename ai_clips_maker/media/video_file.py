@@ -7,7 +7,6 @@ Notes
 """
 
 # standard library imports
-from functools import lru_cache
 import logging
 from math import floor
 from random import randint
@@ -67,19 +66,17 @@ class VideoFile(TemporalMediaFile):
         if msg is not None:
             return msg
 
-        temporal_media_file = TemporalMediaFile(self._path)
-        if temporal_media_file.has_video_stream() is False:
+        if self.has_video_stream() is False:
             return (
                 f"'{self._path}' is a valid {super().get_type()} but has no video stream, "
                 f"so it is not a valid video file."
             )
-        if temporal_media_file.is_video_only() is False:
+        if self.is_video_only() is False:
             return (
                 f"'{self._path}' is a valid {super().get_type()} but is not video-only. "
                 f"Use 'AudioVideoFile' for files containing both audio and video."
             )
 
-    @lru_cache(maxsize=1)
     def get_frame_rate(self) -> float:
         """
         Returns the frame rate of the video file.
@@ -89,11 +86,8 @@ class VideoFile(TemporalMediaFile):
         float
             The frame rate of the video file.
         """
-        frame_rate: str = self.get_stream_info("v:0", "r_frame_rate")
-        numerator, denominator = map(int, frame_rate.split("/"))
-        return numerator / denominator
+        return self.get_probe().frame_rate
 
-    @lru_cache(maxsize=1)
     def get_height_pixels(self) -> int:
         """
         Returns the height in pixels of the video file.
@@ -103,9 +97,8 @@ class VideoFile(TemporalMediaFile):
         int
             The height in pixels of the video file.
         """
-        return int(self.get_stream_info("v:0", "height"))
+        return self.get_probe().height
 
-    @lru_cache(maxsize=1)
     def get_width_pixels(self) -> int:
         """
         Returns the width in pixels of the video file.
@@ -115,9 +108,8 @@ class VideoFile(TemporalMediaFile):
         int
             The width in pixels of the video file.
         """
-        return int(self.get_stream_info("v:0", "width"))
+        return self.get_probe().width
 
-    @lru_cache(maxsize=1)
     def get_bitrate(self) -> int or None:
         """
         Returns the bitrate in bits per second of the video file.
@@ -127,7 +119,7 @@ class VideoFile(TemporalMediaFile):
         int
             The bitrate in bits per second of the video file.
         """
-        return int(self.get_stream_info("v:0", "bit_rate"))
+        return self.get_probe().video_bit_rate
 
     def extract_frame(
         self,
@@ -158,14 +150,14 @@ class VideoFile(TemporalMediaFile):
         """
         self.assert_exists()
         if overwrite is True:
-            self._filesys_manager.assert_parent_dir_exists(
+            self._fs_manager.assert_parent_dir_exists(
                 ImageFile(dest_image_file_path)
             )
         else:
-            self._filesys_manager.assert_valid_path_for_new_fs_object(
+            self._fs_manager.assert_valid_path_for_new_fs_object(
                 dest_image_file_path
             )
-        self._filesys_manager.assert_paths_not_equal(
+        self._fs_manager.assert_paths_not_equal(
             self.path,
             dest_image_file_path,
             "video_file path",
@@ -0,0 +1,191 @@
+"""
+Persistent on-disk cache of face detections.
+
+Face detections only depend on the content of a video frame, the resolution the
+frame is analyzed at and the face detector's configuration. Caching them lets
+repeated resizes of the same video (e.g. to different aspect ratios) skip face
+detection for every frame that was already analyzed.
+"""
+# standard library imports
+import hashlib
+import logging
+import os
+import sqlite3
+from typing import Optional
+
+# 3rd party imports
+import numpy as np
+
+# number of bytes read from each sampled region of a file when hashing it
+HASH_CHUNK_BYTES = 1024 * 1024
+# number of evenly spaced regions of a file that are hashed
+HASH_NUM_CHUNKS = 8
+# maximum number of parameters of an SQLite statement in SQLite < 3.32
+SQLITE_MAX_VARIABLES = 999
+
+
+class FaceDetectionCache:
+    """
+    A SQLite-backed cache of face detections keyed by (hash of the video file,
+    frame pts, face detection width, face detector configuration).
+
+    The video hash is not a hash of the whole file: it covers the file's size and
+    HASH_NUM_CHUNKS evenly spaced regions of HASH_CHUNK_BYTES (8 x 1 MiB), so two
+    files of the same size that only differ outside those regions share cached
+    detections.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Parameters
+        ----------
+        db_path: str
+            Path to the SQLite database file. The file is created if it doesn't
+            exist.
+        """
+        self._db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS face_detections ("
+                "video_hash TEXT NOT NULL, "
+                "pts INTEGER NOT NULL, "
+                "detect_width INTEGER NOT NULL, "
+                "detector_config TEXT NOT NULL, "
+                "detection BLOB, "
+                "PRIMARY KEY (video_hash, pts, detect_width, detector_config))"
+            )
+        # content hashes of the files seen so far keyed by (path, size, mtime)
+        self._video_hashes = {}
+
+    @property
+    def db_path(self) -> str:
+        """Returns the path to the SQLite database file."""
+        return self._db_path
+
+    def get_video_hash(self, video_path: str) -> str:
+        """
+        Returns a hash of a video file's size and of HASH_NUM_CHUNKS evenly spaced
+        regions of HASH_CHUNK_BYTES of its content (the whole content for small
+        files), so large files are hashed quickly. It is not a full content hash.
+
+        Parameters
+        ----------
+        video_path: str
+            Path to the video file.
+
+        Returns
+        -------
+        str
+            The hex digest of the file's content hash.
+        """
+        stat = os.stat(video_path)
+        key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns)
+        if key in self._video_hashes:
+            return self._video_hashes[key]
+
+        hasher = hashlib.sha256(str(stat.st_size).encode())
+        with open(video_path, "rb") as f:
+            if stat.st_size <= HASH_CHUNK_BYTES * HASH_NUM_CHUNKS:
+                hasher.update(f.read())
+            else:
+                step = (stat.st_size - HASH_CHUNK_BYTES) // (HASH_NUM_CHUNKS - 1)
+                for i in range(HASH_NUM_CHUNKS):
+                    f.seek(i * step)
+                    hasher.update(f.read(HASH_CHUNK_BYTES))
+
+        video_hash = hasher.hexdigest()
+        self._video_hashes[key] = video_hash
+        return video_hash
+
+    def get_many(
+        self,
+        video_hash: str,
+        frame_pts: list[int],
+        detect_width: int,
+        detector_config: str,
+    ) -> dict[int, Optional[np.ndarray]]:
+        """
+        Looks up the cached face detections of several frames of a video.
+
+        Parameters
+        ----------
+        video_hash: str
+            Content hash of the video file (see `get_video_hash`).
+        frame_pts: list[int]
+            Presentation timestamps of the frames to look up.
+        detect_width: int
+            Width (in pixels) of the frames the faces were detected in.
+        detector_config: str
+            Description of the face detector's configuration.
+
+        Returns
+        -------
+        dict[int, Optional[np.ndarray]]
+            The cached face detections keyed by frame pts. Frames that are not
+            cached are missing; frames without faces map to None.
+        """
+        detections = {}
+        unique_pts = list(set(frame_pts))
+        # one query per chunk of frames, within SQLite's limit on parameters
+        chunk_size = SQLITE_MAX_VARIABLES - 3
+        for start in range(0, len(unique_pts), chunk_size):
+            chunk = unique_pts[start:start + chunk_size]
+            rows = self._conn.execute(
+                "SELECT pts, detection FROM face_detections WHERE video_hash = ? "
+                "AND detect_width = ? AND detector_config = ? "
+                "AND pts IN ({})".format(", ".join("?" * len(chunk))),
+                (video_hash, detect_width, detector_config, *chunk),
+            )
+            for pts, detection in rows:
+                if detection is None:
+                    detections[pts] = None
+                else:
+                    detections[pts] = (
+                        np.frombuffer(detection, dtype=np.int16).reshape(-1, 4).copy()
+                    )
+        return detections
+
+    def put_many(
+        self,
+        video_hash: str,
+        frame_pts: list[int],
+        detect_width: int,
+        detector_config: str,
+        detections: list[Optional[np.ndarray]],
+    ) -> None:
+        """
+        Stores the face detections of several frames of a video.
+
+        Parameters
+        ----------
+        video_hash: str
+            Content hash of the video file (see `get_video_hash`).
+        frame_pts: list[int]
+            Presentation timestamps of the frames.
+        detect_width: int
+            Width (in pixels) of the frames the faces were detected in.
+        detector_config: str
+            Description of the face detector's configuration.
+        detections: list[Optional[np.ndarray]]
+            The (N, 4) face bounding boxes of each frame, or None if the frame has
+            no faces.
+        """
+        rows = []
+        for pts, detection in zip(frame_pts, detections):
+            blob = None
+            if detection is not None:
+                blob = np.ascontiguousarray(detection, dtype=np.int16).tobytes()
+            rows.append((video_hash, pts, detect_width, detector_config, blob))
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO face_detections VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        logging.debug("Cached face detections of {} frames.".format(len(rows)))
+
+    def close(self) -> None:
+        """
+        Closes the connection to the database.
+        """
+        self._conn.close()
@@ -27,6 +27,7 @@ def resize(
     scene_merge_threshold: float = 0.25,
     time_precision: int = 6,
     device: str = None,
+    face_detection_cache_path: str = None,
 ) -> Crops:
     """
     Resizes a video to the specified aspect ratio by aligning speaker diarization,
@@ -60,6 +61,9 @@ def resize(
         Decimal precision for timestamps. Default is 6.
     device : str, optional
         PyTorch device to use. E.g., 'cuda' or 'cpu'. If None, auto-detected.
+    face_detection_cache_path : str, optional
+        SQLite database to cache face detections in, so resizing the same video to
+        other aspect ratios skips face detection. If None, nothing is cached.
 
     Returns
     -------
@@ -91,6 +95,7 @@ def resize(
         face_detect_margin=face_detect_margin,
         face_detect_post_process=face_detect_post_process,
         device=device,
+        face_detection_cache_path=face_detection_cache_path,
     )
     crops = resizer.resize(
         video_file=media,
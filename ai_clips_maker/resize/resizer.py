@@ -7,14 +7,17 @@ Notes
 """
 # standard library imports
 import logging
+import math
+from typing import Optional
 
 # current package imports
 from .crops import Crops
+from .detection_cache import FaceDetectionCache
 from .exceptions import ResizerError
 from .img_proc import calc_img_bytes
 from .rect import Rect
 from .segment import Segment
-from .vid_proc import extract_frames
+from .vid_proc import LazyRGBFrame, stream_frames
 
 # local package imports
 from ai_clips_maker.media.editor import MediaEditor
@@ -23,13 +26,21 @@ from ai_clips_maker.utils import pytorch
 from ai_clips_maker.utils.conversions import bytes_to_gibibytes
 
 # 3rd party imports
-import cv2
-from facenet_pytorch import MTCNN
-import mediapipe as mp
+# facenet_pytorch, mediapipe and sklearn are imported where they're used, as
+# importing them takes seconds
 import numpy as np
-from sklearn.cluster import KMeans
 import torch
 
+# maximum number of frames passed to the face detector at once
+FACE_DETECT_MICRO_BATCH_SIZE = 16
+# face mesh landmarks of the inner lips, paired top to bottom, and the mouth corners
+UPPER_INNER_LIP_LANDMARKS = [95, 88, 178, 87, 14, 317, 402, 318, 324]
+LOWER_INNER_LIP_LANDMARKS = [191, 80, 81, 82, 13, 312, 311, 310, 415]
+MOUTH_CORNER_LANDMARKS = [308, 78]
+MOUTH_LANDMARKS = (
+    UPPER_INNER_LIP_LANDMARKS + LOWER_INNER_LIP_LANDMARKS + MOUTH_CORNER_LANDMARKS
+)
+
 
 class Resizer:
     """
@@ -42,6 +53,7 @@ class Resizer:
         face_detect_margin: int = 20,
         face_detect_post_process: bool = False,
         device: str = None,
+        face_detection_cache_path: str = None,
     ) -> None:
         """
         Initializes the Resizer with specific configurations for face
@@ -61,12 +73,20 @@ class Resizer:
         device: str, optional
             PyTorch device to perform computations on. Ex: 'cpu', 'cuda'. Default is
             None (auto detects the correct device)
+        face_detection_cache_path: str, optional
+            Path to a SQLite database to cache face detections in. Face detections
+            of frames that were already analyzed (e.g. when resizing the same video
+            to another aspect ratio) are read from the cache instead of being
+            detected again. Default is None (no caching).
         """
         if device is None:
             device = pytorch.get_compute_device()
         pytorch.assert_compute_device_available(device)
         logging.debug("FaceNet using device: {}".format(device))
 
+        from facenet_pytorch import MTCNN
+        import mediapipe as mp
+
         self._face_detector = MTCNN(
             margin=face_detect_margin,
             post_process=face_detect_post_process,
@@ -75,6 +95,9 @@ class Resizer:
         # media pipe automatically uses gpu if available
         self._face_mesher = mp.solutions.face_mesh.FaceMesh()
         self._media_editor = MediaEditor()
+        self._detection_cache = None
+        if face_detection_cache_path is not None:
+            self._detection_cache = FaceDetectionCache(face_detection_cache_path)
 
     def resize(
         self,
@@ -378,25 +401,23 @@ class Resizer:
                     detect_secs.append(segment["first_face_sec"] + i * sample_period)
 
             # detect faces
+            downsample_factor = self._calc_face_detect_downsample_factor(
+                video_file, face_detect_width
+            )
             n_batches = self._calc_n_batches(
                 video_file=video_file,
                 num_frames=len(detect_secs),
                 face_detect_width=face_detect_width,
                 n_face_detect_batches=n_face_detect_batches,
             )
-            frames_per_batch = int(len(detect_secs) // n_batches + 1)
-            face_detections = []
-            for i in range(n_batches):
-                frames = extract_frames(
-                    video_file,
-                    detect_secs[
-                        i
-                        * frames_per_batch : min(
-                            (i + 1) * frames_per_batch, len(detect_secs)
-                        )
-                    ],
-                )
-                face_detections += self._detect_faces(frames, face_detect_width)
+            face_detections, _ = self._detect_faces_in_stream(
+                video_file=video_file,
+                detect_secs=detect_secs,
+                downsample_factor=downsample_factor,
+                micro_batch_size=self._calc_micro_batch_size(
+                    len(detect_secs), n_batches
+                ),
+            )
 
             # check if any faces were found for each segment
             idx = 0
@@ -514,20 +535,286 @@ class Resizer:
         )
         return n_batches
 
+    def _calc_face_detect_downsample_factor(
+        self,
+        video_file: VideoFile,
+        face_detect_width: int,
+    ) -> float:
+        """
+        Calculate the factor by which to downsample the frames of a video file for
+        face detection. Frames narrower than the face detection width are not
+        upsampled.
+
+        Parameters
+        ----------
+        video_file: VideoFile
+            The video file to analyze.
+        face_detect_width: int
+            The width to use for face detection.
+
+        Returns
+        -------
+        float
+            The downsample factor (>= 1).
+        """
+        return max(video_file.get_width_pixels() / face_detect_width, 1)
+
+    def _calc_micro_batch_size(self, num_frames: int, n_batches: int) -> int:
+        """
+        Calculate the number of frames to detect faces in at once when streaming
+        frames to the face detector.
+
+        Parameters
+        ----------
+        num_frames: int
+            The number of frames to analyze.
+        n_batches: int
+            The number of batches the frames must be split into to fit in memory.
+
+        Returns
+        -------
+        int
+            The number of frames per micro-batch.
+        """
+        frames_per_batch = math.ceil(num_frames / max(n_batches, 1))
+        return max(1, min(frames_per_batch, FACE_DETECT_MICRO_BATCH_SIZE))
+
+    def _detect_faces_in_stream(
+        self,
+        video_file: VideoFile,
+        detect_secs: list[float],
+        downsample_factor: float,
+        micro_batch_size: int,
+        keep_face_crops: bool = False,
+    ) -> tuple[list[np.ndarray], Optional[list[list[np.ndarray]]]]:
+        """
+        Detect faces in the frames at the given times. Frames are decoded by a
+        background thread while faces are detected in micro-batches of the frames
+        decoded so far, so decoding and face detection overlap. At most two
+        micro-batches of decoded frames wait for the face detector at a time.
+
+        Parameters
+        ----------
+        video_file: VideoFile
+            The video file to analyze.
+        detect_secs: list[float]
+            The times (in seconds) of the frames to detect faces in.
+        downsample_factor: float
+            The factor to downsample the frames by for face detection.
+        micro_batch_size: int
+            The number of frames to detect faces in at once.
+        keep_face_crops: bool
+            Whether to also return the full-resolution crops of the detected faces.
+            Each full-resolution frame is only held until the faces of its
+            micro-batch are detected.
+
+        Returns
+        -------
+        tuple[list[np.ndarray], Optional[list[list[np.ndarray]]]]
+            The face detections for each frame and, if `keep_face_crops` is True,
+            the full-resolution crops of each frame's detected faces (in the order
+            of its bounding boxes). Both are in the order of `detect_secs`.
+        """
+        face_detections = [None] * len(detect_secs)
+        face_crops = [None] * len(detect_secs) if keep_face_crops else None
+        if len(detect_secs) == 0:
+            return face_detections, face_crops
+
+        # (video hash, detect width, detector config) to look up cached detections
+        cache_key = None
+        if self._detection_cache is not None:
+            cache_key = (
+                self._detection_cache.get_video_hash(video_file.path),
+                int(video_file.get_width_pixels() / downsample_factor),
+                self._get_face_detector_config(),
+            )
+
+        num_cached = 0
+        batch_idxs = []
+        batch_pts = []
+        batch_frames = []
+        batch_full_res_frames = []
+        for idx, pts, frame, full_res_frame in stream_frames(
+            video_file,
+            detect_secs,
+            downsample_factor=downsample_factor,
+            keep_full_res=keep_face_crops,
+            max_queued_frames=2 * micro_batch_size,
+        ):
+            batch_idxs.append(idx)
+            batch_pts.append(pts)
+            batch_frames.append(frame)
+            batch_full_res_frames.append(full_res_frame)
+            if len(batch_frames) < micro_batch_size:
+                continue
+            num_cached += self._detect_faces_in_micro_batch(
+                face_detections,
+                batch_idxs,
+                batch_pts,
+                batch_frames,
+                downsample_factor,
+                cache_key,
+            )
+            if keep_face_crops:
+                self._crop_faces(
+                    face_crops, face_detections, batch_idxs, batch_full_res_frames
+                )
+            batch_idxs = []
+            batch_pts = []
+            batch_frames = []
+            batch_full_res_frames = []
+
+        if len(batch_frames) > 0:
+            num_cached += self._detect_faces_in_micro_batch(
+                face_detections,
+                batch_idxs,
+                batch_pts,
+                batch_frames,
+                downsample_factor,
+                cache_key,
+            )
+            if keep_face_crops:
+                self._crop_faces(
+                    face_crops, face_detections, batch_idxs, batch_full_res_frames
+                )
+
+        if cache_key is not None:
+            logging.debug(
+                "Read face detections of {} of {} frames from the cache.".format(
+                    num_cached, len(detect_secs)
+                )
+            )
+        return face_detections, face_crops
+
+    def _crop_faces(
+        self,
+        face_crops: list[Optional[list[np.ndarray]]],
+        face_detections: list[Optional[np.ndarray]],
+        batch_idxs: list[int],
+        full_res_frames: list[LazyRGBFrame],
+    ) -> None:
+        """
+        Copies the detected faces out of a micro-batch of full-resolution frames so
+        the frames themselves can be released.
+
+        Parameters
+        ----------
+        face_crops: list[Optional[list[np.ndarray]]]
+            The face crops of each frame, filled in place at `batch_idxs`.
+        face_detections: list[Optional[np.ndarray]]
+            The face detections of each frame.
+        batch_idxs: list[int]
+            The indices of the micro-batch's frames in `face_detections`.
+        full_res_frames: list[LazyRGBFrame]
+            The full-resolution frames of the micro-batch.
+        """
+        for idx, frame in zip(batch_idxs, full_res_frames):
+            if face_detections[idx] is None:
+                continue
+            face_crops[idx] = [
+                frame[y1:y2, x1:x2, :].copy()
+                for x1, y1, x2, y2 in face_detections[idx]
+            ]
+
+    def _detect_faces_in_micro_batch(
+        self,
+        face_detections: list[np.ndarray],
+        batch_idxs: list[int],
+        batch_pts: list[int],
+        batch_frames: list[np.ndarray],
+        downsample_factor: float,
+        cache_key: Optional[tuple[str, int, str]],
+    ) -> int:
+        """
+        Detect faces in a micro-batch of frames, reading the face detections of
+        frames that were already analyzed from the face detection cache (if any).
+
+        Parameters
+        ----------
+        face_detections: list[np.ndarray]
+            The face detections of all frames, updated in place.
+        batch_idxs: list[int]
+            The indices of the micro-batch's frames in `face_detections`.
+        batch_pts: list[int]
+            The presentation timestamps of the micro-batch's frames.
+        batch_frames: list[np.ndarray]
+            The downsampled frames of the micro-batch.
+        downsample_factor: float
+            The factor the frames were downsampled by.
+        cache_key: Optional[tuple[str, int, str]]
+            The content hash of the video file, the width (in pixels) of the
+            downsampled frames and the face detector's configuration. None if face
+            detections aren't cached.
+
+        Returns
+        -------
+        int
+            The number of face detections read from the cache.
+        """
+        if cache_key is None:
+            detections = self._detect_faces(batch_frames, downsample_factor)
+            for batch_idx, detection in zip(batch_idxs, detections):
+                face_detections[batch_idx] = detection
+            return 0
+
+        video_hash, detect_width, detector_config = cache_key
+        cached = self._detection_cache.get_many(
+            video_hash, batch_pts, detect_width, detector_config
+        )
+        miss_idxs = []
+        miss_pts = []
+        miss_frames = []
+        for batch_idx, pts, frame in zip(batch_idxs, batch_pts, batch_frames):
+            if pts in cached:
+                face_detections[batch_idx] = cached[pts]
+                continue
+            miss_idxs.append(batch_idx)
+            miss_pts.append(pts)
+            miss_frames.append(frame)
+
+        detections = self._detect_faces(miss_frames, downsample_factor)
+        for batch_idx, detection in zip(miss_idxs, detections):
+            face_detections[batch_idx] = detection
+        if len(miss_pts) > 0:
+            self._detection_cache.put_many(
+                video_hash, miss_pts, detect_width, detector_config, detections
+            )
+
+        return len(batch_idxs) - len(miss_idxs)
+
+    def _get_face_detector_config(self) -> str:
+        """
+        Describe the face detector's configuration that affects its detections.
+
+        Returns
+        -------
+        str
+            The face detector's configuration.
+        """
+        return (
+            "mtcnn:min_face_size={},thresholds={},factor={},select_largest={}"
+        ).format(
+            self._face_detector.min_face_size,
+            self._face_detector.thresholds,
+            self._face_detector.factor,
+            self._face_detector.select_largest,
+        )
+
     def _detect_faces(
         self,
         frames: list[np.ndarray],
-        face_detect_width: int,
+        downsample_factor: float,
     ) -> list[np.ndarray]:
         """
-        Detect faces in a list of frames.
+        Detect faces in a list of frames that were downsampled for face detection.
 
         Parameters
         ----------
         frames: list[np.ndarray]
-            The frames to detect faces in.
-        face_detect_width: int
-            The width to use for face detection.
+            The downsampled frames to detect faces in.
+        downsample_factor: float
+            The factor the frames were downsampled by. Detections are scaled back up
+            by this factor to the coordinates of the original video.
 
         Returns
         -------
@@ -538,23 +825,18 @@ class Resizer:
             logging.debug("No frames to detect faces in.")
             return []
 
-        # resize the frames
         logging.debug("Detecting faces in {} frames.".format(len(frames)))
-        downsample_factor = max(frames[0].shape[1] / face_detect_width, 1)
-        detect_height = int(frames[0].shape[0] / downsample_factor)
-        resized_frames = []
-        for frame in frames:
-            resized_frame = cv2.resize(frame, (face_detect_width, detect_height))
-            if torch.cuda.is_available():
-                resized_frame = torch.from_numpy(resized_frame).to(
-                    device="cuda", dtype=torch.uint8
-                )
-            resized_frames.append(resized_frame)
+        detect_frames = frames
+        if torch.cuda.is_available():
+            detect_frames = torch.stack(
+                [
+                    torch.from_numpy(frame).to(device="cuda", dtype=torch.uint8)
+                    for frame in frames
+                ]
+            )
 
         # detect faces in batches
-        if torch.cuda.is_available():
-            resized_frames = torch.stack(resized_frames)
-        detections, _ = self._face_detector.detect(resized_frames)
+        detections, _ = self._face_detector.detect(detect_frames)
 
         # detections are returned as numpy arrays regardless
         face_detections = []
@@ -714,17 +996,28 @@ class Resizer:
             segment["num_samples"] = num_samples
             # add first face, sample the rest
             detect_secs.append(first_face_sec)
+            # seeded per segment so repeated resizes sample (and can reuse the cached
+            # face detections of) the same frames
+            rng = np.random.default_rng(round(first_face_sec * fps))
             sample_frames = np.sort(
-                np.random.choice(range(1, frames_left), num_samples - 1, replace=False)
+                rng.choice(np.arange(1, frames_left), num_samples - 1, replace=False)
             )
             for sample_frame in sample_frames:
                 detect_secs.append(first_face_sec + sample_frame / fps)
 
-        # detect faces from each segment
-        logging.debug("Extracting {} frames".format(len(detect_secs)))
-        frames = extract_frames(video_file, detect_secs)
-        logging.debug("Extracted {} frames".format(len(detect_secs)))
-        face_detections = self._detect_faces(frames, face_detect_width)
+        # detect faces from each segment, only the full resolution crops of the
+        # detected faces are kept for the ROI calculation
+        logging.debug("Detecting faces in {} frames".format(len(detect_secs)))
+        downsample_factor = self._calc_face_detect_downsample_factor(
+            video_file, face_detect_width
+        )
+        face_detections, face_crops = self._detect_faces_in_stream(
+            video_file=video_file,
+            detect_secs=detect_secs,
+            downsample_factor=downsample_factor,
+            micro_batch_size=self._calc_micro_batch_size(len(detect_secs), 1),
+            keep_face_crops=True,
+        )
 
         logging.debug("Calculating ROI for {} segments.".format(len(segments)))
         # find roi for each segment
@@ -733,7 +1026,7 @@ class Resizer:
             # find segment roi
             if segment["found_face"] is True:
                 roi = self._calc_segment_roi(
-                    frames=frames[idx : idx + segment["num_samples"]],
+                    face_crops=face_crops[idx : idx + segment["num_samples"]],
                     face_detections=face_detections[idx : idx + segment["num_samples"]],
                 )
                 idx += segment["num_samples"]
@@ -759,7 +1052,7 @@ class Resizer:
 
     def _calc_segment_roi(
         self,
-        frames: list[np.ndarray],
+        face_crops: list[Optional[list[np.ndarray]]],
         face_detections: list[np.ndarray],
     ) -> Rect:
         """
@@ -767,8 +1060,8 @@ class Resizer:
 
         Parameters
         ----------
-        frames: np.ndarray
-            The frames to analyze.
+        face_crops: list[Optional[list[np.ndarray]]]
+            The full resolution crops of each frame's detected faces.
         face_detections: np.ndarray
             The face detection outputs for each frame
 
@@ -801,6 +1094,8 @@ class Resizer:
             segment_roi = Rect(x1, y1, x2 - x1, y2 - y1)
             return segment_roi
 
+        from sklearn.cluster import KMeans
+
         # use kmeans to group the same bounding boxes together
         kmeans = KMeans(n_clusters=k, init="k-means++", n_init=2, random_state=0).fit(
             bounding_boxes
@@ -811,18 +1106,17 @@ class Resizer:
         for i, face_detection in enumerate(face_detections):
             if face_detection is None:
                 continue
-            for bounding_box in face_detection:
+            for j, bounding_box in enumerate(face_detection):
                 assert np.sum(bounding_box < 0) == 0
                 bounding_box_label = bounding_box_labels[kmeans_idx]
                 bounding_box_groups[bounding_box_label].append(
-                    {"bounding_box": bounding_box, "frame": i}
+                    {"bounding_box": bounding_box, "face": face_crops[i][j]}
                 )
                 kmeans_idx += 1
 
         # find the face who's mouth moves the most
         max_mouth_movement = 0
-        for bounding_box_group in bounding_box_groups:
-            mouth_movement, roi = self._calc_mouth_movement(bounding_box_group, frames)
+        for mouth_movement, roi in self._calc_mouth_movements(bounding_box_groups):
             if mouth_movement > max_mouth_movement:
                 max_mouth_movement = mouth_movement
                 segment_roi = roi
@@ -848,92 +1142,94 @@ class Resizer:
 
         return segment_roi
 
-    def _calc_mouth_movement(
+    def _calc_mouth_movements(
         self,
-        bounding_box_group: list[dict[np.ndarray, int]],
-        frames: list[np.ndarray],
-    ) -> tuple[float, Rect]:
+        bounding_box_groups: list[list[dict[str, np.ndarray]]],
+    ) -> list[tuple[float, Rect]]:
         """
-        Calculates the mouth movement for a group of faces. These faces are assumed to
-        all be the same person in different frames of the source video. Further, the
-        frames are assumed to be in order of occurrence (earlier frames first).
+        Calculates the mouth movement for each group of faces. The faces of a group
+        are assumed to all be the same person in different frames of the source
+        video. Further, the frames are assumed to be in order of occurrence (earlier
+        frames first). The mouth aspect ratios of the faces of all groups are
+        calculated in a single pass.
 
         Parameters
         ----------
-        bounding_box_group: list[dict[np.ndarray, int]]
-            The faces to analyze. A list of dictionaries, each with the following keys:
+        bounding_box_groups: list[list[dict[str, np.ndarray]]]
+            The groups of faces to analyze. Each group is a list of dictionaries, each
+            with the following keys:
                 bounding_box: np.ndarray
                     The bounding box of the face to analyze. The array contains four
                     values: [x1, y1, x2, y2]
-                frame: int
-                    The frame the bounding box of the face is associated with.
-        frames: list[np.ndarray]
-            The frames to analyze.
+                face: np.ndarray
+                    The full resolution crop of the face.
 
         Returns
         -------
-        float
-            The mouth movement of the faces across the frames.
+        list[tuple[float, Rect]]
+            The mouth movement of the faces across the frames and their average
+            bounding box, for each group.
         """
-        mouth_movement = 0
-        roi = Rect(0, 0, 0, 0)
-        prev_mar = None
-        mouth_movement = 0
-
-        for bounding_box_data in bounding_box_group:
-            # roi
-            box = bounding_box_data["bounding_box"]
-            x1, y1, x2, y2 = box[0], box[1], box[2], box[3]
+        faces = [
+            bounding_box_data["face"]
+            for bounding_box_group in bounding_box_groups
+            for bounding_box_data in bounding_box_group
+        ]
+        mars = self._calc_mouth_aspect_ratios(faces)
+
+        mouth_movements = []
+        group_start = 0
+        for bounding_box_group in bounding_box_groups:
+            group_end = group_start + len(bounding_box_group)
+            # faces without landmarks are skipped
+            group_mars = mars[group_start:group_end]
+            group_mars = group_mars[~np.isnan(group_mars)]
+            mouth_movement = float(np.sum(np.abs(np.diff(group_mars))))
+
             # sum all roi's, average after loop
-            roi += Rect(x1, y1, x2 - x1, y2 - y1)
-            frame = frames[bounding_box_data["frame"]]
-            face = frame[y1:y2, x1:x2, :]
+            roi = Rect(0, 0, 0, 0)
+            for bounding_box_data in bounding_box_group:
+                x1, y1, x2, y2 = bounding_box_data["bounding_box"]
+                roi += Rect(x1, y1, x2 - x1, y2 - y1)
 
-            # mouth movement
-            mar = self._calc_mouth_aspect_ratio(face)
-            if mar is None:
-                continue
-            if prev_mar is None:
-                prev_mar = mar
-                continue
-            mouth_movement += abs(mar - prev_mar)
-            prev_mar = mar
+            mouth_movements.append((mouth_movement, roi / len(bounding_box_group)))
+            group_start = group_end
 
-        return mouth_movement, roi / len(bounding_box_group)
+        return mouth_movements
 
-    def _calc_mouth_aspect_ratio(self, face: np.ndarray) -> float:
+    def _calc_mouth_aspect_ratios(self, faces: list[np.ndarray]) -> np.ndarray:
         """
-        Calculate the mouth aspect ratio using dlib shape predictor.
+        Calculate the mouth aspect ratio of each face using MediaPipe face mesh
+        landmarks. Only the mouth landmarks are read from the face mesh, and the
+        ratios of all faces are computed at once.
 
         Parameters
         ----------
-        face: np.ndarray
-            Pytorch array of a face
+        faces: list[np.ndarray]
+            The RGB face crops to analyze.
 
         Returns
         -------
-        mar: float
-            The mouth aspect ratio.
+        np.ndarray
+            The mouth aspect ratio of each face, NaN if no face landmarks were found.
         """
-        results = self._face_mesher.process(face)
-        if results.multi_face_landmarks is None:
-            return None
-
-        landmarks = []
-        for landmark in results.multi_face_landmarks[0].landmark:
-            landmarks.append([landmark.x, landmark.y])
-        landmarks = np.array(landmarks)
-        landmarks[:, 0] *= face.shape[1]
-        landmarks[:, 1] *= face.shape[0]
-
-        # inner lip
-        upper_lip = landmarks[[95, 88, 178, 87, 14, 317, 402, 318, 324], :]
-        lower_lip = landmarks[[191, 80, 81, 82, 13, 312, 311, 310, 415], :]
-        avg_mouth_height = np.mean(np.abs(upper_lip - lower_lip))
-        mouth_width = np.sum(np.abs(landmarks[[308], :] - landmarks[[78], :]))
-        mar = avg_mouth_height / mouth_width
-
-        return mar
+        # (num_faces, num_mouth_landmarks, 2) pixel coordinates
+        mouths = np.full((len(faces), len(MOUTH_LANDMARKS), 2), np.nan)
+        for i, face in enumerate(faces):
+            results = self._face_mesher.process(face)
+            if results.multi_face_landmarks is None:
+                continue
+            landmarks = results.multi_face_landmarks[0].landmark
+            mouths[i] = [(landmarks[j].x, landmarks[j].y) for j in MOUTH_LANDMARKS]
+            mouths[i] *= (face.shape[1], face.shape[0])
+
+        num_lip = len(UPPER_INNER_LIP_LANDMARKS)
+        upper_lip = mouths[:, :num_lip]
+        lower_lip = mouths[:, num_lip : 2 * num_lip]
+        avg_mouth_height = np.mean(np.abs(upper_lip - lower_lip), axis=(1, 2))
+        mouth_width = np.sum(np.abs(mouths[:, -2] - mouths[:, -1]), axis=1)
+
+        return avg_mouth_height / mouth_width
 
     def _calc_crop(
         self,
@@ -1026,9 +1322,13 @@ class Resizer:
 
     def cleanup(self) -> None:
         """
-        Remove the face detector from memory and explicity free up GPU memory.
+        Remove the face detector from memory, explicity free up GPU memory and close
+        the face detection cache.
         """
         del self._face_detector
         self._face_detector = None
+        if self._detection_cache is not None:
+            self._detection_cache.close()
+            self._detection_cache = None
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
@@ -3,8 +3,12 @@ Video processing utilities: frame extraction and scene detection.
 """
 
 # Standard library
+from collections.abc import Iterator
 from concurrent.futures import ThreadPoolExecutor
 import logging
+import queue
+import threading
+from typing import Optional
 
 # Internal imports
 from .exceptions import VideoProcessingError
@@ -13,10 +17,57 @@ from ai_clips_maker.media.video_file import VideoFile
 
 # Third-party libraries
 import av
-import cv2
 import numpy as np
 from scenedetect import detect, AdaptiveDetector
 
+# GOP length assumed before two keyframes have been observed in a stream
+DEFAULT_GOP_SECS = 2.0
+# marks the end of the frames put on a stream_frames queue
+_END_OF_STREAM = object()
+
+
+class LazyRGBFrame:
+    """
+    Full-resolution RGB view of a decoded video frame that is only converted from
+    the decoder's pixel format the first time it is indexed.
+
+    Supports NumPy-style indexing (e.g. `frame[y1:y2, x1:x2, :]`) so it can be used
+    in place of an RGB array wherever only parts of the frame are read.
+    """
+
+    def __init__(self, frame: av.VideoFrame) -> None:
+        """
+        Parameters
+        ----------
+        frame : av.VideoFrame
+            The decoded frame to wrap.
+        """
+        self._frame = frame
+        self._rgb = None
+        self._shape = (frame.height, frame.width, 3)
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        """Returns the (height, width, channels) shape of the RGB frame."""
+        return self._shape
+
+    def to_ndarray(self) -> np.ndarray:
+        """
+        Converts the frame to a full-resolution RGB array (once) and returns it.
+
+        Returns
+        -------
+        np.ndarray
+            The frame as a (height, width, 3) uint8 array.
+        """
+        if self._rgb is None:
+            self._rgb = self._frame.to_ndarray(format="rgb24")
+            self._frame = None
+        return self._rgb
+
+    def __getitem__(self, key) -> np.ndarray:
+        return self.to_ndarray()[key]
+
 
 def extract_frames(
     video_file: VideoFile,
@@ -27,6 +78,10 @@ def extract_frames(
     """
     Extracts specific frames from a video based on given time stamps.
 
+    The time stamps may be given in any order; frames are decoded in a single
+    monotonic pass and returned in the order they were requested. Downsampling is
+    done by PyAV's reformatter while converting to RGB.
+
     Parameters
     ----------
     video_file : VideoFile
@@ -43,6 +98,178 @@ def extract_frames(
     list[np.ndarray]
         List of extracted frames as NumPy arrays.
     """
+    frames = _decode_frames(video_file, extract_secs)
+
+    def process(frame):
+        img = _frame_to_rgb(frame, downsample_factor)
+        if grayscale:
+            img = rgb_to_gray(img).reshape(img.shape[0], img.shape[1])
+        return img
+
+    with ThreadPoolExecutor() as executor:
+        return list(executor.map(process, frames))
+
+
+def stream_frames(
+    video_file: VideoFile,
+    extract_secs: list[float],
+    downsample_factor: float = 1.0,
+    keep_full_res: bool = False,
+    max_queued_frames: int = 32,
+) -> Iterator[tuple[int, int, np.ndarray, Optional[LazyRGBFrame]]]:
+    """
+    Streams specific frames from a video, decoded by a background thread.
+
+    The decoding thread samples the frames in a single monotonic pass (see
+    `extract_frames`) and puts them on a bounded queue, so the consumer can process
+    frames while the next ones are being decoded. When the queue is full the
+    decoding thread waits, which caps the number of frames held in memory.
+
+    Parameters
+    ----------
+    video_file : VideoFile
+        The video file to read from.
+    extract_secs : list[float]
+        List of timestamps (in seconds) to extract frames at.
+    downsample_factor : float, optional
+        Factor by which to downsample the streamed frames. Default is 1.0 (no
+        downsampling).
+    keep_full_res : bool, optional
+        Whether to also stream lazy full-resolution views of the frames. Default is
+        False.
+    max_queued_frames : int, optional
+        Maximum number of decoded frames waiting to be consumed. Default is 32.
+
+    Yields
+    ------
+    tuple[int, int, np.ndarray, Optional[LazyRGBFrame]]
+        The index of the frame's time stamp in `extract_secs`, the frame's pts, the
+        (downsampled) RGB frame, and its full-resolution view if `keep_full_res` is
+        True. Frames are yielded in decode order, not in the order they were
+        requested.
+    """
+    _assert_valid_extract_secs(video_file, extract_secs)
+
+    frame_queue = queue.Queue(maxsize=max_queued_frames)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # waits for space on the queue unless the consumer has stopped
+        while not stop.is_set():
+            try:
+                frame_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def decode() -> None:
+        try:
+            container = av.open(video_file.path)
+            try:
+                stream = container.streams.video[0]
+                target_pts = [int(sec / stream.time_base) for sec in extract_secs]
+                for idx, frame in _sample_frames(container, stream, target_pts):
+                    full_res_frame = LazyRGBFrame(frame) if keep_full_res else None
+                    rgb_frame = _frame_to_rgb(frame, downsample_factor)
+                    item = (idx, frame.pts, rgb_frame, full_res_frame)
+                    if not put(item):
+                        return
+            finally:
+                container.close()
+        except Exception as e:
+            put(e)
+            return
+        put(_END_OF_STREAM)
+
+    decoder = threading.Thread(target=decode, name="frame-decoder", daemon=True)
+    decoder.start()
+    try:
+        while True:
+            item = frame_queue.get()
+            if item is _END_OF_STREAM:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        decoder.join()
+
+
+def _frame_to_rgb(frame: av.VideoFrame, downsample_factor: float) -> np.ndarray:
+    """
+    Converts a decoded frame to an RGB array, downsampling it during conversion.
+
+    Parameters
+    ----------
+    frame : av.VideoFrame
+        The decoded frame.
+    downsample_factor : float
+        Factor by which to downsample the frame. 1.0 keeps the full resolution.
+
+    Returns
+    -------
+    np.ndarray
+        The frame as a (height, width, 3) uint8 array.
+    """
+    if downsample_factor == 1.0:
+        return frame.to_ndarray(format="rgb24")
+    return frame.to_ndarray(
+        width=int(frame.width / downsample_factor),
+        height=int(frame.height / downsample_factor),
+        format="rgb24",
+    )
+
+
+def _decode_frames(
+    video_file: VideoFile,
+    extract_secs: list[float],
+) -> list[av.VideoFrame]:
+    """
+    Decodes the frames at the given time stamps, in the order they were requested.
+
+    Parameters
+    ----------
+    video_file : VideoFile
+        The video file to read from.
+    extract_secs : list[float]
+        List of timestamps (in seconds) to extract frames at.
+
+    Returns
+    -------
+    list[av.VideoFrame]
+        The decoded frames.
+    """
+    _assert_valid_extract_secs(video_file, extract_secs)
+
+    container = av.open(video_file.path)
+    try:
+        stream = container.streams.video[0]
+        target_pts = [int(sec / stream.time_base) for sec in extract_secs]
+        frames = [None] * len(target_pts)
+        for idx, frame in _sample_frames(container, stream, target_pts):
+            frames[idx] = frame
+    finally:
+        container.close()
+
+    return frames
+
+
+def _assert_valid_extract_secs(
+    video_file: VideoFile,
+    extract_secs: list[float],
+) -> None:
+    """
+    Raises a VideoProcessingError if a time stamp exceeds the video's duration.
+
+    Parameters
+    ----------
+    video_file : VideoFile
+        The video file to read from.
+    extract_secs : list[float]
+        List of timestamps (in seconds) to extract frames at.
+    """
     duration = video_file.get_duration()
     for sec in extract_secs:
         if sec > duration:
@@ -50,34 +277,97 @@ def extract_frames(
             logging.error(msg)
             raise VideoProcessingError(msg)
 
-    container = av.open(video_file.path)
-    stream = container.streams.video[0]
-    target_pts = [int(sec / stream.time_base) for sec in extract_secs]
-
-    frames = []
-    for pts in target_pts:
-        container.seek(pts, stream=stream)
-        prev_frame = None
-        for frame in container.decode(stream):
-            if frame.pts > pts:
-                frames.append(prev_frame or frame)
-                break
-            prev_frame = frame
 
-    assert len(frames) == len(extract_secs)
+def _sample_frames(
+    container: av.container.InputContainer,
+    stream: av.video.stream.VideoStream,
+    target_pts: list[int],
+) -> Iterator[tuple[int, av.VideoFrame]]:
+    """
+    Decodes the frames shown at each of the target presentation timestamps in a
+    single monotonic pass over the stream.
 
-    def process(frame):
-        img = np.array(frame.to_image())
-        if downsample_factor != 1.0:
-            h = int(img.shape[0] / downsample_factor)
-            w = int(img.shape[1] / downsample_factor)
-            img = cv2.resize(img, (w, h))
-        if grayscale:
-            img = rgb_to_gray(img).reshape(img.shape[0], img.shape[1])
-        return img
+    The targets are visited in ascending order. Before each target, the sampler
+    decides whether to keep decoding forward or to seek: a seek only pays off when
+    a keyframe lies between the current decode position and the target, which is
+    estimated from the keyframe spacing observed so far.
 
-    with ThreadPoolExecutor() as executor:
-        return list(executor.map(process, frames))
+    Parameters
+    ----------
+    container : av.container.InputContainer
+        The opened container to decode from.
+    stream : av.video.stream.VideoStream
+        The video stream of the container to decode.
+    target_pts : list[int]
+        Presentation timestamps (in the stream's time base) to sample, in caller
+        order. Duplicates are allowed.
+
+    Yields
+    ------
+    tuple[int, av.VideoFrame]
+        The index of the target in `target_pts` and the frame shown at that time,
+        i.e. the last frame whose pts does not exceed the target.
+    """
+    order = sorted(range(len(target_pts)), key=lambda i: target_pts[i])
+
+    decoder = None
+    eof = False
+    last_frame = None  # last decoded frame with pts <= current target
+    next_frame = None  # first decoded frame with pts > current target
+    last_key_pts = None  # pts of the most recently decoded keyframe
+    gop_pts = int(DEFAULT_GOP_SECS / stream.time_base)  # estimated keyframe spacing
+    num_seeks = 0
+
+    for idx in order:
+        target = target_pts[idx]
+
+        # seek when a keyframe is expected between the decode position and target
+        if decoder is None or (
+            (next_frame is None or next_frame.pts <= target)
+            and (last_key_pts is None or target - last_key_pts > gop_pts)
+        ):
+            prev_key_pts = last_key_pts
+            container.seek(target, stream=stream)
+            decoder = container.decode(stream)
+            num_seeks += 1
+            eof = False
+            last_frame = None
+            next_frame = None
+            last_key_pts = None
+        else:
+            prev_key_pts = None
+
+        # decode forward until the frame after the target
+        while not eof and (next_frame is None or next_frame.pts <= target):
+            if next_frame is not None:
+                last_frame = next_frame
+            next_frame = next(decoder, None)
+            if next_frame is None:
+                eof = True
+                continue
+            if next_frame.key_frame:
+                if last_key_pts is not None:
+                    gop_pts = max(gop_pts, next_frame.pts - last_key_pts)
+                last_key_pts = next_frame.pts
+            elif last_key_pts is not None:
+                # the current GOP is at least as long as what was decoded of it
+                gop_pts = max(gop_pts, next_frame.pts - last_key_pts)
+
+        # the seek landed on the keyframe that was already behind us, so the GOP
+        # is longer than the distance that triggered the seek
+        if prev_key_pts is not None and last_key_pts == prev_key_pts:
+            gop_pts = max(gop_pts, target - prev_key_pts)
+
+        frame = last_frame if last_frame is not None else next_frame
+        if frame is None:
+            msg = f"No frame could be decoded at pts {target}"
+            logging.error(msg)
+            raise VideoProcessingError(msg)
+        yield idx, frame
+
+    logging.debug(
+        "Sampled {} frames with {} seeks.".format(len(target_pts), num_seeks)
+    )
 
 
 def detect_scenes(video_file: VideoFile, min_scene_duration: float = 0.25) -> list[float]:
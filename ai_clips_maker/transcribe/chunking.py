@@ -0,0 +1,113 @@
+"""
+Splitting long audio into chunks at silences and stitching the transcriptions of
+the chunks back together.
+"""
+# 3rd party imports
+import numpy as np
+
+# length of the frames whose energy is compared to find silences
+ENERGY_FRAME_SECS = 0.02
+# a split point is the center of the quietest window of this length, so audio isn't
+# split during a short pause within a word
+SILENCE_WINDOW_SECS = 0.5
+
+
+def find_silence_boundaries(
+    waveform: np.ndarray,
+    sample_rate: int,
+    target_chunk_secs: float,
+    search_window_secs: float,
+) -> list[int]:
+    """
+    Finds where to split audio into chunks of about `target_chunk_secs` seconds. Each
+    split point is the quietest moment within `search_window_secs` seconds of the
+    target split time.
+
+    Parameters
+    ----------
+    waveform: np.ndarray
+        The (num_samples,) mono waveform.
+    sample_rate: int
+        Sample rate of the waveform.
+    target_chunk_secs: float
+        Target duration of a chunk in seconds.
+    search_window_secs: float
+        How far from the target split time to look for silence, in seconds.
+
+    Returns
+    -------
+    list[int]
+        Sample indices of the chunk boundaries, starting with 0 and ending with the
+        number of samples.
+    """
+    num_samples = len(waveform)
+    frame_size = max(round(ENERGY_FRAME_SECS * sample_rate), 1)
+    num_frames = num_samples // frame_size
+    target_frames = round(target_chunk_secs * sample_rate / frame_size)
+    if num_frames < 2 * target_frames:
+        return [0, num_samples]
+
+    frames = np.asarray(waveform[: num_frames * frame_size])
+    frames = frames.reshape(num_frames, frame_size)
+    energy = np.square(frames, dtype=np.float64).mean(axis=1)
+    # mean energy of the window centered on each frame
+    window = max(round(SILENCE_WINDOW_SECS / ENERGY_FRAME_SECS), 1)
+    cumsum = np.concatenate(([0.0], np.cumsum(energy)))
+    starts = np.clip(np.arange(num_frames) - window // 2, 0, num_frames)
+    ends = np.clip(starts + window, 0, num_frames)
+    window_energy = (cumsum[ends] - cumsum[starts]) / np.maximum(ends - starts, 1)
+
+    search_frames = round(search_window_secs * sample_rate / frame_size)
+    boundaries = [0]
+    prev_frame = 0
+    while num_frames - prev_frame >= 2 * target_frames:
+        target = prev_frame + target_frames
+        lo = max(target - search_frames, prev_frame + 1)
+        hi = min(target + search_frames + 1, num_frames)
+        split_frame = lo + int(np.argmin(window_energy[lo:hi]))
+        boundaries.append(split_frame * frame_size)
+        prev_frame = split_frame
+    boundaries.append(num_samples)
+    return boundaries
+
+
+def stitch_char_info(
+    chunk_char_infos: list[list[dict]],
+    chunk_start_times: list[float],
+) -> list[dict]:
+    """
+    Joins the character info of consecutive chunks into the character info of the
+    whole audio. Chunks don't overlap, so no text is duplicated at the seams.
+
+    Parameters
+    ----------
+    chunk_char_infos: list[list[dict]]
+        The character info of each chunk with times relative to the chunk's start.
+    chunk_start_times: list[float]
+        The start time of each chunk in seconds.
+
+    Returns
+    -------
+    list[dict]
+        The character info with times relative to the start of the audio, and a
+        space between the text of consecutive chunks.
+    """
+    char_info = []
+    for chunk_char_info, chunk_start_time in zip(chunk_char_infos, chunk_start_times):
+        if len(chunk_char_info) == 0:
+            continue
+        if (
+            len(char_info) > 0
+            and char_info[-1]["char"] != " "
+            and chunk_char_info[0]["char"] != " "
+        ):
+            char_info.append(
+                {"char": " ", "start_time": None, "end_time": None, "speaker": None}
+            )
+        for char in chunk_char_info:
+            char = dict(char)
+            for key in ["start_time", "end_time"]:
+                if char[key] is not None:
+                    char[key] = char[key] + chunk_start_time
+            char_info.append(char)
+    return char_info
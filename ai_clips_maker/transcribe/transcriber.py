@@ -9,11 +9,17 @@ Key Features:
 """
 
 import logging
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 # Internal imports
+from .chunking import find_silence_boundaries, stitch_char_info
 from .exceptions import NoSpeechError, TranscriberConfigError
 from .transcription import Transcription
+from ai_clips_maker.media.audio_decoder import DecodedAudio
 from ai_clips_maker.media.audio_file import AudioFile
 from ai_clips_maker.media.editor import MediaEditor
 from ai_clips_maker.utils.config_manager import ConfigManager
@@ -22,8 +28,19 @@ from ai_clips_maker.utils.type_checker import TypeChecker
 from ai_clips_maker.utils.utils import find_missing_dict_keys
 
 # External libraries
+# whisperx is imported where it's used, as importing it takes seconds
+import numpy as np
 import torch
-import whisperx
+
+# whisper detects the language from the first 30 seconds of audio
+LANGUAGE_DETECTION_SECS = 30
+# number of alignment models (one per language) kept loaded by default
+DEFAULT_ALIGN_MODEL_CACHE_SIZE = 2
+# chunked transcription: target chunk duration, how far from the target a chunk
+# boundary may move to land on a silence, and CPU threads per worker process
+DEFAULT_TARGET_CHUNK_SECS = 600
+CHUNK_SILENCE_SEARCH_SECS = 30
+DEFAULT_THREADS_PER_CHUNK_WORKER = 4
 
 
 class WhisperTranscriber:
@@ -31,7 +48,34 @@ class WhisperTranscriber:
     Audio transcriber using WhisperX models.
     """
 
-    def __init__(self, model_size=None, device=None, precision=None) -> None:
+    def __init__(
+        self,
+        model_size=None,
+        device=None,
+        precision=None,
+        align_model_cache_size: int = DEFAULT_ALIGN_MODEL_CACHE_SIZE,
+        preload_languages: list[str] = None,
+        cpu_threads: int = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        model_size: str
+            Whisper model size. Defaults to 'large-v2' on GPU, 'tiny' on CPU.
+        device: str
+            PyTorch device to run on. Defaults to the best available device.
+        precision: str
+            Compute precision. Defaults to 'float16' on GPU, 'int8' on CPU.
+        align_model_cache_size: int
+            Number of alignment models (one per language) kept loaded between
+            transcriptions. The least recently used model is unloaded when a model
+            for another language is needed. Default is 2.
+        preload_languages: list[str]
+            Languages (ISO 639-1) whose alignment models are loaded right away.
+        cpu_threads: int
+            Number of threads the whisper model uses on CPU. Defaults to whisperx's
+            default.
+        """
         self._config = WhisperTranscriberConfig()
         self._type_checker = TypeChecker()
 
@@ -42,16 +86,110 @@ class WhisperTranscriber:
         assert_valid_torch_device(self._device)
         self._config.assert_valid_model_size(self._model_size)
         self._config.assert_valid_precision(self._precision)
+        self._config.assert_valid_align_model_cache_size(align_model_cache_size)
+
+        # (language, device) -> (alignment model, metadata), least recently used first
+        self._align_models = OrderedDict()
+        self._align_model_cache_size = align_model_cache_size
 
+        import whisperx
+
+        model_options = {} if cpu_threads is None else {"threads": cpu_threads}
         self._model = whisperx.load_model(
             whisper_arch=self._model_size,
             device=self._device,
             compute_type=self._precision,
+            **model_options,
         )
+        if preload_languages:
+            self.preload_align_models(preload_languages)
+
+    def preload_align_models(self, languages: list[str]) -> None:
+        """
+        Loads the alignment models of several languages ahead of their first use.
+        Only the last `align_model_cache_size` languages stay loaded.
 
-    def transcribe(self, audio_path: str, lang: str = None, batch_size: int = 16) -> Transcription:
+        Parameters
+        ----------
+        languages: list[str]
+            Languages (ISO 639-1) to load alignment models for.
+        """
+        for language in languages:
+            self._config.assert_valid_language(language)
+        for language in languages:
+            self._get_align_model(language)
+
+    def evict_align_model(self, language: str = None) -> bool:
+        """
+        Unloads the alignment model of a language, or every alignment model.
+
+        Parameters
+        ----------
+        language: str
+            Language (ISO 639-1) whose alignment model to unload. None to unload
+            every alignment model.
+
+        Returns
+        -------
+        bool
+            True if a model was unloaded, False otherwise.
+        """
+        if language is None:
+            evicted = len(self._align_models) > 0
+            self._align_models.clear()
+        else:
+            evicted = self._align_models.pop((language, self._device), None) is not None
+        if evicted and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        return evicted
+
+    def _get_align_model(self, language: str) -> tuple:
+        """
+        Returns the alignment model and its metadata for a language, loading it if
+        it isn't cached.
+
+        Parameters
+        ----------
+        language: str
+            Language (ISO 639-1) of the alignment model.
+
+        Returns
+        -------
+        tuple
+            The alignment model and its metadata.
+        """
+        import whisperx
+
+        key = (language, self._device)
+        if key in self._align_models:
+            self._align_models.move_to_end(key)
+            return self._align_models[key]
+
+        while len(self._align_models) >= self._align_model_cache_size:
+            evicted_language, _ = next(iter(self._align_models))
+            self.evict_align_model(evicted_language)
+            logging.debug(
+                f"Unloaded alignment model for language '{evicted_language}'."
+            )
+
+        self._align_models[key] = whisperx.load_align_model(
+            language_code=language, device=self._device
+        )
+        return self._align_models[key]
+
+    def transcribe(
+        self,
+        audio_path: str,
+        lang: str = None,
+        batch_size: int = 16,
+        decoded_audio: DecodedAudio = None,
+    ) -> Transcription:
         """
         Transcribes an audio or video file to text with aligned timestamps.
+
+        The audio is decoded once and shared by transcription and alignment. Pass
+        `decoded_audio` to also share it with other steps of the job (e.g.
+        diarization); it is created from `audio_path` otherwise.
         """
         editor = MediaEditor()
         media = editor.instantiate_as_temporal_media_file(audio_path)
@@ -60,28 +198,156 @@ class WhisperTranscriber:
 
         if lang:
             self._config.assert_valid_language(lang)
+        if decoded_audio is None:
+            decoded_audio = DecodedAudio(media.path)
+
+        language, char_info = self._transcribe_waveform(
+            decoded_audio.waveform, lang, batch_size
+        )
+        if char_info is None:
+            raise NoSpeechError(f"No speech detected in: {media.path}")
+        return self._build_transcription(language, char_info)
+
+    def transcribe_chunked(
+        self,
+        audio_path: str,
+        lang: str = None,
+        batch_size: int = 16,
+        num_workers: int = None,
+        target_chunk_secs: float = DEFAULT_TARGET_CHUNK_SECS,
+        decoded_audio: DecodedAudio = None,
+    ) -> Transcription:
+        """
+        Transcribes a long audio or video file by splitting its audio into chunks at
+        silences and transcribing and aligning the chunks in parallel worker
+        processes, each with its own model. The chunks' character timestamps are
+        shifted to the whole file's timeline and stitched into one transcription.
+
+        Parameters
+        ----------
+        audio_path: str
+            Path to the audio or video file.
+        lang: str
+            Language (ISO 639-1) of the audio. Detected from the first 30 seconds of
+            audio if None.
+        batch_size: int
+            Batch size of the whisper model.
+        num_workers: int
+            Number of worker processes. Every worker loads its own models on the
+            transcriber's device, so on a GPU this defaults to 1 (the chunks are
+            transcribed in this process) and more workers need GPU memory for as
+            many copies of the models. On the CPU it defaults to one per 4 cores.
+        target_chunk_secs: float
+            Target duration of a chunk in seconds. Chunk boundaries are moved up to
+            30 seconds to land on a silence.
+        decoded_audio: DecodedAudio
+            The file's decoded audio, to share it with other steps of the job.
+
+        Returns
+        -------
+        Transcription
+        """
+        editor = MediaEditor()
+        media = editor.instantiate_as_temporal_media_file(audio_path)
+        media.assert_exists()
+        media.assert_has_audio_stream()
+
+        if lang:
+            self._config.assert_valid_language(lang)
+        if decoded_audio is None:
+            decoded_audio = DecodedAudio(media.path)
+        if num_workers is None and self._device != "cpu":
+            num_workers = 1
+        elif num_workers is None:
+            num_workers = max(
+                (os.cpu_count() or 1) // DEFAULT_THREADS_PER_CHUNK_WORKER, 1
+            )
+        if num_workers < 1:
+            raise TranscriberConfigError(
+                f"num_workers must be positive, not '{num_workers}'."
+            )
+
+        waveform = decoded_audio.waveform
+        sample_rate = decoded_audio.sample_rate
+        # every chunk is transcribed in the same language
+        if lang is None:
+            lang = self._model.detect_language(
+                decoded_audio.get_head(LANGUAGE_DETECTION_SECS)
+            )
+
+        boundaries = find_silence_boundaries(
+            waveform, sample_rate, target_chunk_secs, CHUNK_SILENCE_SEARCH_SECS
+        )
+        chunks = [
+            waveform[start:end] for start, end in zip(boundaries[:-1], boundaries[1:])
+        ]
+        chunk_start_times = [start / sample_rate for start in boundaries[:-1]]
+        logging.debug(f"Transcribing {len(chunks)} chunks with {num_workers} workers.")
+
+        num_workers = min(num_workers, len(chunks))
+        if num_workers == 1:
+            chunk_char_infos = [
+                self._transcribe_waveform(chunk, lang, batch_size)[1]
+                for chunk in chunks
+            ]
+        else:
+            cpu_threads = max((os.cpu_count() or 1) // num_workers, 1)
+            with ProcessPoolExecutor(
+                max_workers=num_workers,
+                # CUDA and the models' thread pools don't survive a fork
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_chunk_worker,
+                initargs=(self._model_size, self._device, self._precision, cpu_threads),
+            ) as executor:
+                chunk_char_infos = list(executor.map(
+                    _transcribe_chunk,
+                    chunks,
+                    [lang] * len(chunks),
+                    [batch_size] * len(chunks),
+                ))
+
+        char_info = stitch_char_info(
+            [info or [] for info in chunk_char_infos], chunk_start_times
+        )
+        if len(char_info) == 0:
+            raise NoSpeechError(f"No speech detected in: {media.path}")
+        return self._build_transcription(lang, char_info)
+
+    def _transcribe_waveform(
+        self,
+        waveform: np.ndarray,
+        lang: str,
+        batch_size: int,
+    ) -> tuple[str, list[dict] | None]:
+        """
+        Transcribes and aligns a waveform.
+
+        Returns
+        -------
+        tuple[str, list[dict] | None]
+            The language and the character info with times relative to the start of
+            the waveform. The character info is None if there is no speech.
+        """
+        import whisperx
 
         # Step 1: WhisperX transcription
         raw_transcription = self._model.transcribe(
-            media.path, language=lang, batch_size=batch_size
+            waveform, language=lang, batch_size=batch_size
         )
 
         # Step 2: Align characters/words
-        align_model, meta = whisperx.load_align_model(
-            language_code=raw_transcription["language"],
-            device=self._device
-        )
+        align_model, meta = self._get_align_model(raw_transcription["language"])
         aligned = whisperx.align(
             raw_transcription["segments"],
             align_model,
             meta,
-            media.path,
+            waveform,
             self._device,
             return_char_alignments=True,
         )
 
         if not aligned["segments"]:
-            raise NoSpeechError(f"No speech detected in: {media.path}")
+            return raw_transcription["language"], None
 
         # Step 3: Parse character-level data
         char_info = []
@@ -101,25 +367,63 @@ class WhisperTranscriber:
                     "speaker": None
                 })
 
+        return raw_transcription["language"], char_info
+
+    def _build_transcription(
+        self, language: str, char_info: list[dict]
+    ) -> Transcription:
         return Transcription({
             "source_software": "whisperx-v3",
             "time_created": datetime.now(),
-            "language": raw_transcription["language"],
+            "language": language,
             "num_speakers": None,
             "char_info": char_info,
         })
 
-    def detect_language(self, media_file: AudioFile) -> str:
+    def detect_language(
+        self,
+        media_file: AudioFile,
+        decoded_audio: DecodedAudio = None,
+    ) -> str:
         """
-        Detects the spoken language in the media file.
+        Detects the spoken language in the media file. Only the first 30 seconds of
+        audio are decoded, unless `decoded_audio` already decoded the whole file.
         """
         self._type_checker.assert_type(media_file, "media_file", AudioFile)
         media_file.assert_exists()
         media_file.assert_has_audio_stream()
-        audio = whisperx.load_audio(media_file.path)
+        if decoded_audio is None:
+            decoded_audio = DecodedAudio(media_file.path)
+        audio = decoded_audio.get_head(LANGUAGE_DETECTION_SECS)
         return self._model.detect_language(audio)
 
 
+# the transcriber of a chunked transcription worker process
+_chunk_worker_transcriber = None
+
+
+def _init_chunk_worker(
+    model_size: str, device: str, precision: str, cpu_threads: int
+) -> None:
+    """
+    Loads the models of a chunked transcription worker process.
+    """
+    global _chunk_worker_transcriber
+    torch.set_num_threads(cpu_threads)
+    _chunk_worker_transcriber = WhisperTranscriber(
+        model_size, device, precision, cpu_threads=cpu_threads
+    )
+
+
+def _transcribe_chunk(
+    waveform: np.ndarray, lang: str, batch_size: int
+) -> list[dict] | None:
+    """
+    Transcribes a chunk in a worker process.
+    """
+    return _chunk_worker_transcriber._transcribe_waveform(waveform, lang, batch_size)[1]
+
+
 class WhisperTranscriberConfig(ConfigManager):
     """
     Configuration validator for WhisperTranscriber.
@@ -168,6 +472,14 @@ class WhisperTranscriberConfig(ConfigManager):
             return f"Invalid precision '{precision}'. Valid: {self.get_valid_precisions()}"
         return None
 
+    def check_valid_align_model_cache_size(self, size: int) -> str | None:
+        if not isinstance(size, int) or size < 1:
+            return (
+                f"Invalid alignment model cache size '{size}'. Must be a positive "
+                "integer."
+            )
+        return None
+
     def assert_valid_model_size(self, size: str) -> None:
         msg = self.check_valid_model_size(size)
         if msg:
@@ -182,3 +494,8 @@ class WhisperTranscriberConfig(ConfigManager):
         msg = self.check_valid_precision(precision)
         if msg:
             raise TranscriberConfigError(msg)
+
+    def assert_valid_align_model_cache_size(self, size: int) -> None:
+        msg = self.check_valid_align_model_cache_size(size)
+        if msg:
+            raise TranscriberConfigError(msg)
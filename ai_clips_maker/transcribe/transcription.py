@@ -5,49 +5,114 @@ Notes
 -----
 - Character, word, and sentence level time stamps are available
 - NLTK used for tokenizing sentences
+- Transcriptions can be stored as JSON for interchange or in a binary format that
+is memory-mapped when loaded, so loading doesn't parse or re-tokenize anything
 - WhisperX GitHub: https://github.com/m-bain/whisperX
 """
 
 from __future__ import annotations
 from datetime import datetime
+import json
 import logging
+import os
+import struct
 
 # Project-specific imports
 from .exceptions import TranscriptionError
 from .transcription_element import Sentence, Word, Character
+from ai_clips_maker.filesys.file import File
 from ai_clips_maker.filesys.json_file import JSONFile
 from ai_clips_maker.filesys.manager import FileSystemManager
 from ai_clips_maker.utils.type_checker import TypeChecker
 
 # External dependencies
-import nltk
-from nltk.tokenize import sent_tokenize
-
-nltk.download("punkt")
+# nltk is imported on first use, as importing it takes seconds
+import numpy as np
+
+# index of characters that don't belong to a word/sentence, or have no speaker
+NO_INDEX = -1
+
+# NLTK data the sentence tokenizer needs (punkt_tab for NLTK >= 3.8.2, punkt before)
+PUNKT_RESOURCES = ["punkt_tab", "punkt"]
+
+# binary format: magic, little-endian uint64 header length, JSON header, then the
+# columns, each starting at a multiple of BINARY_ALIGNMENT bytes
+BINARY_FILE_EXTENSION = "bin"
+BINARY_MAGIC = b"AICTRNS1"
+BINARY_ALIGNMENT = 64
+_HEADER_LENGTH_FORMAT = "<Q"
+# columns stored in the binary format and their on-disk dtypes
+BINARY_COLUMNS = {
+    "char_start": "<f8",
+    "char_end": "<f8",
+    "char_speaker": "<i4",
+    "char_word": "<i4",
+    "char_sentence": "<i4",
+    "word_start_char": "<i8",
+    "word_end_char": "<i8",
+    "word_start": "<f8",
+    "word_end": "<f8",
+    "sentence_start_char": "<i8",
+    "sentence_end_char": "<i8",
+    "sentence_start": "<f8",
+    "sentence_end": "<f8",
+}
 
 
 class Transcription:
     """
     Parses and processes WhisperX-generated transcription data.
     Allows querying and exporting character, word, and sentence level metadata.
+
+    Character, word and sentence data is stored column-wise in NumPy arrays (one
+    array per field plus the transcript's text). Missing times are stored as NaN
+    and missing indices as -1. Element objects and info dictionaries are only built
+    when requested.
+
+    A transcription stored with `store_as_binary_file` is loaded by passing a File
+    to the constructor. Its columns are memory-mapped, so only the pages that are
+    used get read from disk.
     """
 
-    def __init__(self, raw_transcription: dict | JSONFile) -> None:
+    def __init__(self, raw_transcription: dict | JSONFile | File) -> None:
         self._fs = FileSystemManager()
         self._type_checker = TypeChecker()
-        self._type_checker.assert_type(raw_transcription, "transcription", (dict, JSONFile))
+        self._type_checker.assert_type(raw_transcription, "transcription", (dict, File))
 
         self._source = None
         self._created = None
         self._lang = None
         self._speakers = None
-        self._chars = None
         self._text = None
+        self._end_time = None
+
+        # character columns
+        self._char_start = None
+        self._char_end = None
+        self._char_speaker = None
+        self._char_word = None
+        self._char_sentence = None
+        # word and sentence columns
+        self._word_start_char = None
+        self._word_end_char = None
+        self._word_start = None
+        self._word_end = None
+        self._sentence_start_char = None
+        self._sentence_end_char = None
+        self._sentence_start = None
+        self._sentence_end = None
+        # monotonic (start, end) times used to search each level by time
+        self._search_times = {}
+
+        # element views, built on first access
+        self._characters = None
         self._words = None
         self._sentences = None
 
         if isinstance(raw_transcription, JSONFile):
             self._load_from_json(raw_transcription)
+        elif isinstance(raw_transcription, File):
+            self._load_from_binary(raw_transcription)
         else:
             self._load_from_dict(raw_transcription)
 
@@ -69,11 +134,7 @@ class Transcription:
 
     @property
     def end_time(self) -> float:
-        for ch in reversed(self._chars):
-            if ch["end_time"] is not None:
-                return ch["end_time"]
-            if ch["start_time"] is not None:
-                return ch["start_time"]
+        return self._end_time
 
     @property
     def text(self) -> str:
@@ -81,50 +142,60 @@ class Transcription:
 
     @property
     def characters(self) -> list[Character]:
-        return [
-            Character(
-                start_time=ci["start_time"],
-                end_time=ci["end_time"],
-                word_index=ci["work_index"],
-                sentence_index=ci["sentence_index"],
-                text=ci["char"],
-            ) for ci in self._chars
-        ]
+        if self._characters is None:
+            self._characters = [
+                Character(
+                    start_time=ci["start_time"],
+                    end_time=ci["end_time"],
+                    word_index=ci["word_index"],
+                    sentence_index=ci["sentence_index"],
+                    text=ci["char"],
+                ) for ci in self._char_dicts(0, len(self._text))
+            ]
+        return self._characters
 
     @property
     def words(self) -> list[Word]:
-        return [
-            Word(
-                start_time=wi["start_time"],
-                end_time=wi["end_time"],
-                start_char=wi["start_char"],
-                end_char=wi["end_char"],
-                text=wi["word"],
-            ) for wi in self._words
-        ]
+        if self._words is None:
+            self._words = [
+                Word(
+                    start_time=wi["start_time"],
+                    end_time=wi["end_time"],
+                    start_char=wi["start_char"],
+                    end_char=wi["end_char"],
+                    text=wi["word"],
+                ) for wi in self._word_dicts(0, len(self._word_start))
+            ]
+        return self._words
 
     @property
     def sentences(self) -> list[Sentence]:
-        return [
-            Sentence(
-                start_time=si["start_time"],
-                end_time=si["end_time"],
-                start_char=si["start_char"],
-                end_char=si["end_char"],
-            ) for si in self._sentences
-        ]
+        if self._sentences is None:
+            self._sentences = [
+                Sentence(
+                    start_time=si["start_time"],
+                    end_time=si["end_time"],
+                    start_char=si["start_char"],
+                    end_char=si["end_char"],
+                    text=si["sentence"],
+                ) for si in self._sentence_dicts(0, len(self._sentence_start))
+            ]
+        return self._sentences
 
     def get_char_info(self, start: float = None, end: float = None) -> list:
         self._validate_time_range(start, end)
-        return self._slice_info(self._chars, start, end, self.find_char_index)
+        start_idx, end_idx = self._slice_indices("char", start, end)
+        return self._char_dicts(start_idx, end_idx)
 
     def get_word_info(self, start: float = None, end: float = None) -> list:
         self._validate_time_range(start, end)
-        return self._slice_info(self._words, start, end, self.find_word_index)
+        start_idx, end_idx = self._slice_indices("word", start, end)
+        return self._word_dicts(start_idx, end_idx)
 
     def get_sentence_info(self, start: float = None, end: float = None) -> list:
         self._validate_time_range(start, end)
-        return self._slice_info(self._sentences, start, end, self.find_sentence_index)
+        start_idx, end_idx = self._slice_indices("sentence", start, end)
+        return self._sentence_dicts(start_idx, end_idx)
 
     def store_as_json_file(self, file_path: str) -> JSONFile:
         json_file = JSONFile(file_path)
@@ -134,7 +205,7 @@ class Transcription:
 
         serialized_chars = [
             {"char": c["char"], "start_time": c["start_time"], "end_time": c["end_time"], "speaker": c["speaker"]}
-            for c in self._chars
+            for c in self._char_dicts(0, len(self._text))
         ]
 
         json_file.create({
@@ -147,20 +218,185 @@ class Transcription:
 
         return json_file
 
-    def find_char_index(self, target: float, mode: str) -> int:
-        return self._binary_search(self._chars, target, mode)
-
-    def find_word_index(self, target: float, mode: str) -> int:
-        return self._binary_search(self._words, target, mode)
-
-    def find_sentence_index(self, target: float, mode: str) -> int:
-        return self._binary_search(self._sentences, target, mode)
+    def store_as_binary_file(self, file_path: str) -> File:
+        """
+        Stores the transcription in the binary format, including the word and
+        sentence info, so loading it doesn't tokenize the text again.
+
+        Parameters
+        ----------
+        file_path: str
+            Absolute path to store the transcription at, with extension 'bin'.
+
+        Returns
+        -------
+        File
+            The stored file, which can be passed to the constructor to load it.
+        """
+        binary_file = File(file_path)
+        binary_file.assert_has_file_extension(BINARY_FILE_EXTENSION)
+        self._fs.assert_parent_dir_exists(binary_file)
+        binary_file.delete()
+
+        blobs = {"text": self._text.encode("utf-8")}
+        for name, dtype in BINARY_COLUMNS.items():
+            column = getattr(self, "_" + name)
+            blobs[name] = np.ascontiguousarray(column, dtype=dtype).tobytes()
+
+        columns = {}
+        offset = 0
+        for name, blob in blobs.items():
+            columns[name] = {"offset": offset, "num_bytes": len(blob)}
+            offset += _aligned(len(blob))
+        header = json.dumps({
+            "source_software": self._source,
+            "time_created": str(self._created),
+            "language": self._lang,
+            "num_speakers": self._speakers,
+            "end_time": self._end_time,
+            "dtypes": BINARY_COLUMNS,
+            "columns": columns,
+        }).encode("utf-8")
+        preamble = len(BINARY_MAGIC) + struct.calcsize(_HEADER_LENGTH_FORMAT)
+
+        with open(file_path, "xb") as f:
+            f.write(BINARY_MAGIC)
+            f.write(struct.pack(_HEADER_LENGTH_FORMAT, len(header)))
+            f.write(header)
+            f.write(bytes(_aligned(preamble + len(header)) - preamble - len(header)))
+            for blob in blobs.values():
+                f.write(blob)
+                f.write(bytes(_aligned(len(blob)) - len(blob)))
+
+        return binary_file
+
+    def find_char_index(
+        self, target: float | np.ndarray, mode: str
+    ) -> int | np.ndarray:
+        return self._search("char", target, mode)
+
+    def find_word_index(
+        self, target: float | np.ndarray, mode: str
+    ) -> int | np.ndarray:
+        return self._search("word", target, mode)
+
+    def find_sentence_index(
+        self, target: float | np.ndarray, mode: str
+    ) -> int | np.ndarray:
+        return self._search("sentence", target, mode)
 
     def _load_from_json(self, file: JSONFile) -> None:
         self._type_checker.assert_type(file, "json_file", JSONFile)
         file.assert_exists()
         self._load_from_dict(file.read())
 
+    def _load_from_binary(self, file: File) -> None:
+        """
+        Loads a transcription stored with `store_as_binary_file`. The stored
+        columns are memory-mapped read-only instead of validated and rebuilt.
+        """
+        file.assert_exists()
+        path = file.path
+        preamble = len(BINARY_MAGIC) + struct.calcsize(_HEADER_LENGTH_FORMAT)
+        with open(path, "rb") as f:
+            start = f.read(preamble)
+            if len(start) < preamble or not start.startswith(BINARY_MAGIC):
+                msg = "'{}' is not a binary transcription file.".format(path)
+                logging.error(msg)
+                raise TranscriptionError(msg)
+            (header_length,) = struct.unpack(
+                _HEADER_LENGTH_FORMAT, start[len(BINARY_MAGIC):]
+            )
+            try:
+                header = json.loads(f.read(header_length).decode("utf-8"))
+            except ValueError:
+                header = None
+        data_offset = _aligned(preamble + header_length)
+        self._validate_binary_header(
+            header, path, os.path.getsize(path) - data_offset
+        )
+
+        self._source = header["source_software"]
+        self._created = datetime.fromisoformat(header["time_created"])
+        self._lang = header["language"]
+        self._speakers = header["num_speakers"]
+        self._end_time = header["end_time"]
+
+        columns = header["columns"]
+        data_size = max(
+            (c["offset"] + c["num_bytes"] for c in columns.values()), default=0
+        )
+        if data_size == 0:
+            data = np.zeros(0, dtype=np.uint8)
+        else:
+            data = np.memmap(
+                path, dtype=np.uint8, mode="r", offset=data_offset, shape=(data_size,)
+            )
+
+        def column_bytes(name: str) -> np.ndarray:
+            column = columns[name]
+            return data[column["offset"]:column["offset"] + column["num_bytes"]]
+
+        self._text = column_bytes("text").tobytes().decode("utf-8")
+        for name, dtype in BINARY_COLUMNS.items():
+            setattr(self, "_" + name, column_bytes(name).view(dtype))
+        lengths = {
+            "char": len(self._text),
+            "word": len(self._word_start_char),
+            "sentence": len(self._sentence_start_char),
+        }
+        for name in BINARY_COLUMNS:
+            if len(getattr(self, "_" + name)) != lengths[name.split("_")[0]]:
+                self._raise_invalid_binary_file(
+                    path, "column '{}' has the wrong length".format(name)
+                )
+
+        # search times are derived lazily from the memory-mapped span times
+        self._search_times = _LazySearchTimes(self)
+
+    def _validate_binary_header(self, header: dict, path: str, data_size: int) -> None:
+        """
+        Checks that a binary file's header describes exactly the columns of
+        BINARY_COLUMNS, with their dtypes, within the file's data.
+        """
+        required = {
+            "source_software": str,
+            "time_created": str,
+            "language": str,
+            "num_speakers": (int, type(None)),
+            "end_time": (float, int, type(None)),
+            "dtypes": dict,
+            "columns": dict,
+        }
+        if not isinstance(header, dict) or any(
+            not isinstance(header.get(key, ...), types)
+            for key, types in required.items()
+        ):
+            self._raise_invalid_binary_file(path, "invalid header")
+        if header["dtypes"] != BINARY_COLUMNS:
+            self._raise_invalid_binary_file(path, "unexpected columns or dtypes")
+        if set(header["columns"]) != {"text"} | set(BINARY_COLUMNS):
+            self._raise_invalid_binary_file(path, "unexpected columns")
+        for name, column in header["columns"].items():
+            itemsize = np.dtype(BINARY_COLUMNS.get(name, "u1")).itemsize
+            if (
+                not isinstance(column, dict)
+                or not isinstance(column.get("offset"), int)
+                or not isinstance(column.get("num_bytes"), int)
+                or column["offset"] < 0
+                or column["num_bytes"] < 0
+                or column["num_bytes"] % itemsize != 0
+                or column["offset"] + column["num_bytes"] > data_size
+            ):
+                self._raise_invalid_binary_file(
+                    path, "invalid column '{}'".format(name)
+                )
+
+    def _raise_invalid_binary_file(self, path: str, reason: str) -> None:
+        msg = "'{}' is not a valid binary transcription file: {}.".format(path, reason)
+        logging.error(msg)
+        raise TranscriptionError(msg)
+
     def _load_from_dict(self, data: dict) -> None:
         self._validate_transcription_dict(data)
         if isinstance(data["time_created"], str):
@@ -170,11 +406,35 @@ class Transcription:
         self._created = data["time_created"]
         self._lang = data["language"]
         self._speakers = data["num_speakers"]
-        self._chars = data["char_info"]
 
-        self._build_text()
+        chars = data["char_info"]
+        # None becomes NaN
+        self._char_start = np.array([c["start_time"] for c in chars], dtype=np.float64)
+        self._char_end = np.array([c["end_time"] for c in chars], dtype=np.float64)
+        self._char_speaker = np.array(
+            [NO_INDEX if c["speaker"] is None else c["speaker"] for c in chars],
+            dtype=np.int32,
+        )
+        self._text = "".join([c["char"] for c in chars])
+        self._end_time = self._calc_end_time()
+
         self._build_word_info()
         self._build_sentence_info()
+        self._search_times = {
+            "char": self._monotonic_times(self._char_start, self._char_end),
+            "word": self._monotonic_times(self._word_start, self._word_end),
+            "sentence": self._monotonic_times(self._sentence_start, self._sentence_end),
+        }
+
+    def _calc_end_time(self) -> float | None:
+        """
+        Last known time, preferring a character's end time over its start time.
+        """
+        times = np.where(np.isnan(self._char_end), self._char_start, self._char_end)
+        known = np.flatnonzero(~np.isnan(times))
+        if len(known) == 0:
+            return None
+        return float(times[known[-1]])
 
     def _validate_transcription_dict(self, data: dict) -> None:
         self._type_checker.assert_dict_elems_type(data, {
@@ -193,15 +453,171 @@ class Transcription:
                 "speaker": (int, type(None)),
             })
 
-    def _build_text(self) -> None:
-        self._text = "".join([c["char"] for c in self._chars])
-
-    def _slice_info(self, items: list, start: float, end: float, index_fn) -> list:
+    def _build_word_info(self) -> None:
+        """
+        Words are the runs of non-space characters of the text.
+        """
+        codes = np.frombuffer(self._text.encode("utf-32-le"), dtype=np.uint32)
+        is_space = codes == ord(" ")
+        starts, ends = _find_runs(~is_space)
+        self._word_start_char = starts
+        self._word_end_char = ends
+        self._char_word = _label_runs(len(self._text), starts, ends)
+        self._word_start, self._word_end = self._calc_span_times(starts, ends)
+
+    def _build_sentence_info(self) -> None:
+        """
+        Sentences are found with NLTK and located in the text in order.
+        """
+        starts, ends = [], []
+        position = 0
+        for sentence in sent_tokenize(self._text):
+            start = self._text.find(sentence, position)
+            if start == -1:
+                logging.warning("Sentence not found in transcript: {}".format(sentence))
+                continue
+            starts.append(start)
+            ends.append(start + len(sentence))
+            position = start + len(sentence)
+        starts = np.array(starts, dtype=np.int64)
+        ends = np.array(ends, dtype=np.int64)
+        self._sentence_start_char = starts
+        self._sentence_end_char = ends
+        self._char_sentence = _label_runs(len(self._text), starts, ends)
+        self._sentence_start, self._sentence_end = self._calc_span_times(starts, ends)
+
+    def _calc_span_times(
+        self, starts: np.ndarray, ends: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Start time of the first timed character and end time of the last timed
+        character of each [start, end) character span. NaN if none are timed.
+        """
+        span_starts = np.full(len(starts), np.nan)
+        span_ends = np.full(len(starts), np.nan)
+        if len(starts) == 0:
+            return span_starts, span_ends
+        idxs = np.arange(len(self._text))
+
+        # first character at or after each index with a start time
+        has_start = ~np.isnan(self._char_start)
+        next_timed = np.minimum.accumulate(
+            np.where(has_start, idxs, len(self._text))[::-1]
+        )[::-1]
+        first = next_timed[starts]
+        valid = first < ends
+        span_starts[valid] = self._char_start[first[valid]]
+
+        # last character at or before each index with an end time
+        has_end = ~np.isnan(self._char_end)
+        prev_timed = np.maximum.accumulate(np.where(has_end, idxs, -1))
+        last = prev_timed[ends - 1]
+        valid = last >= starts
+        span_ends[valid] = self._char_end[last[valid]]
+
+        return span_starts, span_ends
+
+    def _monotonic_times(
+        self, starts: np.ndarray, ends: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Fills missing times with the previous known time and makes the times
+        non-decreasing so they can be binary searched.
+        """
+        starts = np.fmax.accumulate(np.where(np.isnan(starts), -np.inf, starts))
+        ends = np.fmax(np.where(np.isnan(ends), -np.inf, ends), starts)
+        ends = np.fmax.accumulate(ends)
+        return np.nan_to_num(starts, neginf=0.0), np.nan_to_num(ends, neginf=0.0)
+
+    def _search(
+        self, level: str, target: float | np.ndarray, mode: str
+    ) -> int | np.ndarray:
+        """
+        Index of the element containing each target time. If no element contains a
+        target, the element before it ('start' mode) or after it ('end' mode).
+        """
+        starts, ends = self._search_times[level]
+        targets = np.atleast_1d(np.asarray(target, dtype=np.float64))
+        # first element that doesn't end before the target
+        idxs = np.searchsorted(ends, targets, side="left")
+        contains = idxs < len(starts)
+        contains[contains] = starts[idxs[contains]] <= targets[contains]
+        if mode == "start":
+            idxs = np.where(contains, idxs, idxs - 1)
+        idxs = np.clip(idxs, 0, len(starts) - 1)
+        if np.ndim(target) == 0:
+            return int(idxs[0])
+        return idxs
+
+    def _slice_indices(self, level: str, start: float, end: float) -> tuple[int, int]:
+        num_elements = len(self._search_times[level][0])
         if start is None and end is None:
-            return items
-        start_idx = index_fn(start, "start")
-        end_idx = index_fn(end, "end")
-        return items[start_idx:end_idx + 1]
+            return 0, num_elements
+        start_idx = self._search(level, start, "start")
+        end_idx = self._search(level, end, "end")
+        return start_idx, end_idx + 1
+
+    def _char_dicts(self, start_idx: int, end_idx: int) -> list[dict]:
+        return [
+            {
+                "char": char,
+                "start_time": start_time,
+                "end_time": end_time,
+                "speaker": speaker,
+                "word_index": word_index,
+                "sentence_index": sentence_index,
+            }
+            for char, start_time, end_time, speaker, word_index, sentence_index in zip(
+                self._text[start_idx:end_idx],
+                _to_optional_list(self._char_start[start_idx:end_idx]),
+                _to_optional_list(self._char_end[start_idx:end_idx]),
+                _to_optional_list(self._char_speaker[start_idx:end_idx]),
+                _to_optional_list(self._char_word[start_idx:end_idx]),
+                _to_optional_list(self._char_sentence[start_idx:end_idx]),
+            )
+        ]
+
+    def _word_dicts(self, start_idx: int, end_idx: int) -> list[dict]:
+        return self._span_dicts(
+            "word",
+            self._word_start_char[start_idx:end_idx],
+            self._word_end_char[start_idx:end_idx],
+            self._word_start[start_idx:end_idx],
+            self._word_end[start_idx:end_idx],
+        )
+
+    def _sentence_dicts(self, start_idx: int, end_idx: int) -> list[dict]:
+        return self._span_dicts(
+            "sentence",
+            self._sentence_start_char[start_idx:end_idx],
+            self._sentence_end_char[start_idx:end_idx],
+            self._sentence_start[start_idx:end_idx],
+            self._sentence_end[start_idx:end_idx],
+        )
+
+    def _span_dicts(
+        self,
+        text_key: str,
+        start_chars: np.ndarray,
+        end_chars: np.ndarray,
+        start_times: np.ndarray,
+        end_times: np.ndarray,
+    ) -> list[dict]:
+        return [
+            {
+                text_key: self._text[start_char:end_char],
+                "start_time": start_time,
+                "end_time": end_time,
+                "start_char": start_char,
+                "end_char": end_char,
+            }
+            for start_char, end_char, start_time, end_time in zip(
+                start_chars.tolist(),
+                end_chars.tolist(),
+                _to_optional_list(start_times),
+                _to_optional_list(end_times),
+            )
+        ]
 
     def _validate_time_range(self, start: float, end: float) -> None:
         if type(start) is not type(end):
@@ -211,16 +627,73 @@ class Transcription:
         if start < 0 or start >= end or end > self.end_time:
             raise TranscriptionError("Invalid time range: {} to {}".format(start, end))
 
-    def _binary_search(self, data: list[dict], target: float, mode: str) -> int:
-        left, right = 0, len(data) - 1
-        while left <= right:
-            mid = (left + right) // 2
-            s, e = data[mid]["start_time"], data[mid]["end_time"]
-            if s <= target <= e:
-                return mid
-            elif target > e:
-                left = mid + 1
-            else:
-                right = mid - 1
-
-        return (left - 1 if mode == "start" else right + 1)
+
+def sent_tokenize(text: str) -> list[str]:
+    """
+    Splits text into sentences with NLTK's punkt tokenizer, downloading the punkt
+    data the first time it's missing instead of at import.
+    """
+    from nltk.tokenize import sent_tokenize as nltk_sent_tokenize
+
+    try:
+        return nltk_sent_tokenize(text)
+    except LookupError:
+        import nltk
+
+        logging.info("Downloading NLTK punkt data for sentence tokenization.")
+        for resource in PUNKT_RESOURCES:
+            nltk.download(resource, quiet=True)
+        return nltk_sent_tokenize(text)
+
+
+class _LazySearchTimes(dict):
+    """
+    The search times of each level, computed when a level is first searched.
+    """
+
+    def __init__(self, transcription: Transcription) -> None:
+        super().__init__()
+        self._transcription = transcription
+
+    def __missing__(self, level: str) -> tuple[np.ndarray, np.ndarray]:
+        t = self._transcription
+        starts = getattr(t, "_{}_start".format(level))
+        ends = getattr(t, "_{}_end".format(level))
+        self[level] = t._monotonic_times(starts, ends)
+        return self[level]
+
+
+def _aligned(num_bytes: int) -> int:
+    """
+    Rounds a number of bytes up to a multiple of BINARY_ALIGNMENT.
+    """
+    return -(-num_bytes // BINARY_ALIGNMENT) * BINARY_ALIGNMENT
+
+
+def _find_runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Start (inclusive) and end (exclusive) indices of the runs of True in a mask.
+    """
+    edges = np.diff(np.concatenate([[False], mask, [False]]).astype(np.int8))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _label_runs(length: int, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    Index of the [start, end) run each position belongs to, -1 outside of runs.
+    """
+    counts = np.zeros(length + 1, dtype=np.int64)
+    np.add.at(counts, starts, 1)
+    np.add.at(counts, ends, -1)
+    in_run = np.cumsum(counts[:-1]) > 0
+    labels = np.cumsum(np.bincount(starts, minlength=length + 1)[:-1]) - 1
+    return np.where(in_run, labels, NO_INDEX).astype(np.int32)
+
+
+def _to_optional_list(values: np.ndarray) -> list:
+    """
+    Converts an array to a list with NaN times and -1 indices replaced by None.
+    """
+    if values.dtype.kind == "f":
+        return [None if v != v else v for v in values.tolist()]
+    return [None if v == NO_INDEX else v for v in values.tolist()]
@@ -2,26 +2,141 @@
 Embed text using the Roberta model for downstream segmentation tasks.
 """
 
+from __future__ import annotations
+from functools import partial
+import logging
+from typing import TYPE_CHECKING
+
+import numpy as np
 import torch
-from sentence_transformers import SentenceTransformer
+
+# sentence_transformers is imported where it's used, as importing it takes seconds
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+from .embedding_cache import EmbeddingCache
+from ai_clips_maker.utils.config_manager import ConfigManager
+from ai_clips_maker.utils.model_registry import MODEL_REGISTRY
+from ai_clips_maker.utils.pytorch import (
+    get_compute_device,
+    assert_compute_device_available,
+)
+
+EMBEDDING_MODEL_NAME = "all-roberta-large-v1"
+# fp32 torch, int8 dynamically quantized torch (CPU only), ONNX Runtime
+EMBEDDING_BACKENDS = ["torch", "torch-int8", "onnx"]
+
+
+def _load_sentence_transformer(
+    model_name: str, device: str, backend: str
+) -> SentenceTransformer:
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "onnx":
+        return SentenceTransformer(model_name, device=device, backend="onnx")
+    model = SentenceTransformer(model_name, device=device)
+    if backend == "torch-int8":
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    return model
 
 
 class TextEmbedder:
     """
     Generates vector representations (embeddings) of text using the 'all-roberta-large-v1' model.
     Useful for semantic comparison and text segmentation.
+
+    The model is loaded from the process-wide model registry on first use, so every
+    TextEmbedder on the same device shares a single copy of it. Faster backends
+    (int8 quantized torch or ONNX Runtime) and smaller models can be used instead,
+    trading some accuracy for throughput.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        device: str = None,
+        model_name: str = EMBEDDING_MODEL_NAME,
+        cache_dir: str = None,
+        backend: str = "torch",
+    ) -> None:
+        """
+        Parameters
+        ----------
+        device: str, optional
+            PyTorch device to embed sentences on. Ex: 'cpu', 'cuda'. Default is None
+            (auto detects the correct device).
+        model_name: str, optional
+            The SentenceTransformer model to embed sentences with.
+        cache_dir: str, optional
+            Directory of a persistent embedding cache. Sentences that were already
+            embedded by the same model are read from the cache instead of being
+            embedded again. Default is None (no caching).
+        backend: str, optional
+            The backend to run the model with. One of 'torch' (fp32), 'torch-int8'
+            (int8 dynamic quantization, CPU only) or 'onnx' (ONNX Runtime, requires
+            `optimum[onnxruntime]`). Default is 'torch'.
         """
-        Initializes the SentenceTransformer model.
+        if device is None:
+            device = get_compute_device()
+        assert_compute_device_available(device)
+        TextEmbedderConfigManager().assert_valid_config(
+            {"backend": backend, "device": device, "model_name": model_name}
+        )
+        self._device = device
+        self._model_name = model_name
+        self._backend = backend
+        # the same model run by different backends yields different embeddings
+        self._registry_name = model_name
+        if backend != "torch":
+            self._registry_name = "{}@{}".format(model_name, backend)
+        self._loader = partial(_load_sentence_transformer, model_name, backend=backend)
+        self._cache = None
+        if cache_dir is not None:
+            self._cache = EmbeddingCache(cache_dir, namespace=self._registry_name)
+
+    @property
+    def device(self) -> str:
+        """Returns the PyTorch device sentences are embedded on."""
+        return self._device
+
+    @property
+    def model_name(self) -> str:
+        """Returns the name of the SentenceTransformer model."""
+        return self._model_name
+
+    @property
+    def backend(self) -> str:
+        """Returns the backend the model is run with."""
+        return self._backend
+
+    def warm_up(self, pin: bool = False) -> None:
         """
-        self.__model = SentenceTransformer("all-roberta-large-v1")
+        Loads the model ahead of the first call to `embed_sentences`.
+
+        Parameters
+        ----------
+        pin: bool, optional
+            Whether to keep the model loaded when the registry releases all unpinned
+            models. Default is False.
+        """
+        MODEL_REGISTRY.warm_up(self._registry_name, self._device, self._loader, pin=pin)
+
+    def release(self) -> None:
+        """
+        Releases the model from the process-wide registry. It is loaded again on the
+        next call to `embed_sentences`.
+        """
+        MODEL_REGISTRY.release(self._registry_name, self._device)
 
     def embed_sentences(self, sentences: list[str]) -> torch.Tensor:
         """
         Transforms a list of sentences into embedding vectors.
 
+        With a cache, only the sentences that aren't cached are embedded, in a
+        single batch, and all embeddings are rounded to the cache's float16
+        precision so results don't depend on what was cached.
+
         Parameters
         ----------
         sentences: list[str]
@@ -33,5 +148,67 @@ class TextEmbedder:
             A 2D tensor of shape (N x E), where N is the number of sentences
             and E is the embedding dimension.
         """
-        embeddings = self.__model.encode(sentences, convert_to_tensor=True)
+        if len(sentences) == 0:
+            model = MODEL_REGISTRY.get(self._registry_name, self._device, self._loader)
+            return torch.empty(
+                (0, model.get_sentence_embedding_dimension()), device=self._device
+            )
+        if self._cache is None:
+            return self._encode(sentences)
+
+        keys = [EmbeddingCache.make_key(self._registry_name, s) for s in sentences]
+        cached = self._cache.get_many(keys)
+        misses = {}
+        for key, sentence in zip(keys, sentences):
+            if key not in cached and key not in misses:
+                misses[key] = sentence
+        logging.debug(
+            "{} of {} sentence embeddings are cached.".format(
+                len(sentences) - len(misses), len(sentences)
+            )
+        )
+
+        if len(misses) > 0:
+            new_embeddings = self._encode(list(misses.values()))
+            new_embeddings = new_embeddings.cpu().numpy().astype(np.float16)
+            self._cache.put_many(list(misses.keys()), new_embeddings)
+            cached.update(zip(misses.keys(), new_embeddings))
+        # also persists the recency of the cached embeddings
+        self._cache.flush()
+
+        embeddings = np.stack([cached[key] for key in keys]).astype(np.float32)
+        return torch.from_numpy(embeddings).to(self._device)
+
+    def _encode(self, sentences: list[str]) -> torch.Tensor:
+        """
+        Embeds sentences with the model.
+        """
+        model = MODEL_REGISTRY.get(self._registry_name, self._device, self._loader)
+        embeddings = model.encode(sentences, convert_to_tensor=True)
         return embeddings
+
+
+class TextEmbedderConfigManager(ConfigManager):
+    """
+    Validates the configuration of a TextEmbedder.
+    """
+
+    def check_valid_config(self, config: dict) -> str | None:
+        err = self.check_valid_backend(config["backend"])
+        if err:
+            return err
+        if config["backend"] == "torch-int8" and config["device"] != "cpu":
+            return "The 'torch-int8' backend only runs on 'cpu', not '{}'.".format(
+                config["device"]
+            )
+        if not isinstance(config["model_name"], str) or not config["model_name"]:
+            return f"Invalid model_name: {config['model_name']}"
+        return None
+
+    def check_valid_backend(self, backend: str) -> str | None:
+        if backend not in EMBEDDING_BACKENDS:
+            return (
+                f"Invalid embedding backend: {backend}. "
+                f"Must be one of {EMBEDDING_BACKENDS}."
+            )
+        return None
@@ -0,0 +1,252 @@
+"""
+A persistent, content-addressed cache of sentence embeddings.
+"""
+# standard library imports
+from collections import OrderedDict
+from collections.abc import Iterable
+import hashlib
+import json
+import logging
+import os
+import re
+
+# 3rd party imports
+import numpy as np
+
+# default maximum number of embeddings kept in a cache
+DEFAULT_CAPACITY = 100000
+VECTORS_FILENAME = "vectors.npy"
+INDEX_FILENAME = "index.json"
+
+
+class EmbeddingCache:
+    """
+    Caches sentence embeddings on disk, keyed by a hash of the embedding model's
+    name and the sentence's text.
+
+    Embeddings are stored as float16 vectors in a memory-mapped array with a fixed
+    number of slots. When every slot is taken, the least recently used embedding is
+    evicted. Each namespace (e.g. embedding model) has its own store in a
+    subdirectory, as models embed into different dimensions. The index, including
+    the order in which embeddings were used, is written by `flush`, not by every
+    `put_many`. A slot the index on disk maps to another key is only overwritten
+    after that key is removed from the index on disk, so a process dying between
+    two flushes can lose embeddings but never return a wrong one. The cache is not
+    safe to share between processes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        capacity: int = DEFAULT_CAPACITY,
+        namespace: str = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        cache_dir: str
+            Directory the cache is stored in. It is created if it doesn't exist.
+        capacity: int, optional
+            Maximum number of embeddings to keep. Ignored if the cache already
+            exists. Default is 100000.
+        namespace: str, optional
+            Name of the store within `cache_dir`, e.g. the embedding model's name.
+            Default is None (the store is `cache_dir` itself).
+        """
+        if namespace is not None:
+            cache_dir = os.path.join(cache_dir, re.sub(r"[^\w.@-]", "_", namespace))
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cache_dir = cache_dir
+        self._vectors_path = os.path.join(cache_dir, VECTORS_FILENAME)
+        self._index_path = os.path.join(cache_dir, INDEX_FILENAME)
+        self._capacity = capacity
+        self._dim = None
+        self._vectors = None
+        # key -> slot, in order of use (least recently used first)
+        self._slots = OrderedDict()
+        # slot -> key, as in the index on disk
+        self._persisted_keys = {}
+        self._free_slots = []
+        self._is_dirty = False
+
+        if os.path.exists(self._index_path) and os.path.exists(self._vectors_path):
+            with open(self._index_path, "r") as f:
+                index = json.load(f)
+            self._capacity = index["capacity"]
+            self._dim = index["dim"]
+            self._slots = OrderedDict((key, slot) for key, slot in index["slots"])
+            self._persisted_keys = {slot: key for key, slot in self._slots.items()}
+            self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+        self._free_slots = self._find_free_slots()
+
+    @property
+    def cache_dir(self) -> str:
+        """Returns the directory the cache is stored in."""
+        return self._cache_dir
+
+    @property
+    def capacity(self) -> int:
+        """Returns the maximum number of embeddings kept in the cache."""
+        return self._capacity
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @staticmethod
+    def make_key(model_name: str, sentence: str) -> str:
+        """
+        Returns the cache key of a sentence embedded by a model.
+
+        Parameters
+        ----------
+        model_name: str
+            The name of the embedding model.
+        sentence: str
+            The embedded sentence.
+
+        Returns
+        -------
+        str
+            The cache key.
+        """
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(model_name.encode())
+        hasher.update(b"\0")
+        hasher.update(sentence.encode())
+        return hasher.hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """
+        Looks up the embeddings of several keys and marks them as recently used.
+
+        Parameters
+        ----------
+        keys: list[str]
+            The cache keys to look up.
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            The cached float16 embeddings keyed by cache key. Keys that aren't
+            cached are missing.
+        """
+        hits = [key for key in dict.fromkeys(keys) if key in self._slots]
+        if len(hits) == 0:
+            return {}
+        for key in hits:
+            self._slots.move_to_end(key)
+        self._is_dirty = True
+        vectors = self._vectors[[self._slots[key] for key in hits]]
+        return dict(zip(hits, vectors))
+
+    def put_many(self, keys: list[str], embeddings: np.ndarray) -> None:
+        """
+        Stores the embeddings of several keys, evicting the least recently used
+        embeddings if the cache is full. Call `flush` to persist them.
+
+        If the embeddings' dimension differs from the cached ones (e.g. the store
+        was filled by another model), the cache is emptied first.
+
+        Parameters
+        ----------
+        keys: list[str]
+            The cache keys of the embeddings.
+        embeddings: np.ndarray
+            The (N x E) embeddings to store.
+        """
+        if len(keys) == 0:
+            return
+        dim = int(embeddings.shape[1])
+        if self._vectors is not None and dim != self._dim:
+            logging.warning(
+                "Emptying the embedding cache in '{}': it holds {}-dimensional "
+                "embeddings, not {}-dimensional ones.".format(
+                    self._cache_dir, self._dim, dim
+                )
+            )
+            self._vectors = None
+            self._slots = OrderedDict()
+        if self._vectors is None:
+            # the old index must not outlive the vectors it maps
+            if os.path.exists(self._index_path):
+                os.remove(self._index_path)
+            self._persisted_keys = {}
+            self._dim = dim
+            self._vectors = np.lib.format.open_memmap(
+                self._vectors_path,
+                mode="w+",
+                dtype=np.float16,
+                shape=(self._capacity, self._dim),
+            )
+            self._free_slots = self._find_free_slots()
+        self._is_dirty = True
+
+        num_evicted = 0
+        slots = []
+        for key in keys:
+            if key in self._slots:
+                slot = self._slots[key]
+                self._slots.move_to_end(key)
+            elif len(self._free_slots) > 0:
+                slot = self._free_slots.pop()
+            else:
+                _, slot = self._slots.popitem(last=False)
+                num_evicted += 1
+            self._slots[key] = slot
+            slots.append(slot)
+
+        # drop the evicted keys from the index on disk before their slots are reused
+        stale_slots = [
+            slot
+            for key, slot in zip(keys, slots)
+            if self._persisted_keys.get(slot, key) != key
+        ]
+        if len(stale_slots) > 0:
+            for slot in stale_slots:
+                del self._persisted_keys[slot]
+            self._write_index(
+                (key, slot)
+                for key, slot in self._slots.items()
+                if self._persisted_keys.get(slot) == key
+            )
+        for slot, embedding in zip(slots, embeddings):
+            self._vectors[slot] = embedding
+
+        if num_evicted > 0:
+            logging.debug("Evicted {} cached embeddings.".format(num_evicted))
+
+    def flush(self) -> None:
+        """
+        Writes the cached embeddings and the cache's index to disk, if anything
+        was stored since the last flush.
+        """
+        if self._vectors is None or not self._is_dirty:
+            return
+        self._vectors.flush()
+        self._write_index(self._slots.items())
+        self._persisted_keys = {slot: key for key, slot in self._slots.items()}
+        self._is_dirty = False
+
+    def _write_index(self, slots: Iterable[tuple[str, int]]) -> None:
+        """
+        Atomically replaces the index on disk with the given (key, slot) pairs,
+        least recently used first.
+        """
+        index = {
+            "capacity": self._capacity,
+            "dim": self._dim,
+            "slots": list(slots),
+        }
+        tmp_index_path = self._index_path + ".tmp"
+        with open(tmp_index_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_index_path, self._index_path)
+
+    def _find_free_slots(self) -> list[int]:
+        """
+        Returns the slots that hold no embedding, lowest last so it's used first.
+        """
+        taken = set(self._slots.values())
+        return [
+            slot for slot in range(self._capacity - 1, -1, -1) if slot not in taken
+        ]
@@ -3,12 +3,17 @@ Segment extraction from audio using embedding-based TextTiling segmentation.
 Ideal for generating meaningful portions from transcripts.
 """
 
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from heapq import merge
 import logging
+import os
 import torch
 
 from .matcher import MediaSegment
 from .exceptions import ClipSegmentationError as ClipFinderError
-from .embed_vectorizer import TextEmbedder
+from .embed_vectorizer import EMBEDDING_MODEL_NAME, TextEmbedder
 from .tiler_algorithm import TextTiler, TextTilerConfigManager
 
 from ai_clips_maker.transcribe.transcription import Transcription
@@ -16,6 +21,18 @@ from ai_clips_maker.utils.pytorch import get_compute_device, assert_compute_devi
 from ai_clips_maker.utils.utils import find_missing_dict_keys
 
 BOUNDARY = 1
+# a clip is a duplicate of another if their start and end times differ by less
+# than this many seconds in total
+DUPLICATE_TIME_DELTA_SECS = 15
+# window sizes of the TextTiling hierarchies and the minimum duration of their clips
+# (None for the ClipFinder's min_clip_duration)
+HIERARCHY_SCALES = [
+    ([5, 7], None),
+    ([11, 17], 180),
+    ([37, 53, 73, 97], 600),
+]
+# text tiling stops once a round has this few segments
+MIN_SEGMENTS_PER_ROUND = 8
 
 
 class ClipFinder:
@@ -33,9 +50,17 @@ class ClipFinder:
         embedding_aggregation_pool_method: str = "max",
         smoothing_width: int = 3,
         window_compare_pool_method: str = "mean",
+        embedding_cache_dir: str = None,
+        embedding_model: str = EMBEDDING_MODEL_NAME,
+        embedding_backend: str = "torch",
     ) -> None:
         """
         Initializes the ClipFinder with segmentation strategy configuration.
+
+        If `embedding_cache_dir` is given, sentence embeddings are cached there so
+        re-running the ClipFinder on the same sentences skips embedding them.
+        `embedding_model` and `embedding_backend` ('torch', 'torch-int8' or 'onnx')
+        select the sentence embedding model and how it is run (see TextEmbedder).
         """
         config_manager = ClipFinderConfigManager()
         config_manager.assert_valid_config(
@@ -58,6 +83,14 @@ class ClipFinder:
         self._max_clip_duration = max_clip_duration
         self._smoothing_width = smoothing_width
         self._window_compare_pool_method = window_compare_pool_method
+        # the embedding model is shared process-wide and loaded on first use
+        self._embedder = TextEmbedder(
+            device,
+            model_name=embedding_model,
+            cache_dir=embedding_cache_dir,
+            backend=embedding_backend,
+        )
+        self._tiler = TextTiler(device)
 
     def find_clips(self, transcription: Transcription) -> list[MediaSegment]:
         """
@@ -66,29 +99,38 @@ class ClipFinder:
         sentences_info = transcription.get_sentence_info()
         sentences = [info["sentence"] for info in sentences_info]
 
-        embedder = TextEmbedder()
-        sentence_embeddings = embedder.embed_sentences(sentences)
+        sentence_embeddings = self._embedder.embed_sentences(sentences)
 
         clips = []
         if transcription.end_time <= self._max_clip_duration:
             clips.append({
                 "start_char": 0,
-                "end_char": len(transcription.get_char_info()),
+                "end_char": len(transcription.text),
                 "start_time": 0,
                 "end_time": transcription.end_time,
                 "norm": 1.0
             })
+        clip_index = _ClipIndex(clips)
 
-        for k_vals, min_sec in [([5, 7], self._min_clip_duration), ([11, 17], 180), ([37, 53, 73, 97], 600)]:
-            for k in k_vals:
-                clips = self._text_tile_multiple_rounds(
-                    sentences_info,
-                    sentence_embeddings,
-                    k,
+        ks = [k for k_vals, _ in HIERARCHY_SCALES for k in k_vals]
+        hierarchies = self._text_tile_hierarchies(
+            sentences_info, sentence_embeddings, ks
+        )
+        # duplicates are removed in order of k, so the clips don't depend on which
+        # hierarchy finished first
+        k_idx = 0
+        for k_vals, min_sec in HIERARCHY_SCALES:
+            if min_sec is None:
+                min_sec = self._min_clip_duration
+            for _ in k_vals:
+                self._add_new_clips(
+                    hierarchies[k_idx],
                     min_sec,
                     self._max_clip_duration,
-                    clips
+                    clips,
+                    clip_index,
                 )
+                k_idx += 1
 
         return [
             MediaSegment(
@@ -99,35 +141,71 @@ class ClipFinder:
             ) for clip in clips
         ]
 
-    def _text_tile_multiple_rounds(
+    def _text_tile_hierarchies(
         self,
         clips: list[dict],
-        clip_embeddings: torch.tensor,
+        clip_embeddings: torch.Tensor,
+        ks: list[int],
+    ) -> list[list[list[dict]]]:
+        """
+        Builds the hierarchy of each window size in `ks`, returning the super clips
+        of every round of each. The first rounds share one multiscale pass over the
+        embeddings, then the hierarchies continue concurrently.
+        """
+        if len(clip_embeddings) <= MIN_SEGMENTS_PER_ROUND:
+            return [[] for _ in ks]
+
+        first_rounds = self._text_tile_multiscale(clips, clip_embeddings, ks)
+        num_workers = min(len(ks), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = [
+                executor.submit(
+                    self._text_tile_hierarchy, super_clips, super_embeddings, k
+                )
+                for (super_clips, super_embeddings), k in zip(first_rounds, ks)
+            ]
+            return [
+                [super_clips] + future.result()
+                for (super_clips, _), future in zip(first_rounds, futures)
+            ]
+
+    def _text_tile_hierarchy(
+        self,
+        clips: list[dict],
+        clip_embeddings: torch.Tensor,
         k: int,
+    ) -> list[list[dict]]:
+        """
+        Text tiles the clips round after round, returning the super clips of every
+        round.
+        """
+        rounds = []
+        while len(clip_embeddings) > MIN_SEGMENTS_PER_ROUND:
+            clips, clip_embeddings = self._text_tile(clips, clip_embeddings, k)
+            rounds.append(clips)
+        return rounds
+
+    def _add_new_clips(
+        self,
+        rounds: list[list[dict]],
         min_clip_duration: int,
         max_clip_duration: int,
-        final_clips: list[dict] = [],
-    ) -> list[dict]:
+        final_clips: list[dict],
+        clip_index: "_ClipIndex",
+    ) -> None:
         """
-        Applies multi-round segmentation using TextTiling and filters results.
+        Adds the clips of each round that aren't duplicates of earlier ones.
         """
-        self._text_tile_round = 0
-        while len(clip_embeddings) > 8:
-            self._text_tile_round += 1
-            super_clips, super_embeddings = self._text_tile(
-                clips, clip_embeddings, k
-            )
+        for super_clips in rounds:
             new_clips = self._remove_duplicates(
                 super_clips,
-                final_clips,
+                clip_index,
                 min_clip_duration,
                 max_clip_duration,
             )
+            # a round's clips are only compared to the clips of earlier rounds
+            clip_index.add(new_clips)
             final_clips += new_clips
-            clips = super_clips
-            clip_embeddings = super_embeddings
-
-        return final_clips
 
     def _text_tile(
         self,
@@ -138,23 +216,47 @@ class ClipFinder:
         """
         Runs the TextTiling algorithm and constructs new combined segments.
         """
+        return self._text_tile_multiscale(clips, clip_embeddings, [k])[0]
+
+    def _text_tile_multiscale(
+        self,
+        clips: list[dict],
+        clip_embeddings: torch.tensor,
+        ks: list[int],
+    ) -> list[tuple[list, torch.Tensor]]:
+        """
+        Runs the TextTiling algorithm with each window size in `ks` and constructs
+        the combined segments of each.
+        """
         if len(clip_embeddings) != len(clips):
             msg = f"Embedding length ({len(clip_embeddings)}) and clips ({len(clips)}) mismatch."
             logging.error(msg)
             raise ClipFinderError(msg)
 
-        tiler = TextTiler(self._device)
-        k = min(k, max(3, len(clip_embeddings)))
+        ks = [min(k, max(3, len(clip_embeddings))) for k in ks]
 
-        boundaries, new_embeddings = tiler.text_tile(
+        tilings = self._tiler.text_tile_multiscale(
             clip_embeddings,
-            k,
+            ks,
             self._window_compare_pool_method,
             self._embedding_aggregation_pool_method,
             self._smoothing_width,
             self._cutoff_policy,
         )
+        return [
+            self._combine_clips(clips, boundaries, new_embeddings)
+            for boundaries, new_embeddings in tilings
+        ]
 
+    def _combine_clips(
+        self,
+        clips: list[dict],
+        boundaries: list,
+        new_embeddings: torch.Tensor,
+    ) -> tuple[list, torch.Tensor]:
+        """
+        Combines the clips between consecutive boundaries into super clips.
+        """
         super_clips = []
         start_idx = 0
         super_idx = 0
@@ -178,7 +280,7 @@ class ClipFinder:
     def _remove_duplicates(
         self,
         potential: list[dict],
-        existing: list[dict],
+        existing: "_ClipIndex",
         min_dur: int,
         max_dur: int,
     ) -> list[dict]:
@@ -190,20 +292,52 @@ class ClipFinder:
             duration = clip["end_time"] - clip["start_time"]
             if not (min_dur <= duration <= max_dur):
                 continue
-            if self._is_duplicate(clip, existing):
+            if existing.is_duplicate(clip):
                 continue
             results.append(clip)
         return results
 
-    def _is_duplicate(self, seg: dict, existing: list[dict]) -> bool:
+
+class _ClipIndex:
+    """
+    The (start, end) times of clips sorted by start time. A clip can only be a
+    duplicate of clips starting less than DUPLICATE_TIME_DELTA_SECS away from it,
+    so finding duplicates only visits those.
+    """
+
+    def __init__(self, clips: Sequence[dict] = ()) -> None:
+        self._starts = []
+        self._ends = []
+        self.add(clips)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def is_duplicate(self, clip: dict) -> bool:
         """
-        Determines if segment already exists (based on small time delta).
+        Determines if a clip with almost the same start and end times is indexed.
         """
-        for ref in existing:
-            if abs(seg["start_time"] - ref["start_time"]) + abs(seg["end_time"] - ref["end_time"]) < 15:
+        start, end = clip["start_time"], clip["end_time"]
+        lo = bisect_left(self._starts, start - DUPLICATE_TIME_DELTA_SECS)
+        hi = bisect_right(self._starts, start + DUPLICATE_TIME_DELTA_SECS)
+        for i in range(lo, hi):
+            delta = abs(start - self._starts[i]) + abs(end - self._ends[i])
+            if delta < DUPLICATE_TIME_DELTA_SECS:
                 return True
         return False
 
+    def add(self, clips: Sequence[dict]) -> None:
+        """
+        Indexes a batch of clips. Only the batch is sorted; it is then merged
+        into the already sorted index in linear time.
+        """
+        if len(clips) == 0:
+            return
+        batch = sorted((clip["start_time"], clip["end_time"]) for clip in clips)
+        times = list(merge(zip(self._starts, self._ends), batch))
+        self._starts = [start for start, _ in times]
+        self._ends = [end for _, end in times]
+
 
 class ClipFinderConfigManager(TextTilerConfigManager):
     """
@@ -248,9 +382,9 @@ class ClipFinderConfigManager(TextTilerConfigManager):
 
         validators = {
             "cutoff_policy": self.check_valid_cutoff_policy,
-            "embedding_aggregation_pool_method": self.check_valid_embedding_aggregation_pool_method,
+            "embedding_aggregation_pool_method": self.check_valid_pool_method,
             "smoothing_width": self.check_valid_smoothing_width,
-            "window_compare_pool_method": self.check_valid_window_compare_pool_method,
+            "window_compare_pool_method": self.check_valid_pool_method,
         }
         for key, func in validators.items():
             result = func(cfg[key])
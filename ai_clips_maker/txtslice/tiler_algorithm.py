@@ -60,37 +60,69 @@ class TextTiler:
         Segments the input embeddings and returns the detected boundaries and
         pooled segment embeddings.
         """
-        config = {
-            "k": k,
-            "window_compare_pool_method": window_compare_pool_method,
-            "embedding_aggregation_pool_method": embedding_aggregation_pool_method,
-            "smoothing_width": smoothing_width,
-            "cutoff_policy": cutoff_policy,
-        }
-        self._config_checker.assert_valid_config(config)
+        return self.text_tile_multiscale(
+            embeddings,
+            [k],
+            window_compare_pool_method,
+            embedding_aggregation_pool_method,
+            smoothing_width,
+            cutoff_policy,
+        )[0]
+
+    def text_tile_multiscale(
+        self,
+        embeddings: torch.Tensor,
+        ks: list[int],
+        window_compare_pool_method: str = "mean",
+        embedding_aggregation_pool_method: str = "max",
+        smoothing_width: int = 3,
+        cutoff_policy: str = "high",
+    ) -> list[tuple[list, torch.Tensor]]:
+        """
+        Segments the same embeddings with each window size in `ks`, as `text_tile`
+        would for each of them. The work shared by the window sizes (e.g. the
+        prefix sums of the embeddings) is done once.
+        """
+        for k in ks:
+            config = {
+                "k": k,
+                "window_compare_pool_method": window_compare_pool_method,
+                "embedding_aggregation_pool_method": embedding_aggregation_pool_method,
+                "smoothing_width": smoothing_width,
+                "cutoff_policy": cutoff_policy,
+            }
+            self._config_checker.assert_valid_config(config)
 
         N, E = embeddings.shape
 
-        if k >= N:
-            new_k = max(N // 5, 2)
-            logging.warning(
-                f"{N} embeddings is too few for k={k}. Using k={new_k} instead."
-            )
-            k = new_k
+        adjusted_ks = []
+        for k in ks:
+            if k >= N:
+                new_k = max(N // 5, 2)
+                logging.warning(
+                    f"{N} embeddings is too few for k={k}. Using k={new_k} instead."
+                )
+                k = new_k
+            adjusted_ks.append(k)
 
         if smoothing_width >= N:
             smoothing_width = 2
 
-        unsmoothed_scores = self._calc_gap_scores(embeddings, k, window_compare_pool_method)
-        smoothed_scores = self._smooth_scores(unsmoothed_scores, smoothing_width)
-        depth_scores = self._calc_depth_scores(smoothed_scores)
-        boundaries = self._identify_boundaries(depth_scores, cutoff_policy)
-
-        pooled_embeddings = self._pool_embedding_groups(
-            embeddings, boundaries, embedding_aggregation_pool_method
+        results = []
+        multiscale_gap_scores = self._calc_multiscale_gap_scores(
+            embeddings, adjusted_ks, window_compare_pool_method
         )
+        for unsmoothed_scores in multiscale_gap_scores:
+            smoothed_scores = self._smooth_scores(unsmoothed_scores, smoothing_width)
+            depth_scores = self._calc_depth_scores(smoothed_scores)
+            boundaries = self._identify_boundaries(depth_scores, cutoff_policy)
+
+            pooled_embeddings = self._pool_embedding_groups(
+                embeddings, boundaries, embedding_aggregation_pool_method
+            )
+            results.append((list(boundaries), pooled_embeddings))
 
-        return list(boundaries), pooled_embeddings
+        return results
 
     def _calc_gap_scores(
         self,
@@ -98,18 +130,53 @@ class TextTiler:
         k: int,
         pool_method: str,
     ) -> torch.Tensor:
-        pool = self._get_pool_method(pool_method)
-        N = embeddings.shape[0]
-        gap_scores = torch.empty(N - 1, device=self._device)
+        """
+        Compares the pooled windows of (up to) k embeddings left and right of every
+        gap. All windows are pooled at once, so this runs in O(N * E).
+        """
+        return self._calc_multiscale_gap_scores(embeddings, [k], pool_method)[0]
 
-        for i in range(N - 1):
-            left = embeddings[max(0, i - k + 1): i + 1]
-            right = embeddings[i + 1: min(i + 1 + k, N)]
-            left_pooled = pool(left, dim=0)
-            right_pooled = pool(right, dim=0)
-            gap_scores[i] = F.cosine_similarity(left_pooled, right_pooled, dim=0)
+    def _calc_multiscale_gap_scores(
+        self,
+        embeddings: torch.Tensor,
+        ks: list[int],
+        pool_method: str,
+    ) -> list[torch.Tensor]:
+        """
+        Gap scores (see `_calc_gap_scores`) for each window size in `ks`. Mean
+        pooled windows of every size come from the same prefix sums.
+        """
+        self._get_pool_method(pool_method)
+        embeddings = embeddings.to(self._device)
+        N = embeddings.shape[0]
 
-        return gap_scores
+        # gap i lies between embeddings i and i + 1
+        gaps = torch.arange(N - 1, device=self._device)
+        if pool_method == "mean":
+            # window sums from prefix sums, in double precision to avoid drift
+            prefix = torch.zeros(
+                (N + 1, embeddings.shape[1]), dtype=torch.float64, device=self._device
+            )
+            prefix[1:] = torch.cumsum(embeddings.double(), dim=0)
+
+        multiscale_gap_scores = []
+        for k in ks:
+            if pool_method == "mean":
+                left_starts = torch.clamp(gaps - k + 1, min=0)
+                right_ends = torch.clamp(gaps + 1 + k, max=N)
+                left_pooled = (prefix[gaps + 1] - prefix[left_starts]) / (
+                    gaps + 1 - left_starts
+                ).unsqueeze(1)
+                right_pooled = (prefix[right_ends] - prefix[gaps + 1]) / (
+                    right_ends - gaps - 1
+                ).unsqueeze(1)
+            else:
+                left_pooled = _sliding_max_magnitude(embeddings, k, "left")[:-1]
+                right_pooled = _sliding_max_magnitude(embeddings, k, "right")[1:]
+
+            gap_scores = F.cosine_similarity(left_pooled, right_pooled, dim=1)
+            multiscale_gap_scores.append(gap_scores.to(embeddings.dtype))
+        return multiscale_gap_scores
 
     def _smooth_scores(self, scores: torch.Tensor, width: int) -> torch.Tensor:
         arr = scores.cpu().detach().numpy()
@@ -118,16 +185,13 @@ class TextTiler:
         )
 
     def _calc_depth_scores(self, gap_scores: torch.Tensor) -> torch.Tensor:
-        N = len(gap_scores)
-        depths = torch.zeros(N, device=self._device)
-
-        for i in range(N):
-            g = gap_scores[i]
-            left_peak = max(gap_scores[max(0, i - j)] for j in range(i + 1))
-            right_peak = max(gap_scores[min(N - 1, i + j)] for j in range(N - i))
-            depths[i] = (left_peak - g) + (right_peak - g)
-
-        return depths
+        """
+        Depth of each gap below the highest gap score to its left and to its right,
+        found with running maxima.
+        """
+        left_peaks = torch.cummax(gap_scores, dim=0).values
+        right_peaks = torch.cummax(gap_scores.flip(0), dim=0).values.flip(0)
+        return (left_peaks - gap_scores) + (right_peaks - gap_scores)
 
     def _identify_boundaries(self, depths: torch.Tensor, policy: str) -> torch.Tensor:
         N = len(depths) + 1
@@ -138,13 +202,13 @@ class TextTiler:
         if cutoff is None:
             raise TextTilerError(f"Invalid cutoff_policy: {policy}")
 
-        for i in range(len(depths)):
-            if (
-                depths[i] > cutoff and
-                depths[i] > depths[max(0, i - 1)] and
-                depths[i] > depths[min(i + 1, len(depths) - 1)]
-            ):
-                boundaries[i] = 1
+        # boundaries are local depth maxima above the cutoff
+        prev_depths = torch.cat([depths[:1], depths[:-1]])
+        next_depths = torch.cat([depths[1:], depths[-1:]])
+        is_boundary = (
+            (depths > cutoff) & (depths > prev_depths) & (depths > next_depths)
+        )
+        boundaries[: N - 1][is_boundary] = BOUNDARY
 
         boundaries[N - 1] = BOUNDARY
         return boundaries
@@ -155,19 +219,30 @@ class TextTiler:
         boundaries: list,
         pool_method: str,
     ) -> torch.Tensor:
-        pool = self._get_pool_method(pool_method)
-        N, E = embeddings.shape
-        pooled = []
-        group = []
-
-        for i in range(N):
-            group.append(embeddings[i].unsqueeze(0))
-            if boundaries[i] == BOUNDARY:
-                group_tensor = torch.cat(group, dim=0)
-                pooled.append(pool(group_tensor, dim=0))
-                group = []
-
-        return torch.stack(pooled)
+        """
+        Pools each group of embeddings ending at a boundary with one segmented
+        reduction over the group index of every embedding.
+        """
+        self._get_pool_method(pool_method)
+        boundaries = torch.as_tensor(boundaries, device=embeddings.device) == BOUNDARY
+        # embeddings after a boundary start the next group
+        is_boundary = boundaries.to(torch.int64)
+        group_ids = torch.cumsum(is_boundary, dim=0) - is_boundary
+        num_groups = int(is_boundary.sum())
+        shape = (num_groups, embeddings.shape[1])
+
+        if pool_method == "mean":
+            return embeddings.new_zeros(shape).index_reduce_(
+                0, group_ids, embeddings, "mean", include_self=False
+            )
+        # the value with the largest magnitude, the positive one on ties
+        maxes = embeddings.new_zeros(shape).index_reduce_(
+            0, group_ids, embeddings, "amax", include_self=False
+        )
+        mins = embeddings.new_zeros(shape).index_reduce_(
+            0, group_ids, embeddings, "amin", include_self=False
+        )
+        return torch.where(maxes >= -mins, maxes, mins)
 
     def _get_pool_method(self, name: str) -> Callable[[torch.Tensor], Awaitable[torch.Tensor]]:
         if name == "mean":
@@ -177,6 +252,26 @@ class TextTiler:
         raise TextTilerError(f"Unknown pool_method: {name}")
 
 
+def _sliding_max_magnitude(
+    embeddings: torch.Tensor, k: int, side: str
+) -> torch.Tensor:
+    """
+    Pools each window of (up to) k embeddings ending ("left") or starting ("right")
+    at every position to the value with the largest magnitude in each dimension.
+    """
+    # (1, E, N) so each embedding dimension is a pooling channel
+    values = embeddings.T.unsqueeze(0)
+    padding = (k - 1, 0) if side == "left" else (0, k - 1)
+    maxes = F.max_pool1d(
+        F.pad(values, padding, value=-float("inf")), kernel_size=k, stride=1
+    )
+    mins = -F.max_pool1d(
+        F.pad(-values, padding, value=-float("inf")), kernel_size=k, stride=1
+    )
+    pooled = torch.where(maxes >= -mins, maxes, mins)
+    return pooled.squeeze(0).T
+
+
 def smooth(x, window_len=3, window="flat"):
     if x.ndim != 1:
         raise ValueError("smooth only accepts 1D arrays.")
@@ -31,6 +31,13 @@ class InvalidInputDataError(Exception):
     pass
 
 
+class ModelRegistryError(Exception):
+    """
+    Raised when a model registry operation refers to a model that isn't loaded.
+    """
+    pass
+
+
 class TimerError(Exception):
     """
     Raised when there is a misuse or failure in timing-related functionality.
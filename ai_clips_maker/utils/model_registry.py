@@ -0,0 +1,233 @@
+"""
+A process-wide registry of loaded models.
+
+Loading large models from disk can take longer than using them, so models are
+loaded once per process, on first use, and shared by every caller that asks for
+the same model on the same device.
+"""
+# built-in imports
+from collections.abc import Callable
+from concurrent.futures import Future
+import logging
+import threading
+
+# 3rd party imports
+import torch
+
+# local package imports
+from .exceptions import ModelRegistryError
+
+
+class ModelRegistry:
+    """
+    A thread-safe registry of lazily loaded models keyed by (model name, device).
+
+    Models stay loaded until they are released. Pinned models are not released by
+    `release_all`, so long-lived workers can keep the models they always need in
+    memory while freeing everything else.
+
+    A model is loaded without holding the registry's lock, so loading one model
+    doesn't block getting or loading others. Callers asking for a model that is
+    being loaded wait for that load instead of starting another one. A model
+    released while it is being loaded is returned to the callers waiting for it
+    but isn't kept.
+    """
+
+    def __init__(self) -> None:
+        self._models = {}
+        # (name, device) -> Future of the model, for models being loaded
+        self._loading = {}
+        # (name, device) -> number of times the model was released, so a load
+        # doesn't keep a model that was released while it was loading
+        self._generations = {}
+        self._pinned = set()
+        self._lock = threading.RLock()
+
+    def get(
+        self,
+        name: str,
+        device: str,
+        loader: Callable[[str], object],
+    ) -> object:
+        """
+        Returns the model with the given name on the given device, loading it with
+        `loader(device)` if it isn't loaded yet.
+
+        Parameters
+        ----------
+        name: str
+            The name of the model.
+        device: str
+            PyTorch device the model is loaded on. Ex: 'cpu', 'cuda'.
+        loader: Callable[[str], object]
+            Function that loads the model on a given device.
+
+        Returns
+        -------
+        object
+            The loaded model.
+        """
+        key = (name, device)
+        with self._lock:
+            if key in self._models:
+                return self._models[key]
+            future = self._loading.get(key)
+            generation = self._generations.get(key, 0)
+            if future is None:
+                future = Future()
+                self._loading[key] = future
+                is_loading = True
+            else:
+                is_loading = False
+        if not is_loading:
+            return future.result()
+
+        logging.debug("Loading model '{}' on device '{}'.".format(name, device))
+        try:
+            model = loader(device)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._loading[key]
+            if self._generations.get(key, 0) == generation:
+                self._models[key] = model
+            else:
+                logging.debug(
+                    "Model '{}' on device '{}' was released while loading.".format(
+                        name, device
+                    )
+                )
+        future.set_result(model)
+        return model
+
+    def warm_up(
+        self,
+        name: str,
+        device: str,
+        loader: Callable[[str], object],
+        pin: bool = False,
+    ) -> None:
+        """
+        Loads a model ahead of its first use.
+
+        Parameters
+        ----------
+        name: str
+            The name of the model.
+        device: str
+            PyTorch device to load the model on. Ex: 'cpu', 'cuda'.
+        loader: Callable[[str], object]
+            Function that loads the model on a given device.
+        pin: bool
+            Whether to pin the model so `release_all` keeps it loaded.
+        """
+        self.get(name, device, loader)
+        with self._lock:
+            # the model may have been released since it was loaded
+            if pin and self.is_loaded(name, device):
+                self.pin(name, device)
+
+    def pin(self, name: str, device: str) -> None:
+        """
+        Pins a loaded model so `release_all` keeps it loaded.
+
+        Parameters
+        ----------
+        name: str
+            The name of the model.
+        device: str
+            PyTorch device the model is loaded on.
+        """
+        with self._lock:
+            if (name, device) not in self._models:
+                raise ModelRegistryError(
+                    "Model '{}' is not loaded on device '{}'.".format(name, device)
+                )
+            self._pinned.add((name, device))
+
+    def unpin(self, name: str, device: str) -> None:
+        """
+        Unpins a model so `release_all` releases it.
+
+        Parameters
+        ----------
+        name: str
+            The name of the model.
+        device: str
+            PyTorch device the model is loaded on.
+        """
+        with self._lock:
+            self._pinned.discard((name, device))
+
+    def is_loaded(self, name: str, device: str) -> bool:
+        """
+        Returns whether the model with the given name is loaded on the given device.
+
+        Parameters
+        ----------
+        name: str
+            The name of the model.
+        device: str
+            PyTorch device the model is loaded on.
+
+        Returns
+        -------
+        bool
+        """
+        with self._lock:
+            return (name, device) in self._models
+
+    def release(self, name: str, device: str) -> bool:
+        """
+        Releases a model, pinned or not, so its memory can be freed.
+
+        Parameters
+        ----------
+        name: str
+            The name of the model.
+        device: str
+            PyTorch device the model is loaded on.
+
+        Returns
+        -------
+        bool
+            True if the model was loaded, False otherwise.
+        """
+        with self._lock:
+            self._generations[(name, device)] = self._generations.get(
+                (name, device), 0
+            ) + 1
+            self._pinned.discard((name, device))
+            model = self._models.pop((name, device), None)
+        if model is None:
+            return False
+        del model
+        if device == "cuda" and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logging.debug("Released model '{}' on device '{}'.".format(name, device))
+        return True
+
+    def release_all(self, include_pinned: bool = False) -> None:
+        """
+        Releases every loaded model.
+
+        Parameters
+        ----------
+        include_pinned: bool
+            Whether to also release pinned models. Default is False.
+        """
+        with self._lock:
+            keys = [
+                key
+                for key in self._models
+                if include_pinned or key not in self._pinned
+            ]
+        for name, device in keys:
+            self.release(name, device)
+
+
+# models shared by every component in the process
+MODEL_REGISTRY = ModelRegistry()
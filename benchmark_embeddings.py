@@ -0,0 +1,214 @@
+"""
+Accuracy vs. throughput report of the sentence embedding backends.
+
+Embeds the sentences of a sample transcript with every backend and compares the
+embeddings and the resulting TextTiling boundaries to the fp32 torch reference.
+
+Usage:
+    python benchmark_embeddings.py transcript.txt \
+        [--models all-roberta-large-v1 all-MiniLM-L6-v2]
+
+Where the weights can't be downloaded, `--random-weights` builds each model from
+its architecture with random weights and a word-level tokenizer fitted to the
+transcript. Throughput is then representative of the real model (up to the
+tokenizer's sequence lengths), but the accuracy columns are not.
+
+Results with `--lines --random-weights --models all-roberta-large-v1
+all-MiniLM-L6-v2` on 297 English sentences (12 words on average), 1 core of an
+Intel Xeon, torch 2.8, sentence-transformers 6.1:
+
+    model                 backend      sent/s  speedup  mean cos  boundaries
+    all-roberta-large-v1  torch           8.2    1.00x    1.0000       1.000
+    all-roberta-large-v1  torch-int8     17.2    2.10x    0.9983*      1.000*
+    all-MiniLM-L6-v2      torch         171.6   20.98x         -       0.636*
+    all-MiniLM-L6-v2      torch-int8    279.9   34.20x         -       0.636*
+
+    * from random weights, so not representative of the trained models
+
+The onnx backend wasn't measured because optimum isn't installed there. Its
+numbers and the accuracy of every backend still need a run with the real weights.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import nltk
+import torch
+import torch.nn.functional as F
+
+from ai_clips_maker.txtslice.embed_vectorizer import (
+    EMBEDDING_BACKENDS,
+    EMBEDDING_MODEL_NAME,
+    TextEmbedder,
+)
+from ai_clips_maker.txtslice.tiler_algorithm import TextTiler
+
+# transformers config of the models that can be built with random weights
+MODEL_ARCHITECTURES = {
+    "all-roberta-large-v1": {
+        "model_type": "roberta",
+        "hidden_size": 1024,
+        "num_hidden_layers": 24,
+        "num_attention_heads": 16,
+        "intermediate_size": 4096,
+        "max_position_embeddings": 514,
+    },
+    "all-MiniLM-L6-v2": {
+        "model_type": "bert",
+        "hidden_size": 384,
+        "num_hidden_layers": 6,
+        "num_attention_heads": 12,
+        "intermediate_size": 1536,
+        "max_position_embeddings": 512,
+    },
+}
+
+
+def build_random_model(model_name: str, sentences: list[str], directory: str) -> str:
+    """
+    Saves a SentenceTransformer with the architecture of `model_name`, random
+    weights and a word-level tokenizer fitted to `sentences`, and returns its path.
+    """
+    from sentence_transformers import SentenceTransformer, models
+    from tokenizers import Tokenizer, pre_tokenizers, processors
+    from tokenizers.models import WordLevel
+    from tokenizers.trainers import WordLevelTrainer
+    from transformers import AutoConfig, AutoModel, PreTrainedTokenizerFast
+
+    special_tokens = ["<pad>", "<unk>", "<s>", "</s>"]
+    tokenizer = Tokenizer(WordLevel(unk_token="<unk>"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.train_from_iterator(
+        sentences, WordLevelTrainer(special_tokens=special_tokens)
+    )
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="<s> $A </s>", special_tokens=[("<s>", 2), ("</s>", 3)]
+    )
+    architecture = dict(MODEL_ARCHITECTURES[model_name])
+    config = AutoConfig.for_model(
+        architecture.pop("model_type"),
+        vocab_size=tokenizer.get_vocab_size(),
+        pad_token_id=0,
+        **architecture,
+    )
+    torch.manual_seed(0)
+    transformer_path = os.path.join(directory, model_name, "transformer")
+    AutoModel.from_config(config).save_pretrained(transformer_path)
+    PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        pad_token="<pad>",
+        unk_token="<unk>",
+        bos_token="<s>",
+        eos_token="</s>",
+        model_max_length=config.max_position_embeddings - 2,
+    ).save_pretrained(transformer_path)
+
+    transformer = models.Transformer(transformer_path)
+    pooling = models.Pooling(transformer.get_word_embedding_dimension(), "mean")
+    model_path = os.path.join(directory, model_name, "sentence-transformer")
+    SentenceTransformer(modules=[transformer, pooling, models.Normalize()]).save(
+        model_path
+    )
+    return model_path
+
+
+def embed(
+    model_name: str, backend: str, sentences: list[str]
+) -> tuple[torch.Tensor, float]:
+    embedder = TextEmbedder(device="cpu", model_name=model_name, backend=backend)
+    # load (and compile) the model before timing
+    embedder.warm_up()
+    embedder.embed_sentences(sentences[:8])
+    start = time.perf_counter()
+    embeddings = embedder.embed_sentences(sentences)
+    elapsed = time.perf_counter() - start
+    embedder.release()
+    return embeddings.float().cpu(), elapsed
+
+
+def boundary_agreement(
+    reference: torch.Tensor, embeddings: torch.Tensor, k: int
+) -> float:
+    tiler = TextTiler(device="cpu")
+    ref_boundaries, _ = tiler.text_tile(reference, k=k)
+    boundaries, _ = tiler.text_tile(embeddings, k=k)
+    ref_set = {i for i, b in enumerate(ref_boundaries) if b == 1}
+    new_set = {i for i, b in enumerate(boundaries) if b == 1}
+    return len(ref_set & new_set) / max(len(ref_set | new_set), 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("transcript", help="Path to a plain text transcript.")
+    parser.add_argument("--models", nargs="+", default=[EMBEDDING_MODEL_NAME])
+    parser.add_argument("--backends", nargs="+", default=EMBEDDING_BACKENDS)
+    parser.add_argument("--k", type=int, default=7, help="TextTiling window size.")
+    parser.add_argument(
+        "--lines",
+        action="store_true",
+        help="Read one sentence per line instead of splitting the transcript.",
+    )
+    parser.add_argument(
+        "--random-weights",
+        action="store_true",
+        help="Build the models with random weights instead of downloading them.",
+    )
+    args = parser.parse_args()
+
+    with open(args.transcript, "r") as f:
+        if args.lines:
+            sentences = [line.strip() for line in f if line.strip()]
+        else:
+            sentences = nltk.sent_tokenize(f.read())
+    print(f"{len(sentences)} sentences from {args.transcript}\n")
+
+    model_paths = {name: name for name in {EMBEDDING_MODEL_NAME, *args.models}}
+    with tempfile.TemporaryDirectory() as directory:
+        if args.random_weights:
+            print("Random weights: only the throughput columns are representative.\n")
+            for name in model_paths:
+                model_paths[name] = build_random_model(name, sentences, directory)
+        report(args, sentences, model_paths)
+
+
+def report(
+    args: argparse.Namespace, sentences: list[str], model_paths: dict[str, str]
+) -> None:
+    """
+    Prints the comparison of every model/backend pair to the fp32 reference.
+    """
+    reference, ref_secs = embed(
+        model_paths[EMBEDDING_MODEL_NAME], "torch", sentences
+    )
+    print(
+        f"{'model':<28}{'backend':<12}{'sent/s':>9}{'speedup':>9}"
+        f"{'mean cos':>10}{'min cos':>9}{'boundaries':>12}"
+    )
+    for model_name in args.models:
+        for backend in args.backends:
+            if model_name == EMBEDDING_MODEL_NAME and backend == "torch":
+                embeddings, secs = reference, ref_secs
+            else:
+                try:
+                    embeddings, secs = embed(
+                        model_paths[model_name], backend, sentences
+                    )
+                except Exception as e:
+                    print(f"{model_name:<28}{backend:<12}  failed: {e}")
+                    continue
+            # embeddings of other models aren't comparable to the reference
+            if model_name == EMBEDDING_MODEL_NAME:
+                cos = F.cosine_similarity(embeddings, reference, dim=1)
+                mean_cos, min_cos = f"{cos.mean():.4f}", f"{cos.min():.4f}"
+            else:
+                mean_cos, min_cos = "-", "-"
+            agreement = boundary_agreement(reference, embeddings, args.k)
+            print(
+                f"{model_name:<28}{backend:<12}{len(sentences) / secs:>9.1f}"
+                f"{ref_secs / secs:>8.2f}x{mean_cos:>10}{min_cos:>9}{agreement:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
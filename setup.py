@@ -61,5 +61,8 @@ setup(
             "pytest",
             "twine",
         ],
+        "onnx": [
+            "optimum[onnxruntime]",
+        ],
     },
 )
@@ -0,0 +1,72 @@
+# standard library imports
+from unittest.mock import Mock, patch
+
+# current package imports
+from ai_clips_maker.transcribe.exceptions import TranscriberConfigError
+from ai_clips_maker.transcribe.transcriber import WhisperTranscriber
+
+# 3rd party imports
+import pytest
+
+
+def load_align_model(language_code: str, device: str) -> tuple:
+    return Mock(name=f"align_model_{language_code}"), {"language": language_code}
+
+
+@pytest.fixture
+def mock_whisperx():
+    with patch("whisperx.load_model", return_value=Mock()), patch(
+        "whisperx.load_align_model", side_effect=load_align_model
+    ) as mock_load_align_model:
+        yield mock_load_align_model
+
+
+def loaded_languages(transcriber: WhisperTranscriber) -> list[str]:
+    return [language for language, _ in transcriber._align_models]
+
+
+def test_align_models_are_cached(mock_whisperx):
+    transcriber = WhisperTranscriber(device="cpu", align_model_cache_size=2)
+    english_model, _ = transcriber._get_align_model("en")
+    assert transcriber._get_align_model("en")[0] is english_model
+    assert mock_whisperx.call_count == 1
+
+    transcriber._get_align_model("fr")
+    transcriber._get_align_model("en")
+    # "fr" is now the least recently used model
+    transcriber._get_align_model("de")
+    assert loaded_languages(transcriber) == ["en", "de"]
+    assert mock_whisperx.call_count == 3
+
+
+def test_lru_eviction_frees_gpu_memory(mock_whisperx):
+    transcriber = WhisperTranscriber(device="cpu", align_model_cache_size=1)
+    transcriber._get_align_model("en")
+    with patch("torch.cuda.is_available", return_value=True), patch(
+        "torch.cuda.empty_cache"
+    ) as empty_cache:
+        transcriber._get_align_model("fr")
+    assert loaded_languages(transcriber) == ["fr"]
+    empty_cache.assert_called_once()
+
+
+def test_preload_and_evict(mock_whisperx):
+    transcriber = WhisperTranscriber(
+        device="cpu", align_model_cache_size=3, preload_languages=["en", "es"]
+    )
+    assert loaded_languages(transcriber) == ["en", "es"]
+    assert mock_whisperx.call_count == 2
+
+    assert transcriber.evict_align_model("en")
+    assert not transcriber.evict_align_model("en")
+    assert loaded_languages(transcriber) == ["es"]
+    assert transcriber.evict_align_model()
+    assert loaded_languages(transcriber) == []
+
+
+def test_invalid_align_model_settings(mock_whisperx):
+    with pytest.raises(TranscriberConfigError):
+        WhisperTranscriber(device="cpu", align_model_cache_size=0)
+    with pytest.raises(TranscriberConfigError):
+        WhisperTranscriber(device="cpu", preload_languages=["xx"])
+    assert mock_whisperx.call_count == 0
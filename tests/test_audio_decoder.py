@@ -0,0 +1,139 @@
+# standard library imports
+import os
+import tempfile
+
+# current package imports
+from ai_clips_maker.media import audio_decoder
+from ai_clips_maker.media.audio_decoder import DecodedAudio, _MemmapBuffer, decode_audio
+from ai_clips_maker.media.exceptions import AudioFileError
+
+# 3rd party imports
+import av
+import numpy as np
+import pytest
+import torch
+
+SOURCE_SAMPLE_RATE = 44100
+DURATION_SECS = 2
+FREQUENCY = 440
+
+
+def write_audio(path: str, codec: str, layout: str) -> None:
+    """Encodes a sine wave in every channel."""
+    container = av.open(path, "w")
+    stream = container.add_stream(codec, rate=SOURCE_SAMPLE_RATE)
+    stream.layout = layout
+    num_channels = len(av.AudioLayout(layout).channels)
+    t = np.arange(DURATION_SECS * SOURCE_SAMPLE_RATE) / SOURCE_SAMPLE_RATE
+    samples = (0.5 * np.sin(2 * np.pi * FREQUENCY * t) * 32767).astype(np.int16)
+    chunk_size = 1024
+    for start in range(0, len(samples), chunk_size):
+        chunk = np.repeat(samples[start:start + chunk_size], num_channels)
+        frame = av.AudioFrame.from_ndarray(
+            chunk.reshape(1, -1), format="s16", layout=layout
+        )
+        frame.sample_rate = SOURCE_SAMPLE_RATE
+        for packet in stream.encode(frame):
+            container.mux(packet)
+    for packet in stream.encode():
+        container.mux(packet)
+    container.close()
+
+
+@pytest.fixture(scope="module")
+def wav_path(tmp_path_factory) -> str:
+    path = str(tmp_path_factory.mktemp("audio_decoder") / "audio.wav")
+    write_audio(path, "pcm_s16le", layout="mono")
+    return path
+
+
+def test_decode_audio(wav_path):
+    waveform = decode_audio(wav_path, memmap_min_secs=None)
+    assert waveform.dtype == np.float32
+    assert waveform.ndim == 1
+    assert abs(len(waveform) - DURATION_SECS * 16000) <= 16000 * 0.01
+    # the sine wave survives downmixing and resampling
+    middle = waveform[4000:-4000]
+    assert np.abs(middle).max() == pytest.approx(0.5, abs=0.02)
+    spectrum = np.abs(np.fft.rfft(middle))
+    peak_frequency = np.argmax(spectrum) * 16000 / len(middle)
+    assert peak_frequency == pytest.approx(FREQUENCY, abs=2)
+
+
+def test_decode_audio_downmixes(tmp_path):
+    path = str(tmp_path / "stereo.wav")
+    write_audio(path, "pcm_s16le", layout="stereo")
+    waveform = decode_audio(path)
+    assert abs(len(waveform) - DURATION_SECS * 16000) <= 16000 * 0.01
+    # channels are mixed down like `ffmpeg -ac 1` does
+    peak = np.abs(waveform[4000:-4000]).max()
+    assert peak == pytest.approx(0.5 * np.sqrt(2), abs=0.02)
+
+
+def test_decode_audio_memmap(wav_path, tmp_path, monkeypatch):
+    in_memory = decode_audio(wav_path, memmap_min_secs=None)
+    # temporary files must not be left behind
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    memmapped = decode_audio(wav_path, memmap_min_secs=1)
+    assert isinstance(memmapped, np.memmap)
+    np.testing.assert_array_equal(memmapped, in_memory)
+    assert os.listdir(tmp_path) == []
+
+
+def test_decode_audio_max_duration(wav_path):
+    waveform = decode_audio(wav_path)
+    head = decode_audio(wav_path, max_duration_secs=0.5)
+    assert len(head) == 8000
+    np.testing.assert_allclose(head, waveform[:8000], atol=1e-6)
+
+
+def test_decoded_audio_decodes_once(wav_path, monkeypatch):
+    calls = []
+
+    def counting_decode_audio(*args, **kwargs):
+        calls.append(kwargs.get("max_duration_secs"))
+        return decode_audio(*args, **kwargs)
+
+    monkeypatch.setattr(audio_decoder, "decode_audio", counting_decode_audio)
+    decoded_audio = DecodedAudio(wav_path)
+
+    # the head is decoded on its own before the whole file is needed
+    assert len(decoded_audio.get_head(1.0)) == 16000
+    assert calls == [1.0]
+    assert not decoded_audio.is_decoded()
+
+    waveform = decoded_audio.waveform
+    middle = decoded_audio.get_slice(0.5, 1.5)
+    head = decoded_audio.get_head(1.0)
+    tensor = torch.from_numpy(decoded_audio.waveform)
+    assert calls == [1.0, None]
+    assert decoded_audio.duration == pytest.approx(DURATION_SECS, abs=0.01)
+    # consumers get views of the same buffer
+    assert np.shares_memory(middle, waveform) and np.shares_memory(head, waveform)
+    assert tensor.data_ptr() == waveform.ctypes.data
+    assert len(middle) == 16000
+
+
+def test_memmap_buffer_grows():
+    buffer = _MemmapBuffer(capacity=10)
+    chunks = [np.full(7, i, dtype=np.float32) for i in range(5)]
+    for chunk in chunks:
+        buffer.append(chunk)
+    np.testing.assert_array_equal(buffer.get(), np.concatenate(chunks))
+
+
+def test_decode_audio_without_audio_stream(tmp_path):
+    path = str(tmp_path / "video.mp4")
+    container = av.open(path, "w")
+    stream = container.add_stream("mpeg4", rate=10)
+    stream.width, stream.height, stream.pix_fmt = 32, 32, "yuv420p"
+    frame = av.VideoFrame.from_ndarray(
+        np.zeros((32, 32, 3), dtype=np.uint8), format="rgb24"
+    )
+    for packet in stream.encode(frame):
+        container.mux(packet)
+    for packet in stream.encode():
+        container.mux(packet)
+    container.close()
+    with pytest.raises(AudioFileError):
+        decode_audio(path)
@@ -0,0 +1,196 @@
+# standard library imports
+from unittest.mock import Mock, patch
+
+# current package imports
+from ai_clips_maker.media.audio_decoder import DecodedAudio
+from ai_clips_maker.media.audio_file import AudioFile
+from ai_clips_maker.transcribe.chunking import find_silence_boundaries, stitch_char_info
+from ai_clips_maker.transcribe.transcriber import WhisperTranscriber
+
+# 3rd party imports
+import numpy as np
+import pytest
+
+SAMPLE_RATE = 1000
+INSTANTIATE_AS_TEMPORAL_MEDIA_FILE = (
+    "ai_clips_maker.transcribe.transcriber.MediaEditor."
+    "instantiate_as_temporal_media_file"
+)
+
+
+def speech_with_silences(
+    duration_secs: int, silences: list[tuple[float, float]]
+) -> np.ndarray:
+    """Noise ("speech") with silent intervals."""
+    rng = np.random.default_rng(0)
+    waveform = rng.uniform(-0.5, 0.5, duration_secs * SAMPLE_RATE).astype(np.float32)
+    for start, end in silences:
+        waveform[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] = 0
+    return waveform
+
+
+def test_find_silence_boundaries():
+    waveform = speech_with_silences(350, [(95, 96), (210, 211), (290, 291)])
+    boundaries = find_silence_boundaries(waveform, SAMPLE_RATE, 100, 20)
+    assert boundaries[0] == 0 and boundaries[-1] == len(waveform)
+    # splits land in the silences closest to every 100 s
+    split_secs = [b / SAMPLE_RATE for b in boundaries[1:-1]]
+    assert len(split_secs) == 2
+    assert 95 <= split_secs[0] <= 96
+    assert 210 <= split_secs[1] <= 211
+
+
+def test_find_silence_boundaries_short_audio():
+    waveform = speech_with_silences(150, [(75, 76)])
+    assert find_silence_boundaries(waveform, SAMPLE_RATE, 100, 20) == [0, len(waveform)]
+
+
+def char(c: str, start: float | None, end: float | None) -> dict:
+    return {"char": c, "start_time": start, "end_time": end, "speaker": None}
+
+
+def test_stitch_char_info():
+    chunks = [
+        [char("h", 0.1, 0.2), char("i", 0.2, 0.3)],
+        [],
+        [char("y", 0.5, 0.6), char("o", None, None)],
+        [char(" ", None, None), char("!", 1.0, 1.1)],
+    ]
+    stitched = stitch_char_info(chunks, [0.0, 100.0, 200.0, 300.0])
+    assert "".join(c["char"] for c in stitched) == "hi yo !"
+    assert stitched[3] == char("y", 200.5, 200.6)
+    assert stitched[4] == char("o", None, None)
+    assert stitched[6]["start_time"] == pytest.approx(301.0)
+    # the input isn't modified
+    assert chunks[0][0]["start_time"] == 0.1
+
+
+@pytest.fixture
+def transcriber():
+    with patch("whisperx.load_model", return_value=Mock()):
+        return WhisperTranscriber(device="cpu")
+
+
+def test_transcribe_chunked(transcriber, tmp_path, monkeypatch):
+    # avoids depending on the punkt tokenizer data being downloaded
+    monkeypatch.setattr(
+        "ai_clips_maker.transcribe.transcription.sent_tokenize", lambda text: [text]
+    )
+    waveform = speech_with_silences(350, [(95, 96), (210, 211)])
+    decoded_audio = DecodedAudio(str(tmp_path / "audio.mp3"))
+    decoded_audio._waveform = waveform
+    decoded_audio._sample_rate = SAMPLE_RATE
+
+    chunk_lengths = []
+
+    def transcribe_waveform(chunk, lang, batch_size):
+        chunk_lengths.append(len(chunk))
+        return lang, [char("a", 1.0, 2.0)]
+
+    media = Mock(spec=AudioFile)
+    with patch(
+        INSTANTIATE_AS_TEMPORAL_MEDIA_FILE,
+        return_value=media,
+    ), patch.object(
+        transcriber, "_transcribe_waveform", side_effect=transcribe_waveform
+    ):
+        transcription = transcriber.transcribe_chunked(
+            "audio.mp3", lang="en", num_workers=1, target_chunk_secs=100,
+            decoded_audio=decoded_audio,
+        )
+
+    assert sum(chunk_lengths) == len(waveform)
+    assert len(chunk_lengths) == 3
+    assert transcription.text == "a a a"
+    word_starts = [word.start_time for word in transcription.words]
+    assert word_starts[0] == pytest.approx(1.0)
+    assert 96.0 <= word_starts[1] <= 97.0
+    assert 211.0 <= word_starts[2] <= 212.0
+
+
+class FakeExecutor:
+    """Runs the pool's initializer and tasks in the current process."""
+
+    instances = []
+
+    def __init__(self, max_workers, mp_context, initializer, initargs):
+        self.max_workers = max_workers
+        self.start_method = mp_context.get_start_method()
+        self.initargs = initargs
+        FakeExecutor.instances.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return None
+
+    def map(self, fn, *iterables):
+        return map(fn, *iterables)
+
+
+def test_transcribe_chunked_process_pool(transcriber, tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "ai_clips_maker.transcribe.transcription.sent_tokenize", lambda text: [text]
+    )
+    waveform = speech_with_silences(350, [(95, 96), (210, 211)])
+    decoded_audio = DecodedAudio(str(tmp_path / "audio.mp3"))
+    decoded_audio._waveform = waveform
+    decoded_audio._sample_rate = SAMPLE_RATE
+
+    def transcribe_chunk(chunk, lang, batch_size):
+        # the middle chunk has no speech
+        if 100 * SAMPLE_RATE < len(chunk) < 120 * SAMPLE_RATE:
+            return None
+        return [char("b", 0.5, 0.7)]
+
+    transcriber._model.detect_language.return_value = "fr"
+    with patch(
+        INSTANTIATE_AS_TEMPORAL_MEDIA_FILE,
+        return_value=Mock(spec=AudioFile),
+    ), patch(
+        "ai_clips_maker.transcribe.transcriber.ProcessPoolExecutor", FakeExecutor
+    ), patch(
+        "ai_clips_maker.transcribe.transcriber._transcribe_chunk",
+        side_effect=transcribe_chunk,
+    ):
+        transcription = transcriber.transcribe_chunked(
+            "audio.mp3", num_workers=8, target_chunk_secs=100,
+            decoded_audio=decoded_audio,
+        )
+
+    executor = FakeExecutor.instances[-1]
+    assert executor.start_method == "spawn"
+    assert executor.max_workers == 3
+    assert transcription.language == "fr"
+    assert transcription.text == "b b"
+    assert transcription.words[0].start_time == pytest.approx(0.5)
+    assert 210.5 <= transcription.words[1].start_time <= 211.5
+
+
+def test_transcribe_chunked_on_gpu_defaults_to_one_worker(
+    transcriber, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(
+        "ai_clips_maker.transcribe.transcription.sent_tokenize", lambda text: [text]
+    )
+    decoded_audio = DecodedAudio(str(tmp_path / "audio.mp3"))
+    decoded_audio._waveform = speech_with_silences(350, [(95, 96), (210, 211)])
+    decoded_audio._sample_rate = SAMPLE_RATE
+    # every worker would load its own models on the GPU
+    transcriber._device = "cuda"
+
+    with patch(
+        INSTANTIATE_AS_TEMPORAL_MEDIA_FILE,
+        return_value=Mock(spec=AudioFile),
+    ), patch(
+        "ai_clips_maker.transcribe.transcriber.ProcessPoolExecutor"
+    ) as executor, patch.object(
+        transcriber, "_transcribe_waveform", return_value=("en", [char("c", 0.1, 0.2)])
+    ) as transcribe_waveform:
+        transcriber.transcribe_chunked(
+            "audio.mp3", lang="en", target_chunk_secs=100, decoded_audio=decoded_audio
+        )
+
+    executor.assert_not_called()
+    assert transcribe_waveform.call_count == 3
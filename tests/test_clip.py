@@ -1,10 +1,13 @@
 # Third-party imports
 import pytest
+import torch
+import torch.nn.functional as F
 from unittest.mock import MagicMock
 
 # Local package imports
-from ai_clips_maker.clip.clipfinder import ClipFinderConfigManager
-from ai_clips_maker.clip.texttiler import TextTilerConfigManager
+from ai_clips_maker.txtslice.segment_picker import ClipFinderConfigManager, _ClipIndex
+from ai_clips_maker.txtslice.tiler_algorithm import TextTiler, TextTilerConfigManager
+from ai_clips_maker.utils.pytorch import max_magnitude_2d
 from ai_clips_maker.transcribe.transcription import Transcription
 
 
@@ -17,6 +20,11 @@ def clip_finder_config_manager():
 def texttiler_config_manager():
     return TextTilerConfigManager()
 
+
+@pytest.fixture
+def text_tiler():
+    return TextTiler(device="cpu")
+
 @pytest.fixture
 def valid_transcription():
     mock_transcription = MagicMock(spec=Transcription)
@@ -89,3 +97,118 @@ def test_invalid_texttiler_config(texttiler_config_manager: TextTilerConfigManag
     }
     result = texttiler_config_manager.check_valid_config(config)
     assert isinstance(result, str)
+
+
+def test_clip_index_matches_linear_scan():
+    """
+    Ensure the clip index finds the same duplicates as comparing every clip.
+    """
+    generator = torch.Generator().manual_seed(0)
+    starts = torch.rand(300, generator=generator) * 600
+    durations = torch.rand(300, generator=generator) * 60
+    clips = [
+        {"start_time": s, "end_time": s + d}
+        for s, d in zip(starts.tolist(), durations.tolist())
+    ]
+    existing, candidates = clips[:150], clips[150:]
+
+    index = _ClipIndex(existing)
+    expected = [
+        any(
+            abs(c["start_time"] - e["start_time"])
+            + abs(c["end_time"] - e["end_time"])
+            < 15
+            for e in existing
+        )
+        for c in candidates
+    ]
+    assert [index.is_duplicate(c) for c in candidates] == expected
+    assert any(expected) and not all(expected)
+
+    index.add(candidates)
+    assert len(index) == 300
+    assert all(index.is_duplicate(c) for c in clips)
+
+
+# ----------------------------
+# TextTiler Tests
+# ----------------------------
+
+@pytest.mark.parametrize("pool_method", ["mean", "max"])
+@pytest.mark.parametrize("num_embeddings, k", [(4, 2), (30, 5), (60, 37)])
+def test_gap_scores_match_window_pooling(
+    text_tiler: TextTiler, pool_method: str, num_embeddings: int, k: int
+):
+    """
+    Ensure vectorized gap scores match pooling each window separately.
+    """
+    embeddings = torch.randn(
+        num_embeddings, 16, generator=torch.Generator().manual_seed(0)
+    )
+    pool = torch.mean if pool_method == "mean" else max_magnitude_2d
+    expected = torch.stack([
+        F.cosine_similarity(
+            pool(embeddings[max(0, i - k + 1): i + 1], dim=0),
+            pool(embeddings[i + 1: i + 1 + k], dim=0),
+            dim=0,
+        )
+        for i in range(num_embeddings - 1)
+    ])
+
+    gap_scores = text_tiler._calc_gap_scores(embeddings, k, pool_method)
+    assert torch.allclose(gap_scores, expected, atol=1e-5)
+
+
+@pytest.mark.parametrize("pool_method", ["mean", "max"])
+def test_multiscale_text_tile_matches_text_tile(
+    text_tiler: TextTiler, pool_method: str
+):
+    """
+    Ensure tiling with several window sizes at once matches tiling with each.
+    """
+    embeddings = torch.randn(80, 16, generator=torch.Generator().manual_seed(0))
+    ks = [5, 11, 37, 97]
+    multiscale = text_tiler.text_tile_multiscale(embeddings, ks, pool_method)
+    for k, (boundaries, pooled) in zip(ks, multiscale):
+        expected_boundaries, expected_pooled = text_tiler.text_tile(
+            embeddings, k, pool_method
+        )
+        assert boundaries == expected_boundaries
+        assert torch.equal(pooled, expected_pooled)
+
+
+@pytest.mark.parametrize("pool_method", ["mean", "max"])
+def test_pool_embedding_groups_matches_group_pooling(
+    text_tiler: TextTiler, pool_method: str
+):
+    """
+    Ensure segmented pooling matches pooling each group separately.
+    """
+    embeddings = torch.randn(12, 16, generator=torch.Generator().manual_seed(0))
+    boundaries = torch.tensor([0, 0, 1, 1, 0, 0, 0, 1, 0, 1, 0, 1.0])
+    groups = [(0, 3), (3, 4), (4, 8), (8, 10), (10, 12)]
+    pool = torch.mean if pool_method == "mean" else max_magnitude_2d
+    expected = torch.stack(
+        [pool(embeddings[start:end], dim=0) for start, end in groups]
+    )
+
+    pooled = text_tiler._pool_embedding_groups(embeddings, boundaries, pool_method)
+    assert torch.allclose(pooled, expected, atol=1e-6)
+
+
+def test_depth_scores(text_tiler: TextTiler):
+    """
+    Ensure depth scores measure the drop below the highest peak on each side.
+    """
+    gap_scores = torch.tensor([0.5, 0.9, 0.2, 0.4, 0.1, 0.7])
+    expected = torch.tensor([0.4, 0.0, 1.2, 0.8, 1.4, 0.2])
+    assert torch.allclose(text_tiler._calc_depth_scores(gap_scores), expected)
+
+
+def test_identify_boundaries(text_tiler: TextTiler):
+    """
+    Ensure boundaries are placed at local depth maxima above the cutoff.
+    """
+    depths = torch.tensor([0.4, 0.0, 1.2, 0.8, 1.4, 0.2])
+    boundaries = text_tiler._identify_boundaries(depths, "average")
+    assert boundaries.tolist() == [0, 0, 1, 0, 1, 0, 1]
@@ -0,0 +1,69 @@
+# Local package imports
+from ai_clips_maker.resize.detection_cache import FaceDetectionCache
+
+# Third-party imports
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = FaceDetectionCache(str(tmp_path / "detections.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_put_and_get_many(cache):
+    detections = [np.array([[1, 2, 3, 4], [5, 6, 7, 8]], dtype=np.int16), None]
+    cache.put_many("hash", [100, 200], 960, "config", detections)
+
+    cached = cache.get_many("hash", [100, 200, 300], 960, "config")
+
+    assert sorted(cached) == [100, 200]
+    np.testing.assert_array_equal(cached[100], detections[0])
+    assert cached[100].dtype == np.int16
+    assert cached[200] is None
+
+
+def test_get_many_more_frames_than_query_parameters(cache):
+    frame_pts = list(range(0, 25000, 10))
+    detections = [np.full((1, 4), i % 100, dtype=np.int16) for i in range(2500)]
+    cache.put_many("hash", frame_pts, 960, "config", detections)
+
+    cached = cache.get_many("hash", frame_pts + [1], 960, "config")
+
+    assert len(cached) == 2500
+    np.testing.assert_array_equal(cached[24990], detections[-1])
+
+
+@pytest.mark.parametrize(
+    "video_hash, detect_width, detector_config",
+    [("other", 960, "config"), ("hash", 480, "config"), ("hash", 960, "other")],
+)
+def test_get_many_misses_other_keys(cache, video_hash, detect_width, detector_config):
+    cache.put_many("hash", [100], 960, "config", [None])
+    assert cache.get_many(video_hash, [100], detect_width, detector_config) == {}
+
+
+def test_detections_persist(tmp_path):
+    db_path = str(tmp_path / "detections.sqlite")
+    cache = FaceDetectionCache(db_path)
+    cache.put_many("hash", [100], 960, "config", [np.ones((1, 4), dtype=np.int16)])
+    cache.close()
+
+    cache = FaceDetectionCache(db_path)
+    cached = cache.get_many("hash", [100], 960, "config")
+    cache.close()
+
+    np.testing.assert_array_equal(cached[100], np.ones((1, 4)))
+
+
+def test_get_video_hash_depends_on_content(cache, tmp_path):
+    path_a = tmp_path / "a.mp4"
+    path_b = tmp_path / "b.mp4"
+    path_a.write_bytes(b"video" * 1000)
+    path_b.write_bytes(b"video" * 1000)
+    assert cache.get_video_hash(str(path_a)) == cache.get_video_hash(str(path_b))
+
+    path_b.write_bytes(b"other" * 1000)
+    assert cache.get_video_hash(str(path_a)) != cache.get_video_hash(str(path_b))
@@ -3,13 +3,27 @@ from unittest.mock import patch, Mock
 
 # Local imports
 from ai_clips_maker.diarize.pyannote import PyannoteDiarizer
+from ai_clips_maker.media.audio_decoder import DecodedAudio
 
 # Third-party imports
+import numpy as np
 import pandas as pd
 from pyannote.core import Segment, Annotation
 import pytest
 
 
+@pytest.fixture(autouse=True)
+def mock_decode_audio():
+    """
+    Replaces audio decoding with 30 seconds of silence.
+    """
+    with patch(
+        "ai_clips_maker.media.audio_decoder.decode_audio",
+        return_value=np.zeros(30 * 16000, dtype=np.float32),
+    ) as mock_decode_audio:
+        yield mock_decode_audio
+
+
 @pytest.fixture
 def mock_diarizer():
     """
@@ -151,3 +165,30 @@ def test_diarize(mock_diarizer, mock_audio_file, annotation_data, expected_outpu
 
     # Check output
     assert output_segments == expected_output
+
+
+def test_diarize_passes_waveform(mock_diarizer, mock_audio_file):
+    """
+    Checks that the pipeline gets the decoded audio in memory rather than a path.
+    """
+    mock_diarizer.pipeline.return_value = Annotation()
+    mock_diarizer.diarize(mock_audio_file)
+    pipeline_input = mock_diarizer.pipeline.call_args.args[0]
+    assert set(pipeline_input) == {"waveform", "sample_rate"}
+    assert pipeline_input["sample_rate"] == 16000
+    assert tuple(pipeline_input["waveform"].shape) == (1, 30 * 16000)
+
+
+def test_diarize_shares_decoded_audio(
+    mock_diarizer, mock_audio_file, mock_decode_audio
+):
+    """
+    Checks that audio decoded for another step of the job isn't decoded again.
+    """
+    mock_diarizer.pipeline.return_value = Annotation()
+    decoded_audio = DecodedAudio("mock_audio.mp3")
+    waveform = decoded_audio.waveform
+    mock_diarizer.diarize(mock_audio_file, decoded_audio=decoded_audio)
+    assert mock_decode_audio.call_count == 1
+    pipeline_waveform = mock_diarizer.pipeline.call_args.args[0]["waveform"]
+    assert pipeline_waveform.data_ptr() == waveform.ctypes.data
@@ -0,0 +1,473 @@
+# standard library imports
+from fractions import Fraction
+import shutil
+import subprocess
+from unittest.mock import MagicMock, patch
+
+# current package imports
+from ai_clips_maker.media.audiovideo_file import AudioVideoFile
+from ai_clips_maker.media.editor import MAX_TRIM_OUTPUTS_PER_PROCESS, MediaEditor
+from ai_clips_maker.media.exceptions import MediaEditorError
+from ai_clips_maker.media.video_file import VideoFile
+from ai_clips_maker.resize.crops import Crops
+from ai_clips_maker.resize.segment import Segment
+
+# 3rd party imports
+import av
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def media_editor():
+    return MediaEditor()
+
+
+@pytest.fixture
+def media_file(tmp_path):
+    media_file = MagicMock(spec=AudioVideoFile)
+    media_file.path = str(tmp_path / "source.mp4")
+    media_file.get_duration.return_value = 3600.0
+    return media_file
+
+
+def ffmpeg_result(returncode: int = 0):
+    return subprocess.CompletedProcess(
+        args=[], returncode=returncode, stdout="", stderr=""
+    )
+
+
+@pytest.mark.parametrize(
+    "ranges, max_gap_secs, expected_groups",
+    [
+        ([(0, 10), (20, 30), (200, 210)], 60, [[0, 1], [2]]),
+        ([(200, 210), (0, 10), (20, 30)], 60, [[1, 2], [0]]),
+        ([(0, 100), (50, 60), (130, 140)], 60, [[0, 1, 2]]),
+        ([(0, 10), (20, 30)], 5, [[0], [1]]),
+        ([], 60, []),
+    ],
+)
+def test_group_trim_ranges(media_editor, ranges, max_gap_secs, expected_groups):
+    assert media_editor._group_trim_ranges(ranges, max_gap_secs) == expected_groups
+
+
+def test_group_trim_ranges_limits_outputs(media_editor):
+    ranges = [(i, i + 1) for i in range(MAX_TRIM_OUTPUTS_PER_PROCESS + 1)]
+    groups = media_editor._group_trim_ranges(ranges, 60)
+    assert [len(group) for group in groups] == [MAX_TRIM_OUTPUTS_PER_PROCESS, 1]
+
+
+def test_trim_many_single_process_per_group(media_editor, media_file, tmp_path):
+    ranges = [(10.0, 20.0), (500.0, 530.0), (30.0, 45.0)]
+    paths = [str(tmp_path / f"clip{i}.mp4") for i in range(len(ranges))]
+    with patch(
+        "ai_clips_maker.media.editor.subprocess.run", return_value=ffmpeg_result()
+    ) as run, patch.object(
+        MediaEditor,
+        "_create_media_file_of_same_type",
+        side_effect=lambda p, m: MagicMock(spec=AudioVideoFile, path=p),
+    ):
+        clips = media_editor.trim_many(media_file, ranges, paths, video_codec="libx264")
+
+    assert [clip.path for clip in clips] == paths
+    assert run.call_count == 2
+    first_command = run.call_args_list[0].args[0]
+    # the source is opened once, seeked to the start of the group
+    assert first_command.count("-i") == 1
+    assert first_command[first_command.index("-i") - 1] == "00:00:10.000"
+    assert paths[0] in first_command and paths[2] in first_command
+    # output times are relative to the group's start
+    clip_idx = first_command.index(paths[2])
+    assert first_command[clip_idx - 16:clip_idx - 12] == [
+        "-ss", "00:00:20.000", "-t", "00:00:15.000"
+    ]
+    second_command = run.call_args_list[1].args[0]
+    assert paths[1] in second_command
+
+
+def test_trim_many_copy_seeks_like_trim(media_editor, media_file, tmp_path):
+    ranges = [(10.0, 20.0), (30.0, 45.0)]
+    paths = [str(tmp_path / f"clip{i}.mp4") for i in range(len(ranges))]
+    with patch(
+        "ai_clips_maker.media.editor.subprocess.run", return_value=ffmpeg_result()
+    ) as run, patch.object(
+        MediaEditor,
+        "_create_media_file_of_same_type",
+        side_effect=lambda p, m: MagicMock(spec=AudioVideoFile, path=p),
+    ):
+        media_editor.trim_many(media_file, ranges, paths)
+        trim_commands = []
+        for (start_time, end_time), path in zip(ranges, paths):
+            media_editor.trim(media_file, start_time, end_time, path)
+            trim_commands.append(run.call_args.args[0])
+
+    # a single process, with one input per clip seeked exactly like trim() seeks
+    command = run.call_args_list[0].args[0]
+    assert command.count("-i") == len(ranges)
+    for input_idx, trim_command in enumerate(trim_commands):
+        trim_input = trim_command[2:8]
+        assert trim_input[0] == "-ss" and trim_input[4] == "-i"
+        assert command[2 + 6 * input_idx: 8 + 6 * input_idx] == trim_input
+        path_idx = command.index(paths[input_idx])
+        assert command[command.index("-map", path_idx - 8) + 1] == str(input_idx)
+
+
+def test_trim_caps_decoding_and_filter_threads(media_editor, media_file, tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    with patch(
+        "ai_clips_maker.media.editor.subprocess.run", return_value=ffmpeg_result()
+    ) as run, patch.object(
+        MediaEditor,
+        "_create_media_file_of_same_type",
+        side_effect=lambda p, m: MagicMock(spec=AudioVideoFile, path=p),
+    ):
+        media_editor.trim(media_file, 10.0, 20.0, path, num_threads="4")
+        command = run.call_args.args[0]
+        input_idx = command.index("-i")
+        assert command[input_idx - 4:input_idx] == [
+            "-filter_threads", "4", "-threads", "4"
+        ]
+        assert command[command.index("-threads", input_idx) + 1] == "4"
+
+        # "0" leaves the thread counts to ffmpeg
+        media_editor.trim(media_file, 10.0, 20.0, path)
+        command = run.call_args.args[0]
+        assert "-filter_threads" not in command
+        assert command.count("-threads") == 1
+
+
+@pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+    reason="requires ffmpeg and ffprobe",
+)
+def test_trim_many_copy_matches_trim(media_editor, tmp_path):
+    source_path = str(tmp_path / "source.mp4")
+    write_test_video(source_path, num_frames=100)
+    source = AudioVideoFile(source_path)
+    # starts between keyframes
+    ranges = [(0.5, 1.5), (1.7, 3.1)]
+    paths = [str(tmp_path / f"clip{i}.mp4") for i in range(len(ranges))]
+
+    media_editor.trim_many(source, ranges, paths)
+
+    for (start_time, end_time), path in zip(ranges, paths):
+        trim_path = str(tmp_path / "trim.mp4")
+        media_editor.trim(source, start_time, end_time, trim_path)
+        assert decode_gray_levels(path) == decode_gray_levels(trim_path)
+
+
+def test_trim_many_failed_group(media_editor, media_file, tmp_path):
+    ranges = [(0.0, 5.0), (1000.0, 1005.0)]
+    paths = [str(tmp_path / f"clip{i}.mp4") for i in range(len(ranges))]
+    with patch(
+        "ai_clips_maker.media.editor.subprocess.run",
+        side_effect=[ffmpeg_result(1), ffmpeg_result()],
+    ), patch.object(
+        MediaEditor,
+        "_create_media_file_of_same_type",
+        side_effect=lambda p, m: MagicMock(spec=AudioVideoFile, path=p),
+    ):
+        clips = media_editor.trim_many(media_file, ranges, paths)
+    assert clips[0] is None
+    assert clips[1].path == paths[1]
+
+
+def test_trim_many_invalid_input(media_editor, media_file, tmp_path):
+    paths = [str(tmp_path / "clip0.mp4"), str(tmp_path / "clip1.mp4")]
+    with pytest.raises(MediaEditorError):
+        media_editor.trim_many(media_file, [(0.0, 5.0)], paths)
+    with pytest.raises(MediaEditorError):
+        media_editor.trim_many(media_file, [(0.0, 5.0), (5.0, 6.0)], [paths[0]] * 2)
+    with pytest.raises(MediaEditorError):
+        media_editor.trim_many(media_file, [(0.0, 5.0), (10.0, 4000.0)], paths)
+    with pytest.raises(MediaEditorError):
+        media_editor.trim_many(media_file, [(5.0, 5.0), (10.0, 20.0)], paths)
+
+
+@pytest.mark.parametrize(
+    "keyframe_times, expected_segments",
+    [
+        (
+            [12.0, 14.0, 16.0],
+            [(10.5, 12.0, False), (12.0, 16.0, True), (16.0, 17.5, False)],
+        ),
+        ([10.5, 14.0], [(10.5, 14.0, True), (14.0, 17.5, False)]),
+        ([12.0, 17.5], None),
+        ([12.0], None),
+        ([], None),
+    ],
+)
+def test_plan_smart_cut(media_editor, keyframe_times, expected_segments):
+    assert media_editor._plan_smart_cut(10.5, 17.5, keyframe_times) == expected_segments
+
+
+def smart_trim_probe(codec_name: str, start_time: float = 0.0):
+    stream_fields = {
+        "codec_name": codec_name,
+        "pix_fmt": "yuv420p",
+        "time_base": "1/15360",
+        "profile": "High",
+        "level": "40",
+    }
+    probe = MagicMock()
+    probe.start_time = start_time
+    probe.get_stream_field.side_effect = lambda stream, field: stream_fields.get(field)
+    return probe
+
+
+def test_smart_trim(media_editor, media_file, tmp_path):
+    media_file.has_video_stream.return_value = True
+    media_file.get_probe.return_value = smart_trim_probe("h264")
+    path = str(tmp_path / "clip.mp4")
+    with patch(
+        "ai_clips_maker.media.editor.probe_keyframe_times",
+        return_value=[12.0, 14.0, 16.0],
+    ), patch(
+        "ai_clips_maker.media.editor.probe_video_extradata"
+    ) as probe_video_extradata, patch(
+        "ai_clips_maker.media.editor.subprocess.run", return_value=ffmpeg_result()
+    ) as run, patch.object(
+        MediaEditor, "_create_media_file_of_same_type",
+        side_effect=lambda p, m: MagicMock(spec=AudioVideoFile, path=p),
+    ), patch.object(MediaEditor, "trim") as trim:
+        clip = media_editor.smart_trim(media_file, 10.5, 17.5, path)
+
+    assert clip.path == path
+    trim.assert_not_called()
+    # H.264 segments carry their own parameter sets, so they aren't compared
+    probe_video_extradata.assert_not_called()
+    commands = [call.args[0] for call in run.call_args_list]
+    # head, interior, tail, concatenation, muxing
+    assert len(commands) == 5
+    assert "libx264" in commands[0] and commands[0][-1].endswith(".ts")
+    assert commands[0][commands[0].index("-profile:v") + 1] == "high"
+    assert commands[0][commands[0].index("-level") + 1] == "40"
+    assert commands[1][commands[1].index("-c:v") + 1] == "copy"
+    assert commands[1][commands[1].index("-bsf:v") + 1] == "h264_mp4toannexb"
+    assert commands[1][commands[1].index("-ss") + 1] == "00:00:12.000"
+    assert "libx264" in commands[2]
+    assert "concat" in commands[3]
+    assert commands[4][-1] == path
+
+
+def test_smart_trim_offsets_keyframes_by_start_time(media_editor, media_file, tmp_path):
+    media_file.has_video_stream.return_value = True
+    media_file.get_probe.return_value = smart_trim_probe("h264", start_time=1.4)
+    path = str(tmp_path / "clip.mp4")
+    with patch(
+        "ai_clips_maker.media.editor.probe_keyframe_times",
+        return_value=[13.4, 15.4, 17.4],
+    ) as probe_keyframe_times, patch(
+        "ai_clips_maker.media.editor.probe_video_extradata", return_value=b"sps/pps"
+    ), patch(
+        "ai_clips_maker.media.editor.subprocess.run", return_value=ffmpeg_result()
+    ) as run, patch.object(
+        MediaEditor, "_create_media_file_of_same_type",
+        side_effect=lambda p, m: MagicMock(spec=AudioVideoFile, path=p),
+    ):
+        media_editor.smart_trim(media_file, 10.5, 17.5, path)
+
+    assert probe_keyframe_times.call_args.args[1:] == pytest.approx((11.9, 18.9))
+    # seek times are relative to the container's start time
+    copy_command = run.call_args_list[1].args[0]
+    assert copy_command[copy_command.index("-ss") + 1] == "00:00:12.000"
+
+
+def test_smart_trim_falls_back_to_reencoding(media_editor, media_file, tmp_path):
+    media_file.has_video_stream.return_value = True
+    path = str(tmp_path / "clip.mp4")
+
+    # codec that can't be smart-cut
+    media_file.get_probe.return_value = smart_trim_probe("prores")
+    with patch.object(MediaEditor, "trim") as trim:
+        media_editor.smart_trim(media_file, 10.5, 17.5, path)
+    assert trim.call_args.args[5] == "libx264"
+
+    # failed segment export
+    media_file.get_probe.return_value = smart_trim_probe("hevc")
+    with patch(
+        "ai_clips_maker.media.editor.probe_keyframe_times", return_value=[12.0, 14.0]
+    ), patch(
+        "ai_clips_maker.media.editor.subprocess.run", return_value=ffmpeg_result(1)
+    ), patch.object(MediaEditor, "trim") as trim:
+        media_editor.smart_trim(media_file, 10.5, 17.5, path)
+    assert trim.call_args.args[5] == "libx265"
+
+    # re-encoded head with other codec extradata than the source, for a codec that
+    # can't carry it in-band
+    media_file.get_probe.return_value = smart_trim_probe("mpeg4")
+    with patch(
+        "ai_clips_maker.media.editor.probe_keyframe_times", return_value=[12.0, 14.0]
+    ), patch(
+        "ai_clips_maker.media.editor.probe_video_extradata",
+        side_effect=[b"source", b"head"],
+    ), patch(
+        "ai_clips_maker.media.editor.subprocess.run", return_value=ffmpeg_result()
+    ) as run, patch.object(MediaEditor, "trim") as trim:
+        media_editor.smart_trim(media_file, 10.5, 17.5, path)
+    assert run.call_count == 1
+    assert "-video_track_timescale" in run.call_args.args[0]
+    assert trim.call_args.args[5] == "mpeg4"
+
+
+def write_test_video(
+    path: str, num_frames: int, fps: int = 25, gop_size: int = 10
+) -> None:
+    """
+    Writes an H.264 video with AAC audio whose i-th frame is filled with gray
+    level 2 * i, encoded by x264 with its default settings (so its parameter sets
+    differ from those of segments re-encoded by smart_trim).
+    """
+    with av.open(path, "w") as container:
+        video = container.add_stream("libx264", rate=fps)
+        video.width, video.height, video.pix_fmt = 64, 48, "yuv420p"
+        video.options = {"g": str(gop_size), "crf": "18", "preset": "slow"}
+        audio = container.add_stream("aac", rate=16000, layout="mono")
+        for i in range(num_frames):
+            pixels = np.full((48, 64, 3), 2 * i, dtype=np.uint8)
+            frame = av.VideoFrame.from_ndarray(pixels, format="rgb24")
+            for packet in video.encode(frame):
+                container.mux(packet)
+        for packet in video.encode():
+            container.mux(packet)
+        samples = np.zeros((1, 16000 * num_frames // fps), dtype=np.float32)
+        audio_frame = av.AudioFrame.from_ndarray(samples, format="fltp", layout="mono")
+        audio_frame.sample_rate = 16000
+        for packet in audio.encode(audio_frame):
+            container.mux(packet)
+        for packet in audio.encode():
+            container.mux(packet)
+
+
+def decode_gray_levels(path: str) -> list[int]:
+    with av.open(path) as container:
+        return [
+            int(round(frame.to_ndarray(format="rgb24").mean()))
+            for frame in container.decode(video=0)
+        ]
+
+
+@pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None,
+    reason="requires ffmpeg and ffprobe",
+)
+def test_smart_trim_decodes(media_editor, tmp_path):
+    source_path = str(tmp_path / "source.mp4")
+    write_test_video(source_path, num_frames=100)
+    clip_path = str(tmp_path / "clip.mp4")
+
+    with patch.object(MediaEditor, "trim", wraps=media_editor.trim) as trim:
+        clip = media_editor.smart_trim(
+            AudioVideoFile(source_path), 1.0, 3.0, clip_path, crf="28", preset="fast"
+        )
+
+    assert clip is not None
+    # the video between the keyframes was stream-copied
+    trim.assert_not_called()
+    gray_levels = decode_gray_levels(clip_path)
+    # frames 25 to 74 of the source, with some tolerance for lossy re-encoding
+    assert len(gray_levels) == 50
+    expected = [2 * i for i in range(25, 75)]
+    assert np.abs(np.array(gray_levels) - np.array(expected)).max() <= 4
+
+
+def test_build_crop_commands(media_editor):
+    positions = [(10, 0), (10, 0), (40, 5), (25, 5)]
+    initial_position, commands = media_editor._build_crop_commands(
+        positions, [-3.0, 2.0, 4.5, 7.25]
+    )
+    assert initial_position == (10, 0)
+    assert commands == "4.500000 crop x 40, crop y 5;\n7.250000 crop x 25, crop y 5;\n"
+    # segments that started before time 0 set the initial position
+    assert media_editor._build_crop_commands(positions, [-9.0, -5.0, -1.0, 2.0]) == (
+        (40, 5), "2.000000 crop x 25, crop y 5;\n"
+    )
+    assert media_editor._build_crop_commands([(7, 3)], [3.0]) == ((7, 3), "")
+
+
+def crop_positions(
+    video_filter: str, commands_path: str, frame_times: list[float]
+) -> list[tuple[int, int]]:
+    """
+    Applies a sendcmd and crop filter chain with libavfilter and returns the crop
+    position of each frame.
+    """
+    sendcmd_args, crop_args = video_filter.split(",")
+    assert sendcmd_args.startswith("sendcmd=") and crop_args.startswith("crop=")
+    graph = av.filter.Graph()
+    time_base = Fraction(1, 100)
+    buffer = graph.add_buffer(width=64, height=48, format="rgb24", time_base=time_base)
+    sendcmd = graph.add("sendcmd", f"f={commands_path}")
+    crop = graph.add("crop", crop_args.removeprefix("crop="))
+    sink = graph.add("buffersink")
+    buffer.link_to(sendcmd)
+    sendcmd.link_to(crop)
+    crop.link_to(sink)
+    graph.configure()
+
+    # each pixel encodes its coordinates
+    img = np.zeros((48, 64, 3), dtype=np.uint8)
+    img[:, :, 0] = np.arange(64)[None, :]
+    img[:, :, 1] = np.arange(48)[:, None]
+    positions = []
+    for frame_time in frame_times:
+        frame = av.VideoFrame.from_ndarray(img, format="rgb24")
+        frame.pts = round(frame_time * 100)
+        frame.time_base = time_base
+        graph.push(frame)
+        cropped = graph.pull().to_ndarray()
+        positions.append((int(cropped[0, 0, 0]), int(cropped[0, 0, 1])))
+    return positions
+
+
+def test_render_crops(media_editor, tmp_path):
+    video_file = MagicMock(spec=VideoFile)
+    video_file.path = str(tmp_path / "source.mp4")
+    video_file.get_duration.return_value = 100.0
+    crops = Crops(64, 48, 16, 32, [
+        Segment([0], 10.0, 20.0, 4, 0),
+        Segment([1], 20.0, 30.0, 40, 8),
+        Segment([0], 30.0, 40.0, 4, 16),
+    ])
+    path = str(tmp_path / "reframed.mp4")
+    commands_path = str(tmp_path / "commands.txt")
+
+    def run_ffmpeg(command, **kwargs):
+        # the commands file is removed once rendering finishes
+        video_filter = command[command.index("-vf") + 1]
+        shutil.copy(video_filter.split("'")[1], commands_path)
+        return ffmpeg_result()
+
+    with patch(
+        "ai_clips_maker.media.editor.subprocess.run", side_effect=run_ffmpeg
+    ) as run, patch.object(
+        MediaEditor, "_create_media_file_of_same_type",
+        side_effect=lambda p, m: MagicMock(spec=VideoFile, path=p),
+    ):
+        rendered = media_editor.render_crops(
+            video_file, crops, path, start_time=10.0, end_time=40.0
+        )
+
+    assert rendered.path == path
+    assert run.call_count == 1
+    command = run.call_args.args[0]
+    assert command[command.index("-ss") + 1] == "00:00:10.000"
+    assert command[command.index("-t") + 1] == "00:00:30.000"
+    # frame times restart at 0 at the start time
+    video_filter = command[command.index("-vf") + 1]
+    frame_times = [0.0, 9.99, 10.0, 19.99, 20.0, 29.0]
+    assert crop_positions(video_filter, commands_path, frame_times) == [
+        (4, 0), (4, 0), (40, 8), (40, 8), (4, 16), (4, 16)
+    ]
+
+
+def test_render_crops_invalid_crops(media_editor, tmp_path):
+    video_file = MagicMock(spec=VideoFile)
+    video_file.path = str(tmp_path / "source.mp4")
+    video_file.get_duration.return_value = 100.0
+    path = str(tmp_path / "reframed.mp4")
+    with pytest.raises(MediaEditorError):
+        media_editor.render_crops(video_file, Crops(64, 48, 16, 32, []), path)
+    with pytest.raises(MediaEditorError):
+        oversized_crops = Crops(64, 48, 80, 32, [Segment([0], 0.0, 1.0, 0, 0)])
+        media_editor.render_crops(video_file, oversized_crops, path)
@@ -0,0 +1,180 @@
+# Standard library imports
+from unittest.mock import MagicMock, patch
+
+# Local package imports
+from ai_clips_maker.txtslice.embed_vectorizer import (
+    TextEmbedder,
+    TextEmbedderConfigManager,
+)
+from ai_clips_maker.txtslice.embedding_cache import EmbeddingCache
+from ai_clips_maker.utils.exceptions import ConfigError
+
+# Third-party imports
+import numpy as np
+import pytest
+import torch
+
+
+def test_put_and_get_many(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), capacity=4)
+    cache.put_many(["a", "b"], np.array([[1.0, 2.0], [3.0, 4.0]]))
+
+    cached = cache.get_many(["b", "c", "a"])
+
+    assert sorted(cached) == ["a", "b"]
+    assert cached["a"].dtype == np.float16
+    np.testing.assert_array_equal(cached["b"], [3.0, 4.0])
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), capacity=2)
+    cache.put_many(["a", "b"], np.ones((2, 3)))
+    cache.get_many(["a"])
+    cache.put_many(["c"], np.zeros((1, 3)))
+
+    assert len(cache) == 2
+    assert sorted(cache.get_many(["a", "b", "c"])) == ["a", "c"]
+
+
+def test_cache_persists(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), capacity=2)
+    cache.put_many(["a"], np.array([[0.5, 0.25]]))
+    cache.flush()
+
+    cache = EmbeddingCache(str(tmp_path))
+
+    assert cache.capacity == 2
+    np.testing.assert_array_equal(cache.get_many(["a"])["a"], [0.5, 0.25])
+
+
+def test_unflushed_eviction_never_returns_wrong_embedding(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), capacity=2)
+    cache.put_many(["a", "b"], np.array([[1.0, 1.0], [2.0, 2.0]]))
+    cache.flush()
+    # evicts "a" and reuses its slot, then the process dies before flushing
+    cache.put_many(["c"], np.array([[3.0, 3.0]]))
+    cache._vectors.flush()
+
+    cache = EmbeddingCache(str(tmp_path))
+
+    cached = cache.get_many(["a", "b", "c"])
+    assert "a" not in cached
+    np.testing.assert_array_equal(cached["b"], [2.0, 2.0])
+
+
+def test_flush_persists_recency(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), capacity=2)
+    cache.put_many(["a", "b"], np.ones((2, 3)))
+    cache.flush()
+    cache.get_many(["a"])
+    cache.flush()
+
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many(["c"], np.zeros((1, 3)))
+
+    assert sorted(cache.get_many(["a", "b", "c"])) == ["a", "c"]
+
+
+def test_other_dimension_empties_cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), capacity=3)
+    cache.put_many(["a", "b"], np.ones((2, 4)))
+    cache.flush()
+
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many(["c"], np.zeros((1, 2)))
+    cache.flush()
+
+    assert len(cache) == 1
+    assert sorted(cache.get_many(["a", "b", "c"])) == ["c"]
+    cache = EmbeddingCache(str(tmp_path))
+    assert cache.get_many(["c"])["c"].shape == (2,)
+
+
+def test_namespaces_have_separate_stores(tmp_path):
+    small = EmbeddingCache(str(tmp_path), namespace="org/small-model")
+    large = EmbeddingCache(str(tmp_path), namespace="large-model")
+    small.put_many(["a"], np.ones((1, 2)))
+    large.put_many(["a"], np.ones((1, 4)))
+
+    assert small.cache_dir != large.cache_dir
+    assert small.get_many(["a"])["a"].shape == (2,)
+    assert large.get_many(["a"])["a"].shape == (4,)
+
+
+def test_make_key_depends_on_model():
+    assert EmbeddingCache.make_key("model", "text") == EmbeddingCache.make_key(
+        "model", "text"
+    )
+    assert EmbeddingCache.make_key("model", "text") != EmbeddingCache.make_key(
+        "other", "text"
+    )
+
+
+def test_embedder_only_encodes_misses(tmp_path):
+    model = MagicMock()
+    model.encode.side_effect = lambda sentences, convert_to_tensor: torch.tensor(
+        [[float(len(s)), 1.0] for s in sentences]
+    )
+    embedder = TextEmbedder(device="cpu", cache_dir=str(tmp_path))
+
+    with patch(
+        "ai_clips_maker.txtslice.embed_vectorizer.MODEL_REGISTRY.get",
+        return_value=model,
+    ):
+        first = embedder.embed_sentences(["a", "bb", "a"])
+        second = embedder.embed_sentences(["bb", "ccc", "a"])
+
+    assert model.encode.call_args_list[0][0][0] == ["a", "bb"]
+    assert model.encode.call_args_list[1][0][0] == ["ccc"]
+    assert first.tolist() == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert second.tolist() == [[2.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_embedder_embeds_no_sentences(tmp_path, cached):
+    model = MagicMock()
+    model.get_sentence_embedding_dimension.return_value = 2
+    cache_dir = str(tmp_path) if cached else None
+    embedder = TextEmbedder(device="cpu", cache_dir=cache_dir)
+
+    with patch(
+        "ai_clips_maker.txtslice.embed_vectorizer.MODEL_REGISTRY.get",
+        return_value=model,
+    ):
+        embeddings = embedder.embed_sentences([])
+
+    assert embeddings.shape == (0, 2)
+    model.encode.assert_not_called()
+
+
+def test_embedder_backends_use_separate_models_and_cache_keys(tmp_path):
+    models = {}
+
+    def get(name, device, loader):
+        return models.setdefault(name, MagicMock(**{"encode.side_effect": encode}))
+
+    def encode(sentences, convert_to_tensor):
+        return torch.ones((len(sentences), 2))
+
+    torch_embedder = TextEmbedder(device="cpu", cache_dir=str(tmp_path))
+    int8_embedder = TextEmbedder(
+        device="cpu", cache_dir=str(tmp_path), backend="torch-int8"
+    )
+    with patch(
+        "ai_clips_maker.txtslice.embed_vectorizer.MODEL_REGISTRY.get", side_effect=get
+    ):
+        torch_embedder.embed_sentences(["a"])
+        int8_embedder.embed_sentences(["a"])
+
+    assert sorted(models) == ["all-roberta-large-v1", "all-roberta-large-v1@torch-int8"]
+    for model in models.values():
+        assert model.encode.call_count == 1
+
+
+def test_embedder_rejects_invalid_backends():
+    with pytest.raises(ConfigError):
+        TextEmbedder(device="cpu", backend="tensorrt")
+    config_manager = TextEmbedderConfigManager()
+    assert config_manager.check_valid_config(
+        {"backend": "torch-int8", "device": "cuda", "model_name": "model"}
+    ) is not None
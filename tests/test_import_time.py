@@ -0,0 +1,57 @@
+# standard library imports
+import json
+import subprocess
+import sys
+
+# 3rd party imports
+import pytest
+
+# modules that take seconds to import and must only be imported when used
+HEAVY_MODULES = [
+    "cv2",
+    "facenet_pytorch",
+    "mediapipe",
+    "nltk",
+    "pyannote.audio",
+    "sentence_transformers",
+    "sklearn",
+    "torch",
+    "whisperx",
+]
+# generous, so the test only fails if a heavy import sneaks back in
+IMPORT_BUDGET_SECS = 3.0
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import ai_clips_maker
+ai_clips_maker.MediaEditor
+ai_clips_maker.Transcription
+elapsed = time.perf_counter() - start
+imported = [m for m in {heavy} if m in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "imported": imported}}))
+"""
+
+
+def test_lightweight_imports_stay_light():
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert report["imported"] == []
+    assert report["elapsed"] < IMPORT_BUDGET_SECS
+
+
+def test_public_api_is_lazy():
+    import ai_clips_maker
+
+    assert "Transcription" in dir(ai_clips_maker)
+    from ai_clips_maker.transcribe.transcription import Transcription
+
+    assert ai_clips_maker.Transcription is Transcription
+    with pytest.raises(AttributeError):
+        ai_clips_maker.NotAnAttribute
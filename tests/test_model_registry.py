@@ -0,0 +1,113 @@
+# Standard library imports
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from unittest.mock import MagicMock
+
+# Local package imports
+from ai_clips_maker.utils.exceptions import ModelRegistryError
+from ai_clips_maker.utils.model_registry import ModelRegistry
+
+# Third-party imports
+import pytest
+
+
+@pytest.fixture
+def loader():
+    return MagicMock(side_effect=lambda device: object())
+
+
+def test_get_loads_once_per_device(loader):
+    registry = ModelRegistry()
+
+    model = registry.get("model", "cpu", loader)
+    assert registry.get("model", "cpu", loader) is model
+    assert registry.get("model", "cuda", loader) is not model
+    assert loader.call_count == 2
+
+
+def test_release_reloads_on_next_get(loader):
+    registry = ModelRegistry()
+    model = registry.get("model", "cpu", loader)
+
+    assert registry.release("model", "cpu") is True
+    assert registry.release("model", "cpu") is False
+    assert registry.is_loaded("model", "cpu") is False
+    assert registry.get("model", "cpu", loader) is not model
+
+
+def test_release_all_keeps_pinned_models(loader):
+    registry = ModelRegistry()
+    registry.warm_up("pinned", "cpu", loader, pin=True)
+    registry.warm_up("unpinned", "cpu", loader)
+
+    registry.release_all()
+    assert registry.is_loaded("pinned", "cpu") is True
+    assert registry.is_loaded("unpinned", "cpu") is False
+
+    registry.release_all(include_pinned=True)
+    assert registry.is_loaded("pinned", "cpu") is False
+
+
+def test_pin_requires_loaded_model():
+    registry = ModelRegistry()
+    with pytest.raises(ModelRegistryError):
+        registry.pin("model", "cpu")
+
+
+def test_loading_doesnt_block_other_models(loader):
+    registry = ModelRegistry()
+    started = threading.Event()
+    finish = threading.Event()
+
+    def slow_loader(device):
+        started.set()
+        assert finish.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        slow_model = executor.submit(registry.get, "slow", "cpu", slow_loader)
+        assert started.wait(5)
+        # waits for the load in progress instead of loading again
+        same_model = executor.submit(registry.get, "slow", "cpu", loader)
+        # other models load while "slow" is loading
+        assert registry.get("fast", "cpu", loader) is not None
+        assert loader.call_count == 1
+        finish.set()
+        assert slow_model.result() is same_model.result()
+    assert loader.call_count == 1
+
+
+def test_failed_load_can_be_retried():
+    registry = ModelRegistry()
+    failing_loader = MagicMock(side_effect=RuntimeError("out of memory"))
+    with pytest.raises(RuntimeError):
+        registry.get("model", "cpu", failing_loader)
+    assert registry.is_loaded("model", "cpu") is False
+    assert registry.get("model", "cpu", lambda device: "model") == "model"
+
+
+def test_release_during_load_discards_model(loader):
+    registry = ModelRegistry()
+    started = threading.Event()
+    finish = threading.Event()
+
+    def slow_loader(device):
+        started.set()
+        assert finish.wait(5)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        loading = executor.submit(
+            registry.warm_up, "model", "cpu", slow_loader, pin=True
+        )
+        assert started.wait(5)
+        assert registry.release("model", "cpu") is False
+        finish.set()
+        loading.result()
+
+    assert registry.is_loaded("model", "cpu") is False
+    registry.get("model", "cpu", loader)
+    assert loader.call_count == 1
+    # the new load isn't pinned by the released one
+    registry.release_all()
+    assert registry.is_loaded("model", "cpu") is False
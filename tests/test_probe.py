@@ -0,0 +1,173 @@
+# standard library imports
+import json
+import os
+import subprocess
+from unittest.mock import patch
+
+# current package imports
+from ai_clips_maker.filesys import file as file_module
+from ai_clips_maker.filesys.exceptions import FileSystemObjectError
+from ai_clips_maker.filesys.file import File
+from ai_clips_maker.media.probe import MediaProbe, probe_keyframe_times
+from ai_clips_maker.media.video_file import VideoFile
+from ai_clips_maker.media.audiovideo_file import AudioVideoFile
+
+# 3rd party imports
+import av
+import numpy as np
+import pytest
+
+
+PROBE_OUTPUT = {
+    "format": {"duration": "12.500000", "bit_rate": "800000"},
+    "streams": [
+        {
+            "codec_type": "video",
+            "width": 1920,
+            "height": 1080,
+            "r_frame_rate": "30000/1001",
+            "bit_rate": "700000",
+        },
+        {"codec_type": "audio", "bit_rate": "128000", "sample_rate": "44100"},
+    ],
+}
+
+
+def fake_ffprobe(*args, **kwargs):
+    return subprocess.CompletedProcess(
+        args=args[0], returncode=0, stdout=json.dumps(PROBE_OUTPUT), stderr=""
+    )
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    """Encodes a few frames so the file is recognized as a video."""
+    path = str(tmp_path / "video.mp4")
+    container = av.open(path, "w")
+    stream = container.add_stream("mpeg4", rate=30)
+    stream.width = 64
+    stream.height = 48
+    stream.pix_fmt = "yuv420p"
+    for _ in range(3):
+        img = np.zeros((48, 64, 3), dtype=np.uint8)
+        frame = av.VideoFrame.from_ndarray(img, format="rgb24")
+        for packet in stream.encode(frame):
+            container.mux(packet)
+    for packet in stream.encode():
+        container.mux(packet)
+    container.close()
+    return path
+
+
+def test_probe_fields(video_path):
+    with patch("ai_clips_maker.media.probe.subprocess.run", side_effect=fake_ffprobe):
+        probe = MediaProbe(video_path)
+    assert probe.duration == 12.5
+    assert probe.width == 1920
+    assert probe.height == 1080
+    assert probe.frame_rate == pytest.approx(29.97, abs=1e-2)
+    assert probe.video_bit_rate == 700000
+    assert probe.audio_bit_rate == 128000
+    assert probe.get_stream_field("a", "sample_rate") == "44100"
+    assert probe.get_stream_field("v:1", "width") is None
+    assert probe.get_format_field("bit_rate") == "800000"
+    assert len(probe.video_streams) == 1
+    assert len(probe.audio_streams) == 1
+
+
+def test_probe_failure(video_path):
+    failed = subprocess.CompletedProcess(args=[], returncode=1, stdout="", stderr="x")
+    with patch("ai_clips_maker.media.probe.subprocess.run", return_value=failed):
+        probe = MediaProbe(video_path)
+    assert probe.streams == []
+    assert probe.duration is None
+    assert probe.width is None
+
+
+def test_media_file_probes_once(video_path):
+    video_file = AudioVideoFile(video_path)
+    with patch(
+        "ai_clips_maker.media.probe.subprocess.run", side_effect=fake_ffprobe
+    ) as run:
+        assert video_file.get_duration() == 12.5
+        assert video_file.get_width_pixels() == 1920
+        assert video_file.get_height_pixels() == 1080
+        assert video_file.get_frame_rate() == pytest.approx(29.97, abs=1e-2)
+        assert video_file.get_stream_info("v", "height") == "1080"
+        assert len(video_file.get_audio_streams()) == 1
+    assert run.call_count == 1
+
+
+def test_media_file_probes_again_after_change(video_path):
+    video_file = AudioVideoFile(video_path)
+    other_file = AudioVideoFile(video_path)
+    with patch(
+        "ai_clips_maker.media.probe.subprocess.run", side_effect=fake_ffprobe
+    ) as run:
+        video_file.get_duration()
+        # probes aren't shared between instances
+        other_file.get_duration()
+        assert run.call_count == 2
+
+        with open(video_path, "ab") as f:
+            f.write(b"\0" * 16)
+        video_file.get_duration()
+        assert run.call_count == 3
+
+        stat = os.stat(video_path)
+        os.utime(video_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        video_file.get_duration()
+        assert run.call_count == 4
+        video_file.get_duration()
+        assert run.call_count == 4
+
+
+def test_validation_is_memoized(video_path):
+    video_file = AudioVideoFile(video_path)
+    with patch(
+        "ai_clips_maker.media.probe.subprocess.run", side_effect=fake_ffprobe
+    ), patch.object(
+        File, "get_mime_type", autospec=True, return_value="video/mp4"
+    ) as get_mime_type:
+        for _ in range(5):
+            video_file.get_duration()
+            assert video_file.exists()
+        assert get_mime_type.call_count == 1
+
+        stat = os.stat(video_path)
+        os.utime(video_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        video_file.get_duration()
+        assert get_mime_type.call_count == 2
+
+
+def test_validation_failure_is_not_memoized(video_path):
+    # the fake probe reports an audio stream, so it isn't a video-only file
+    video_file = VideoFile(video_path)
+    with patch(
+        "ai_clips_maker.media.probe.subprocess.run", side_effect=fake_ffprobe
+    ):
+        for _ in range(2):
+            with pytest.raises(FileSystemObjectError):
+                video_file.get_duration()
+            assert not video_file.exists()
+
+
+def test_mime_magic_handle_is_shared(video_path, monkeypatch):
+    monkeypatch.setattr(file_module, "_MIME_MAGIC", None)
+    with patch.object(file_module.magic, "Magic") as magic_cls:
+        magic_cls.return_value.from_file.return_value = "video/mp4"
+        for _ in range(3):
+            assert File(video_path).get_mime_type() == "video/mp4"
+    assert magic_cls.call_count == 1
+
+
+def test_probe_keyframe_times(video_path):
+    packets = (
+        "9.000,K__\n10.000,___\n11.000,K__\nN/A,K__\n12.500,K_\n"
+        "20.000,K__\n11.000,K__\n"
+    )
+    output = subprocess.CompletedProcess(
+        args=[], returncode=0, stdout=packets, stderr=""
+    )
+    with patch("ai_clips_maker.media.probe.subprocess.run", return_value=output):
+        assert probe_keyframe_times(video_path, 10.0, 15.0) == [11.0, 12.5]
@@ -0,0 +1,110 @@
+# standard library imports
+import threading
+import time
+
+# current package imports
+from ai_clips_maker.media.exceptions import RenderSchedulerError
+from ai_clips_maker.media.render_scheduler import RenderScheduler
+
+# 3rd party imports
+import pytest
+
+
+class FakeRender:
+    """Records the calls of a render job, failing its first `num_failures` calls."""
+
+    def __init__(self, num_failures: int = 0, duration: float = 0.0) -> None:
+        self.num_failures = num_failures
+        self.duration = duration
+        self.calls = []
+        self.num_running = 0
+        self.max_num_running = 0
+        self.max_threads_running = 0
+        self.threads_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str, num_threads: str) -> str | None:
+        with self._lock:
+            self.calls.append((name, num_threads))
+            self.num_running += 1
+            self.threads_running += int(num_threads)
+            self.max_num_running = max(self.max_num_running, self.num_running)
+            self.max_threads_running = max(
+                self.max_threads_running, self.threads_running
+            )
+            fail = len(self.calls) <= self.num_failures
+        time.sleep(self.duration)
+        with self._lock:
+            self.num_running -= 1
+            self.threads_running -= int(num_threads)
+        return None if fail else name
+
+
+def test_core_budget():
+    render = FakeRender(duration=0.05)
+    with RenderScheduler(
+        max_cores=8, min_threads_per_job=2, max_threads_per_job=4
+    ) as scheduler:
+        futures = [scheduler.submit(render, f"clip{i}") for i in range(12)]
+    assert [future.result() for future in futures] == [f"clip{i}" for i in range(12)]
+    assert render.max_threads_running <= 8
+    assert render.max_num_running > 1
+    assert all(2 <= int(num_threads) <= 4 for _, num_threads in render.calls)
+
+
+def test_single_job_gets_max_threads():
+    render = FakeRender()
+    with RenderScheduler(max_cores=32, max_threads_per_job=8) as scheduler:
+        scheduler.submit(render, "clip").result()
+    assert render.calls == [("clip", "8")]
+
+
+def test_priorities():
+    render = FakeRender()
+    blocker = threading.Event()
+    with RenderScheduler(max_cores=2, min_threads_per_job=2) as scheduler:
+        # occupies every core while the other jobs are queued
+        scheduler.submit(lambda num_threads: blocker.wait(), priority=100)
+        scheduler.submit(render, "low", priority=0)
+        scheduler.submit(render, "high", priority=10)
+        scheduler.submit(render, "medium", priority=5)
+        blocker.set()
+    assert [name for name, _ in render.calls] == ["high", "medium", "low"]
+
+
+def test_retries():
+    render = FakeRender(num_failures=1)
+    with RenderScheduler(max_cores=2, max_retries=1) as scheduler:
+        assert scheduler.submit(render, "clip").result() == "clip"
+    assert len(render.calls) == 2
+
+    render = FakeRender(num_failures=3)
+    with RenderScheduler(max_cores=2, max_retries=2) as scheduler:
+        future = scheduler.submit(render, "clip")
+        with pytest.raises(RenderSchedulerError):
+            future.result()
+    assert len(render.calls) == 3
+
+
+def test_exceptions_are_retried():
+    calls = []
+
+    def render(num_threads: str) -> str:
+        calls.append(num_threads)
+        raise RuntimeError("ffmpeg crashed")
+
+    with RenderScheduler(max_cores=2, max_retries=1) as scheduler:
+        future = scheduler.submit(render)
+        with pytest.raises(RenderSchedulerError) as e:
+            future.result()
+    assert isinstance(e.value.__cause__, RuntimeError)
+    assert len(calls) == 2
+
+
+def test_invalid_submissions():
+    scheduler = RenderScheduler(max_cores=2)
+    with pytest.raises(RenderSchedulerError):
+        scheduler.submit(FakeRender(), "clip", num_threads="4")
+    scheduler.shutdown()
+    with pytest.raises(RenderSchedulerError):
+        scheduler.submit(FakeRender(), "clip")
@@ -7,6 +7,7 @@ from ai_clips_maker.resize.resizer import Resizer
 from ai_clips_maker.resize.rect import Rect
 
 # Third-party imports
+import numpy as np
 import pytest
 
 # --- Tests for _calc_resize_width_and_height_pixels() ---
@@ -148,3 +149,100 @@ def test_merge_identicals(segments, expected):
     resizer = Resizer()
     result = resizer._merge_identical_segments(segments, mock_video)
     assert result == expected
+
+
+# --- Tests for _detect_faces_in_micro_batch() ---
+def test_detect_faces_in_micro_batch_uses_cache(tmp_path):
+    resizer = Resizer(face_detection_cache_path=str(tmp_path / "cache.sqlite"))
+    cache_key = ("hash", 32, resizer._get_face_detector_config())
+    frames = [np.zeros((24, 32, 3), dtype=np.uint8)] * 3
+    detection = np.array([[2, 4, 6, 8]], dtype=np.int16)
+
+    with patch.object(
+        resizer, "_detect_faces", side_effect=lambda f, _: [detection] * len(f)
+    ) as mock_detect:
+        face_detections = [None] * 3
+        num_cached = resizer._detect_faces_in_micro_batch(
+            face_detections, [0, 1, 2], [0, 512, 1024], frames, 2.0, cache_key
+        )
+        assert num_cached == 0
+        assert mock_detect.call_count == 1
+
+        face_detections = [None] * 3
+        num_cached = resizer._detect_faces_in_micro_batch(
+            face_detections, [2, 0, 1], [1024, 1536, 512], frames, 2.0, cache_key
+        )
+        assert num_cached == 2
+        assert len(mock_detect.call_args[0][0]) == 1
+
+    for face_detection in face_detections:
+        np.testing.assert_array_equal(face_detection, detection)
+    resizer.cleanup()
+
+
+def test_crop_faces_copies_faces_out_of_frames():
+    resizer = Resizer()
+    frames = [np.arange(100 * 200 * 3, dtype=np.uint8).reshape(100, 200, 3)] * 2
+    face_detections = [None, np.array([[10, 20, 50, 40], [0, 0, 5, 5]]), None]
+    face_crops = [None] * 3
+
+    resizer._crop_faces(face_crops, face_detections, [1, 2], frames)
+
+    assert face_crops[0] is None and face_crops[2] is None
+    assert len(face_crops[1]) == 2
+    np.testing.assert_array_equal(face_crops[1][0], frames[0][20:40, 10:50, :])
+    # crops don't keep the full frame alive
+    assert face_crops[1][0].base is None
+    resizer.cleanup()
+
+
+# --- Tests for _calc_mouth_movements() ---
+def _mock_face_mesh_results(mouth_height: float):
+    landmarks = [MagicMock(x=0.5, y=0.5) for _ in range(468)]
+    for i in [13, 82, 81, 80, 191, 312, 311, 310, 415]:
+        landmarks[i] = MagicMock(x=0.5, y=0.5 - mouth_height)
+    landmarks[78] = MagicMock(x=0.25, y=0.5)
+    landmarks[308] = MagicMock(x=0.75, y=0.5)
+    results = MagicMock()
+    results.multi_face_landmarks = [MagicMock(landmark=landmarks)]
+    return results
+
+
+def test_calc_mouth_movements():
+    resizer = Resizer()
+    no_face = MagicMock(multi_face_landmarks=None)
+    resizer._face_mesher = MagicMock()
+    resizer._face_mesher.process.side_effect = [
+        _mock_face_mesh_results(0.1),
+        no_face,
+        _mock_face_mesh_results(0.3),
+        _mock_face_mesh_results(0.2),
+        no_face,
+        no_face,
+    ]
+    frame = np.zeros((100, 200, 3), dtype=np.uint8)
+    bounding_box_groups = [
+        [
+            {"bounding_box": np.array([0, 0, 40, 20])},
+            {"bounding_box": np.array([0, 0, 40, 20])},
+            {"bounding_box": np.array([10, 0, 50, 20])},
+            {"bounding_box": np.array([10, 0, 50, 20])},
+        ],
+        [
+            {"bounding_box": np.array([100, 50, 140, 70])},
+            {"bounding_box": np.array([100, 50, 140, 70])},
+        ],
+    ]
+    for bounding_box_group in bounding_box_groups:
+        for bounding_box_data in bounding_box_group:
+            x1, y1, x2, y2 = bounding_box_data["bounding_box"]
+            bounding_box_data["face"] = frame[y1:y2, x1:x2, :]
+
+    movements = resizer._calc_mouth_movements(bounding_box_groups)
+
+    # mean lip distance (over x and y) / mouth width
+    assert movements[0][0] == pytest.approx((0.2 + 0.1) * 20 / 2 / (0.5 * 40))
+    assert movements[0][1] == Rect(5, 0, 40, 20)
+    assert movements[1][0] == 0
+    assert movements[1][1] == Rect(100, 50, 40, 20)
+    assert resizer._face_mesher.process.call_count == 6
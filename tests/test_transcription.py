@@ -0,0 +1,147 @@
+# Standard library imports
+from datetime import datetime
+import re
+
+# Local package imports
+from ai_clips_maker.filesys.file import File
+from ai_clips_maker.transcribe.exceptions import TranscriptionError
+from ai_clips_maker.transcribe.transcription import Transcription
+
+# Third-party imports
+import numpy as np
+import pytest
+
+TEXT = "Hi there. How are you? Good"
+
+
+def _split_sentences(text: str) -> list[str]:
+    return [s for s in re.split(r"(?<=[.?!])\s+", text) if s]
+
+
+@pytest.fixture(autouse=True)
+def sent_tokenize(monkeypatch):
+    # avoids depending on the punkt tokenizer data being downloaded
+    monkeypatch.setattr(
+        "ai_clips_maker.transcribe.transcription.sent_tokenize", _split_sentences
+    )
+
+
+@pytest.fixture
+def transcription() -> Transcription:
+    char_info = []
+    for i, char in enumerate(TEXT):
+        timed = char != " "
+        char_info.append({
+            "char": char,
+            "start_time": round(i * 0.1, 2) if timed else None,
+            "end_time": round(i * 0.1 + 0.1, 2) if timed else None,
+            "speaker": 0 if timed else None,
+        })
+    return Transcription({
+        "source_software": "test",
+        "time_created": datetime.now(),
+        "language": "en",
+        "num_speakers": 1,
+        "char_info": char_info,
+    })
+
+
+def _find_index(items: list[dict], target: float, mode: str) -> int:
+    """Reference search: the element containing the target or next to it."""
+    for i, item in enumerate(items):
+        if item["start_time"] <= target <= item["end_time"]:
+            return i
+        if target < item["start_time"]:
+            return max(i - 1, 0) if mode == "start" else i
+    return len(items) - 1
+
+
+def test_words(transcription: Transcription):
+    words = transcription.get_word_info()
+    assert [w["word"] for w in words] == ["Hi", "there.", "How", "are", "you?", "Good"]
+    assert (words[1]["start_char"], words[1]["end_char"]) == (3, 9)
+    assert (words[1]["start_time"], words[1]["end_time"]) == (0.3, 0.9)
+
+
+def test_sentences(transcription: Transcription):
+    sentences = transcription.get_sentence_info()
+    assert [s["sentence"] for s in sentences] == ["Hi there.", "How are you?", "Good"]
+    assert (sentences[1]["start_time"], sentences[1]["end_time"]) == (1.0, 2.2)
+    assert [str(s) for s in transcription.sentences] == [
+        s["sentence"] for s in sentences
+    ]
+
+
+def test_characters(transcription: Transcription):
+    chars = transcription.characters
+    assert "".join(str(c) for c in chars) == TEXT
+    assert (chars[4].word_index, chars[4].sentence_index) == (1, 0)
+    assert chars[2].word_index is None
+    assert chars[2].start_time is None
+    # element views are built once
+    assert transcription.characters is chars
+
+
+def test_end_time(transcription: Transcription):
+    assert transcription.end_time == 2.7
+
+
+@pytest.mark.parametrize("mode", ["start", "end"])
+def test_find_word_index_matches_linear_search(transcription: Transcription, mode: str):
+    words = transcription.get_word_info()
+    targets = np.arange(0.0, 2.7, 0.05)
+    expected = [_find_index(words, target, mode) for target in targets]
+
+    assert transcription.find_word_index(targets, mode).tolist() == expected
+    assert [transcription.find_word_index(t, mode) for t in targets] == expected
+
+
+def test_get_info_time_range(transcription: Transcription):
+    assert [w["word"] for w in transcription.get_word_info(0.95, 1.65)] == [
+        "there.", "How", "are",
+    ]
+    assert len(transcription.get_sentence_info(1.0, 2.0)) == 1
+    chars = transcription.get_char_info(0.3, 0.45)
+    assert "".join(c["char"] for c in chars) == "th"
+
+
+def test_binary_round_trip(transcription: Transcription, tmp_path, monkeypatch):
+    binary_file = transcription.store_as_binary_file(str(tmp_path / "t.bin"))
+
+    def fail(text):
+        raise AssertionError("loading a binary transcription shouldn't tokenize")
+
+    monkeypatch.setattr("ai_clips_maker.transcribe.transcription.sent_tokenize", fail)
+    loaded = Transcription(binary_file)
+
+    assert isinstance(loaded._char_start, np.memmap)
+    assert loaded.text == transcription.text
+    assert loaded.language == "en"
+    assert loaded.created == transcription.created
+    assert loaded.get_char_info() == transcription.get_char_info()
+    assert loaded.get_word_info() == transcription.get_word_info()
+    assert loaded.get_sentence_info() == transcription.get_sentence_info()
+    assert loaded.get_word_info(0.95, 1.65) == transcription.get_word_info(0.95, 1.65)
+    assert loaded.end_time == transcription.end_time
+
+
+def test_binary_rejects_unexpected_columns(transcription: Transcription, tmp_path):
+    path = str(tmp_path / "t.bin")
+    transcription.store_as_binary_file(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    # renames a column in the header without changing its length
+    tampered = data.replace(b'"char_speaker"', b'"char_speakrr"')
+    assert tampered != data
+    with open(path, "wb") as f:
+        f.write(tampered)
+
+    with pytest.raises(TranscriptionError):
+        Transcription(File(path))
+
+
+def test_binary_rejects_other_files(tmp_path):
+    path = tmp_path / "t.bin"
+    path.write_bytes(b"not a transcription")
+    with pytest.raises(TranscriptionError):
+        Transcription(File(str(path)))
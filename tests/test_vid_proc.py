@@ -0,0 +1,145 @@
+# Standard library imports
+from unittest.mock import MagicMock
+
+# Local package imports
+from ai_clips_maker.media.video_file import VideoFile
+from ai_clips_maker.resize.vid_proc import (
+    _sample_frames,
+    extract_frames,
+    stream_frames,
+)
+
+# Third-party imports
+import av
+import numpy as np
+import pytest
+
+FPS = 25
+NUM_FRAMES = 300
+GOP_SIZE = 50
+
+
+def _frame_value(frame_idx: int) -> int:
+    """Pixel value that encodes the index of a frame in the test video."""
+    return (frame_idx * 3) % 250
+
+
+@pytest.fixture(scope="module")
+def video_path(tmp_path_factory) -> str:
+    """
+    Encodes a small solid-color test video where each frame's pixel value encodes
+    its index.
+    """
+    path = str(tmp_path_factory.mktemp("vid_proc") / "video.mp4")
+    container = av.open(path, "w")
+    stream = container.add_stream("mpeg4", rate=FPS)
+    stream.width = 64
+    stream.height = 48
+    stream.pix_fmt = "yuv420p"
+    stream.codec_context.gop_size = GOP_SIZE
+    for i in range(NUM_FRAMES):
+        img = np.full((48, 64, 3), _frame_value(i), dtype=np.uint8)
+        frame = av.VideoFrame.from_ndarray(img, format="rgb24")
+        for packet in stream.encode(frame):
+            container.mux(packet)
+    for packet in stream.encode():
+        container.mux(packet)
+    container.close()
+    return path
+
+
+@pytest.fixture
+def mock_video(video_path):
+    mock_video = MagicMock(spec=VideoFile)
+    mock_video.path = video_path
+    mock_video.get_duration.return_value = NUM_FRAMES / FPS
+    return mock_video
+
+
+def _seek_per_timestamp(path: str, extract_secs: list[float]) -> list[int]:
+    """Reference sampler: one seek and decode per requested timestamp."""
+    container = av.open(path)
+    stream = container.streams.video[0]
+    frame_pts = []
+    for pts in [int(sec / stream.time_base) for sec in extract_secs]:
+        container.seek(pts, stream=stream)
+        prev_frame = None
+        for frame in container.decode(stream):
+            if frame.pts > pts:
+                frame_pts.append((prev_frame or frame).pts)
+                break
+            prev_frame = frame
+    container.close()
+    return frame_pts
+
+
+@pytest.mark.parametrize(
+    "extract_secs",
+    [
+        [0.0],
+        [5.0, 1.0, 5.0, 0.0],
+        [0.5, 0.54, 0.58, 0.62, 3.0, 3.04, 7.5, 11.5],
+        [11.5, 9.1, 6.7, 4.3, 1.9, 0.3],
+        list(np.random.default_rng(0).uniform(0, 11.9, 40)),
+    ],
+)
+def test_sample_frames_matches_seek_per_timestamp(video_path, extract_secs):
+    container = av.open(video_path)
+    stream = container.streams.video[0]
+    target_pts = [int(sec / stream.time_base) for sec in extract_secs]
+    sampled = dict(_sample_frames(container, stream, target_pts))
+    container.close()
+
+    assert sorted(sampled) == list(range(len(extract_secs)))
+    assert [sampled[i].pts for i in range(len(extract_secs))] == _seek_per_timestamp(
+        video_path, extract_secs
+    )
+
+
+def test_extract_frames_returns_caller_order(mock_video):
+    extract_secs = [5.0, 1.0, 5.0, 0.0]
+    frames = extract_frames(mock_video, extract_secs)
+
+    assert len(frames) == len(extract_secs)
+    for frame, sec in zip(frames, extract_secs):
+        assert frame.shape == (48, 64, 3)
+        assert abs(frame.mean() - _frame_value(int(sec * FPS))) < 8
+
+
+def test_extract_frames_downsamples(mock_video):
+    frames = extract_frames(mock_video, [1.0, 2.0], downsample_factor=2.0)
+    assert [frame.shape for frame in frames] == [(24, 32, 3), (24, 32, 3)]
+
+
+def test_stream_frames_with_full_res(mock_video, video_path):
+    extract_secs = [2.0, 1.0, 7.0]
+    streamed = list(
+        stream_frames(
+            mock_video,
+            extract_secs,
+            downsample_factor=2.0,
+            keep_full_res=True,
+            max_queued_frames=1,
+        )
+    )
+
+    assert sorted(idx for idx, _, _, _ in streamed) == [0, 1, 2]
+    expected_pts = _seek_per_timestamp(video_path, extract_secs)
+    for idx, pts, small_frame, full_frame in streamed:
+        assert pts == expected_pts[idx]
+        assert small_frame.shape == (24, 32, 3)
+        assert full_frame.shape == (48, 64, 3)
+        crop = full_frame[8:40, 16:48, :]
+        assert crop.shape == (32, 32, 3)
+        assert abs(crop.mean() - small_frame.mean()) < 4
+        assert abs(crop.mean() - _frame_value(int(extract_secs[idx] * FPS))) < 8
+
+
+def test_stream_frames_stops_early(mock_video):
+    frames = stream_frames(mock_video, [1.0, 2.0, 3.0, 4.0], max_queued_frames=1)
+    idx, _, frame, full_frame = next(frames)
+    frames.close()
+
+    assert idx == 0
+    assert frame.shape == (48, 64, 3)
+    assert full_frame is None